@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+Local stand-in for www.pinterest.com serving canned responses shaped like
+the real ones: the home page with its jsInit1 script, paginated board,
+section and search feeds, and the write resources. Used by the benchmarks,
+it never talks to the network.
+"""
+import json
+import multiprocessing
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+END = '-end-'
+USERNAME = 'benchmark_user'
+EMAIL = 'benchmark@example.com'
+
+
+class Dataset:
+    """
+    Size of the fake account and feeds
+    """
+
+    def __init__(self, boards=20, sections=3, board_pins=200, section_pins=50,
+                 page_size=25, search_pages=20):
+        self.boards = boards
+        self.sections = sections
+        self.board_pins = board_pins
+        self.section_pins = section_pins
+        self.page_size = page_size
+        self.search_pages = search_pages
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+
+def _pin(pin_id, board_id):
+    return {
+        'id': str(pin_id),
+        'type': 'pin',
+        'description': 'Pin %d description with a few words of text' % pin_id,
+        'title': 'Pin %d' % pin_id,
+        'link': 'https://example.com/articles/%d' % pin_id,
+        'images': {'orig': {'url': 'https://i.pinimg.com/originals/%02x/%02x/%032x.jpg'
+                                   % (pin_id % 256, pin_id // 256 % 256, pin_id),
+                            'width': 736, 'height': 1104}},
+        'like_count': pin_id % 13,
+        'comment_count': pin_id % 3,
+        'repin_count': pin_id % 29,
+        'liked_by_me': False,
+        'is_video': False,
+        'board': {'id': str(board_id), 'name': 'Board %d' % board_id,
+                  'url': '/%s/board-%d/' % (USERNAME, board_id), 'privacy': 'public',
+                  'followed_by_me': False, 'owner': {'id': '1000'}},
+        'pinner': {'id': str(2000 + board_id % 50), 'username': 'pinner%d' % (board_id % 50)},
+    }
+
+
+def _page(items, bookmarks, page_size):
+    """
+    Return the slice of `items` of the page at `bookmarks` and the
+    bookmarks of the next page
+    """
+    start = int(bookmarks[0][1:]) if bookmarks and bookmarks[0] not in ('', END) else 0
+    end = start + page_size
+    return items[start:end], ['p%d' % end] if end < len(items) else [END]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, do not let Nagle's algorithm
+    # hold the body back
+    disable_nagle_algorithm = True
+    dataset = Dataset()
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.__handle(None)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self.__handle(self.rfile.read(length))
+
+    def __handle(self, body):
+        if self.latency:
+            time.sleep(self.latency)
+        parts = urllib.parse.urlsplit(self.path)
+        path = [part for part in parts.path.split('/') if part]
+        if not path:
+            return self.__send(self.__home_page(), 'text/html; charset=utf-8')
+        if path[0] == 'resource' and len(path) > 2:
+            query = urllib.parse.parse_qs(body.decode('utf-8') if body else parts.query)
+            options = json.loads(query['data'][0])['options'] if 'data' in query else {}
+            return self.__send_json(self.__resource(path[1], path[2], options))
+        if path[0] == 'search':
+            return self.__send(self.__search_page(), 'text/html; charset=utf-8')
+        if path[0] == 'upload-image':
+            return self.__send_json({'success': True,
+                                     'image_url': 'https://i.pinimg.com/upload/1.jpg'})
+        return self.__send(b'<html><body>Pinterest</body></html>', 'text/html; charset=utf-8')
+
+    def __send_json(self, data):
+        self.__send(json.dumps(data).encode('utf-8'), 'application/json')
+
+    def __send(self, content, content_type):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.send_header('Set-Cookie', 'csrftoken=benchmarktoken; Path=/')
+        self.send_header('Set-Cookie', '_pinterest_sess=benchmarksession; Path=/')
+        self.end_headers()
+        self.wfile.write(content)
+
+    def __home_page(self):
+        user = {'id': '1000', 'username': USERNAME, 'email': EMAIL,
+                'full_name': 'Benchmark User'}
+        # Real home pages carry hundreds of kilobytes of markup and scripts
+        # before the user data
+        filler = ('<div class="item">%s</div>\n' % ('x' * 200)) * 1500
+        return ('<!DOCTYPE html><html><head><title>Pinterest</title></head><body>\n%s'
+                '<script id="jsInit1" type="application/json">%s</script>\n%s</body></html>'
+                % (filler, json.dumps({'context': {'user': user}}), filler)).encode('utf-8')
+
+    def __search_page(self):
+        results = [_pin(900000 + i, i % 40) for i in range(self.dataset.page_size)]
+        state = {'resources': {'data': {'BaseSearchResource': {
+            'search-key': {'data': {'results': results},
+                           'nextBookmark': 's%d' % len(results)}}}}}
+        filler = ('<div class="item">%s</div>\n' % ('x' * 200)) * 500
+        page = ('<!DOCTYPE html><html><body>\n%s'
+                '<script id="initial-state" type="application/json">%s</script>\n'
+                '%s</body></html>' % (filler, json.dumps(state), filler))
+        return page.encode('utf-8')
+
+    def __resource(self, resource, action, options):
+        data = self.dataset
+        response = {'resource_response': {'data': None, 'error': None},
+                    'resource': {'name': resource, 'options': options}}
+        if resource == 'BoardPickerBoardsResource':
+            response['resource_response']['data'] = {'all_boards': [
+                {'id': str(board_id), 'name': 'board-%d' % board_id,
+                 'url': '/%s/board-%d/' % (USERNAME, board_id),
+                 'pin_count': data.board_pins + data.sections * data.section_pins,
+                 'section_count': data.sections}
+                for board_id in range(1, data.boards + 1)]}
+        elif resource == 'BoardSectionsResource':
+            board_id = int(options['board_id'])
+            sections = [{'id': str(board_id * 100 + i), 'title': 'Section %d' % i,
+                         'slug': 'section-%d' % i, 'pin_count': data.section_pins}
+                        for i in range(data.sections)]
+            items, bookmarks = _page(sections, options.get('bookmarks'), data.page_size)
+            response['resource_response']['data'] = items
+            response['resource']['options']['bookmarks'] = bookmarks
+        elif resource in ('BoardFeedResource', 'BoardSectionPinsResource'):
+            if resource == 'BoardFeedResource':
+                owner, count = int(options['board_id']), data.board_pins
+            else:
+                owner, count = int(options['section_id']), data.section_pins
+            start = owner * 10000
+            pins = [_pin(start + i, owner) for i in range(count)]
+            items, bookmarks = _page(pins, options.get('bookmarks'), data.page_size)
+            response['resource_response']['data'] = items
+            response['resource']['options']['bookmarks'] = bookmarks
+        elif resource == 'SearchResource':
+            bookmark = (options.get('bookmarks') or ['s0'])[0]
+            start = int(bookmark[1:]) if bookmark.startswith('s') else 0
+            response['resource_response']['data'] = [_pin(900000 + start + i, i % 40)
+                                                     for i in range(data.page_size)]
+            response['resource']['options']['bookmarks'] = ['s%d' % (start + data.page_size)]
+        elif resource == 'UserSessionResource':
+            response['resource_response']['data'] = {'username': USERNAME}
+        elif resource == 'UserSettingsResource':
+            response['resource_response']['data'] = {'username': USERNAME, 'email': EMAIL,
+                                                     'country': 'ES', 'locale': 'es-ES'}
+        else:
+            # Write resources: PinResource, RepinResource, PinLikeResource...
+            response['resource_response']['data'] = {'id': str(int(time.time() * 1000000))}
+        return response
+
+
+class MockServer:
+    """
+    Mock Pinterest server running in a child process, so its work does not
+    show in the measures of the client.
+
+        with MockServer(Dataset()) as server:
+            client.home_page = server.home_page
+    """
+
+    def __init__(self, dataset=None, latency=0.0):
+        """
+        :param latency: seconds each response is delayed, to stand for the
+            network round trip
+        """
+        self.dataset = dataset or Dataset()
+        self.latency = latency
+        self.port = None
+        self.__process = None
+
+    @property
+    def host(self):
+        return '127.0.0.1:%d' % self.port
+
+    @property
+    def home_page(self):
+        return 'http://%s/' % self.host
+
+    def start(self):
+        ports = multiprocessing.Queue()
+        self.__process = multiprocessing.Process(target=_serve,
+                                                 args=(self.dataset, self.latency, ports))
+        self.__process.daemon = True
+        self.__process.start()
+        self.port = ports.get(timeout=30)
+        return self
+
+    def stop(self):
+        if self.__process is not None:
+            self.__process.terminate()
+            self.__process.join()
+            self.__process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Streaming clients close the connection once they read what they
+        # need, that is not an error
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            ThreadingHTTPServer.handle_error(self, request, client_address)
+
+
+def _serve(dataset, latency, ports):
+    handler = type('Handler', (_Handler,), {'dataset': dataset, 'latency': latency})
+    server = _Server(('127.0.0.1', 0), handler)
+    ports.put(server.server_address[1])
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    server = _Server(('127.0.0.1', 8765), _Handler)
+    print('Mock Pinterest server on http://127.0.0.1:8765/')
+    threading.Thread(target=server.serve_forever).start()
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Offline benchmarks of the Pinterest client against the local mock server.
+
+    python benchmarks/run_benchmarks.py             # run and compare to the baseline
+    python benchmarks/run_benchmarks.py --save      # record a new baseline
+
+Each scenario runs twice with a fresh client: once timed, for requests per
+second and per request latency, and once under tracemalloc for the peak
+memory of the client. Registry writes are the files (or rows) the
+registry actually wrote. Both runs are repeated (--repeat) and the median
+of every metric is kept, so a single slow run does not count. A scenario
+regresses when it gets slower, uses more memory or writes the registry
+more often than the baseline allows.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_server import Dataset
+from mock_server import EMAIL
+from mock_server import MockServer
+from pinterest import Metrics
+from pinterest import Pinterest
+from pinterest import Registry
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+# Allowed change over the baseline before a scenario is reported as a
+# regression: throughput may drop by 30%, p99 latency and peak memory may
+# grow by 50% and 25%, registry writes may not grow at all.
+TOLERANCE = {'requests_per_second': -0.30, 'p99_ms': 0.50, 'peak_memory_kb': 0.25,
+             'registry_writes': 0.0}
+
+
+class CountingRegistry(Registry):
+
+    def __init__(self, *args, **kwargs):
+        self.writes = 0
+        Registry.__init__(self, *args, **kwargs)
+
+    def _write(self, keys):
+        self.writes += 1
+        Registry._write(self, keys)
+
+
+def make_client(server, data_dir):
+    registry = CountingRegistry(os.path.join(data_dir, 'registry.dat'), write_behind=True)
+    client = Pinterest(EMAIL, 'password', data_dir=data_dir, registry=registry,
+                       metrics=Metrics())
+    client.host = server.host
+    client.home_page = server.home_page
+    client.login()
+    # Only count what the scenario does
+    client.flush()
+    registry.writes = 0
+    client.metrics.reset()
+    return client
+
+
+def scenario_login(client, dataset):
+    for _ in range(20):
+        client.is_logged_in = False
+        client.login(resume=False)
+
+
+def scenario_login_resume(client, dataset):
+    for _ in range(20):
+        client.is_logged_in = False
+        client.login()
+
+
+def scenario_fetch_user_pins(client, dataset):
+    client.fetch_user_pins()
+
+
+def scenario_fetch_user_pins_concurrent(client, dataset):
+    client.fetch_user_pins(max_workers=8)
+
+
+def scenario_search_pins_paging(client, dataset):
+    client.search_pins('benchmark')
+    for _ in range(dataset.search_pages):
+        client.search_pins('benchmark', next_page=True)
+
+
+def scenario_search_pins_prefetch(client, dataset):
+    limit = (dataset.search_pages + 1) * dataset.page_size
+    for _ in client.iter_search_pins('benchmark', limit=limit):
+        pass
+
+
+def scenario_bulk_like(client, dataset):
+    client.like_many([str(pin_id) for pin_id in range(500)], max_workers=8)
+
+
+def scenario_bulk_repin(client, dataset):
+    client.repin_many([{'board_id': '1', 'pin_id': str(pin_id)} for pin_id in range(200)],
+                      max_workers=8)
+
+
+SCENARIOS = [
+    ('login', scenario_login),
+    ('login_resume', scenario_login_resume),
+    ('fetch_user_pins', scenario_fetch_user_pins),
+    ('fetch_user_pins_concurrent', scenario_fetch_user_pins_concurrent),
+    ('search_pins_paging', scenario_search_pins_paging),
+    ('search_pins_prefetch', scenario_search_pins_prefetch),
+    ('bulk_like', scenario_bulk_like),
+    ('bulk_repin', scenario_bulk_repin),
+]
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def run_scenario(server, dataset, scenario, repeat=1):
+    """
+    Run `scenario` `repeat` times and return the median of each metric
+    :rtype: dict
+    """
+    runs = [run_scenario_once(server, dataset, scenario) for _ in range(repeat)]
+    return dict((metric, median([run[metric] for run in runs])) for metric in runs[0])
+
+
+def run_scenario_once(server, dataset, scenario):
+    data_dir = tempfile.mkdtemp(prefix='pinterest-benchmark-')
+    try:
+        latencies = []
+        client = make_client(server, data_dir)
+        client.metrics.callback = lambda observation: latencies.append(observation['latency'])
+        started = time.perf_counter()
+        scenario(client, dataset)
+        elapsed = time.perf_counter() - started
+        client.flush()
+        writes = client.registry.writes
+        client.transport.close()
+
+        client = make_client(server, data_dir)
+        tracemalloc.start()
+        scenario(client, dataset)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        client.transport.close()
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    return {
+        'requests': len(latencies),
+        'seconds': round(elapsed, 4),
+        'requests_per_second': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'peak_memory_kb': round(peak / 1024.0, 1),
+        'registry_writes': writes,
+    }
+
+
+def compare(results, baseline):
+    """
+    Return the regressions of `results` over `baseline`
+    :rtype: list
+    """
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get('scenarios', {}).get(name)
+        if not before:
+            continue
+        for metric, tolerance in TOLERANCE.items():
+            old, new = before[metric], result[metric]
+            if tolerance < 0:
+                regressed = new < old * (1 + tolerance)
+            else:
+                regressed = new > old * (1 + tolerance) and new > old
+            if regressed:
+                regressions.append('%s: %s %s -> %s' % (name, metric, old, new))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--save', action='store_true',
+                        help='record the results as the new baseline')
+    parser.add_argument('--baseline', default=BASELINE, help='baseline file')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds the mock server waits before each response')
+    parser.add_argument('--only', action='append', help='run only this scenario (repeatable)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs of each scenario, the median is kept')
+    args = parser.parse_args()
+
+    dataset = Dataset()
+    results = {}
+    with MockServer(dataset, latency=args.latency) as server:
+        for name, scenario in SCENARIOS:
+            if args.only and name not in args.only:
+                continue
+            results[name] = run_scenario(server, dataset, scenario, args.repeat)
+            print('%-28s %s' % (name, json.dumps(results[name])))
+
+    if args.save:
+        scenarios = results
+        if args.only and os.path.isfile(args.baseline):
+            # Only the scenarios run are recorded again
+            with open(args.baseline) as f:
+                scenarios = dict(json.load(f).get('scenarios', {}), **results)
+        with open(args.baseline, 'w') as f:
+            json.dump({'python': platform.python_version(), 'platform': platform.platform(),
+                       'latency': args.latency, 'repeat': args.repeat,
+                       'dataset': dataset.to_dict(),
+                       'scenarios': scenarios}, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print('Baseline saved to %s' % args.baseline)
+        return 0
+    if os.path.isfile(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f))
+        for regression in regressions:
+            print('REGRESSION %s' % regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
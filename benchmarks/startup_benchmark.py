@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Import and client construction cost, as paid by short-lived workers.
+
+    python benchmarks/startup_benchmark.py
+    python benchmarks/startup_benchmark.py --runs 20 --max-import-ms 200
+
+Every run is a fresh interpreter that imports pinterest and creates a
+Pinterest client on an empty data directory. Reported are the median and
+worst import and construction times, the modules the import pulled in that
+should wait for their first use, and the files found once the interpreter
+exited. The benchmark fails when a lazy module was imported, a file was written,
+or the median times exceed the given limits.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Only needed to upload images, by async clients and by SQLite registries
+LAZY_MODULES = ('requests_toolbelt', 'asyncio', 'sqlite3')
+
+_PROBE = '''
+import json, sys, time
+sys.path.insert(0, %(root)r)
+started = time.perf_counter()
+import pinterest
+imported = time.perf_counter()
+client = pinterest.Pinterest('startup@example.com', 'password', data_dir=%(data_dir)r)
+constructed = time.perf_counter()
+print(json.dumps({'import_ms': (imported - started) * 1000,
+                  'construct_ms': (constructed - imported) * 1000,
+                  'lazy_modules': [name for name in %(lazy)r if name in sys.modules]}))
+'''
+
+
+def run_once():
+    data_dir = tempfile.mkdtemp(prefix='pinterest-startup-')
+    try:
+        probe = _PROBE % {'root': ROOT, 'data_dir': data_dir, 'lazy': LAZY_MODULES}
+        output = subprocess.check_output([sys.executable, '-c', probe])
+        run = json.loads(output.decode('utf-8').strip().splitlines()[-1])
+        # Counted once the interpreter exited, after the atexit flushes
+        run['files_written'] = sum(len(names) for _, _, names in os.walk(data_dir))
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    return run
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--runs', type=int, default=10, help='fresh interpreters to start')
+    parser.add_argument('--max-import-ms', type=float,
+                        help='fail above this median import time')
+    parser.add_argument('--max-construct-ms', type=float, default=10.0,
+                        help='fail above this median construction time')
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    result = {
+        'import_ms': round(median([run['import_ms'] for run in runs]), 2),
+        'import_max_ms': round(max(run['import_ms'] for run in runs), 2),
+        'construct_ms': round(median([run['construct_ms'] for run in runs]), 3),
+        'construct_max_ms': round(max(run['construct_ms'] for run in runs), 3),
+        'lazy_modules': sorted(set(name for run in runs for name in run['lazy_modules'])),
+        'files_written': max(run['files_written'] for run in runs),
+    }
+    print(json.dumps(result))
+
+    failures = []
+    if result['lazy_modules']:
+        failures.append('imported on startup: %s' % ', '.join(result['lazy_modules']))
+    if result['files_written']:
+        failures.append('%d files written without any call' % result['files_written'])
+    if args.max_import_ms is not None and result['import_ms'] > args.max_import_ms:
+        failures.append('import_ms %s > %s' % (result['import_ms'], args.max_import_ms))
+    if args.max_construct_ms is not None and result['construct_ms'] > args.max_construct_ms:
+        failures.append('construct_ms %s > %s'
+                        % (result['construct_ms'], args.max_construct_ms))
+    for failure in failures:
+        print('REGRESSION %s' % failure)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
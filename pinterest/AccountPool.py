@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pinterest.exceptions import PinterestException
+from pinterest.exceptions import PinterestLoginFailedException
+from pinterest.exceptions import PinterestLoginRequiredException
+from pinterest.Pinterest import Pinterest
+from pinterest.utils import parse_retry_after
+
+
+class _Account:
+    """
+    Health and load of one client of an AccountPool
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.in_flight = 0
+        self.calls = 0
+        self.errors = 0
+        self.login_failures = 0
+        self.logging_in = False
+        self.unavailable_until = 0.0
+        self.last_error = None
+
+    def status(self):
+        return {
+            'username_or_email': self.client.username_or_email,
+            'logged_in': self.client.is_logged_in,
+            'in_flight': self.in_flight,
+            'calls': self.calls,
+            'errors': self.errors,
+            'login_failures': self.login_failures,
+            'unavailable_for': max(0.0, self.unavailable_until - time.time()),
+            'last_error': self.last_error,
+        }
+
+
+class AccountPool:
+    """
+    Many Pinterest clients, each logged in to its own account, handed out
+    to callers so work spreads across accounts.
+
+    Clients are logged in lazily on first use, or all at once in parallel
+    with login_all(). Each call goes to the least loaded healthy client: a
+    client that was rate limited rests for `cooldown` seconds (or its
+    Retry-After), and a client whose login failed `max_login_failures`
+    times is left out for good.
+    """
+
+    def __init__(self, clients, max_login_failures=3, cooldown=300.0):
+        self.max_login_failures = max_login_failures
+        self.cooldown = cooldown
+        self.__accounts = [_Account(client) for client in clients]
+        self.__condition = threading.Condition()
+
+    @classmethod
+    def from_credentials(cls, credentials, client_class=Pinterest, max_login_failures=3,
+                         cooldown=300.0, **client_kwargs):
+        """
+        Build a pool from (username_or_email, password) pairs. Extra keyword
+        arguments (transport, rate_limiter...) are given to every client.
+        :rtype: AccountPool
+        """
+        clients = [client_class(username_or_email, password, **client_kwargs)
+                   for username_or_email, password in credentials]
+        return cls(clients, max_login_failures=max_login_failures, cooldown=cooldown)
+
+    @property
+    def clients(self):
+        return [account.client for account in self.__accounts]
+
+    def __len__(self):
+        return len(self.__accounts)
+
+    def status(self):
+        """
+        Return the health and load of every client
+        :rtype: list
+        """
+        with self.__condition:
+            return [account.status() for account in self.__accounts]
+
+    def login_all(self, max_workers=8):
+        """
+        Log in every client not logged in yet, `max_workers` at a time.
+        Return the number of clients logged in.
+        :rtype: int
+        """
+        with self.__condition:
+            accounts = [account for account in self.__accounts
+                        if self.__usable(account) and not account.client.is_logged_in
+                        and not account.logging_in]
+            for account in accounts:
+                account.logging_in = True
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(self.__login, accounts))
+        return sum(1 for account in self.__accounts if account.client.is_logged_in)
+
+    def __usable(self, account, now=None):
+        return account.login_failures < self.max_login_failures and \
+            account.unavailable_until <= (now or time.time())
+
+    def __login(self, account):
+        """
+        Log in `account`, which the caller flagged as logging_in
+        :rtype: bool
+        """
+        try:
+            account.client.login()
+            error = None
+        except Exception as e:
+            error = e
+        with self.__condition:
+            account.logging_in = False
+            if error is None and account.client.is_logged_in:
+                account.login_failures = 0
+            else:
+                account.login_failures += 1
+                account.last_error = error
+                account.unavailable_until = time.time() + self.cooldown
+            self.__condition.notify_all()
+        return account.client.is_logged_in
+
+    def acquire(self, timeout=None):
+        """
+        Return the least loaded healthy client, logging it in if needed.
+        Call release() once done with it, or use session().
+        :rtype: pinterest.Pinterest
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            with self.__condition:
+                account = self.__pick()
+                while account is None:
+                    if not any(account.login_failures < self.max_login_failures
+                               for account in self.__accounts):
+                        raise PinterestException('No account of the pool can log in')
+                    wait = self.__next_available()
+                    if deadline is not None:
+                        remaining = deadline - time.time()
+                        if remaining <= 0:
+                            raise PinterestException('No healthy account available')
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self.__condition.wait(wait)
+                    account = self.__pick()
+                account.in_flight += 1
+                if account.client.is_logged_in:
+                    return account.client
+                account.logging_in = True
+            if self.__login(account):
+                return account.client
+            with self.__condition:
+                account.in_flight -= 1
+
+    def __pick(self):
+        now = time.time()
+        candidates = [account for account in self.__accounts
+                      if self.__usable(account, now) and not account.logging_in]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda account: (account.in_flight, account.calls))
+
+    def __next_available(self):
+        """
+        Seconds until a resting client becomes usable again, None if none is resting
+        """
+        now = time.time()
+        waits = [account.unavailable_until - now for account in self.__accounts
+                 if account.login_failures < self.max_login_failures
+                 and account.unavailable_until > now]
+        return max(0.01, min(waits)) if waits else None
+
+    def release(self, client, error=None):
+        """
+        Give back a client from acquire(), with the exception its call
+        raised if any
+        """
+        with self.__condition:
+            account = self.__account(client)
+            account.in_flight -= 1
+            account.calls += 1
+            if error is not None:
+                account.errors += 1
+                account.last_error = error
+                response = getattr(error, 'response', None)
+                status_code = getattr(response, 'status_code', None)
+                if status_code == 429:
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    rest = retry_after if retry_after is not None else self.cooldown
+                    account.unavailable_until = time.time() + rest
+                elif isinstance(error, (PinterestLoginRequiredException,
+                                        PinterestLoginFailedException)):
+                    client.is_logged_in = False
+            self.__condition.notify_all()
+
+    def __account(self, client):
+        for account in self.__accounts:
+            if account.client is client:
+                return account
+        raise PinterestException('Client not in this pool')
+
+    @contextlib.contextmanager
+    def session(self, timeout=None):
+        """
+        Context manager acquiring and releasing a client
+        """
+        client = self.acquire(timeout)
+        try:
+            yield client
+        except Exception as e:
+            self.release(client, e)
+            raise
+        self.release(client)
+
+    def call(self, method, *args, **kwargs):
+        """
+        Call a method of the least loaded healthy client
+        """
+        with self.session() as client:
+            return getattr(client, method)(*args, **kwargs)
+
+    def map(self, method, operations, max_workers=None):
+        """
+        Call `method` once per operation, spread over the clients. An
+        operation is a dict of keyword arguments, a tuple or list of
+        positional arguments, or a single argument. Return the results in
+        order; an operation that failed gets its exception as result.
+        :rtype: list
+        """
+        def run(operation):
+            try:
+                if isinstance(operation, dict):
+                    return self.call(method, **operation)
+                if isinstance(operation, (tuple, list)):
+                    return self.call(method, *operation)
+                return self.call(method, operation)
+            except Exception as e:
+                return e
+
+        max_workers = max_workers or max(1, len(self.__accounts))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(run, operations))
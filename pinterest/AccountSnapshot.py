@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import pickle
+import zlib
+from pinterest.utils import write_atomic
+
+PIN_FIELDS = ('description', 'image', 'link', 'title')
+
+
+def pin_checksum(pin):
+    """
+    Return a checksum of the fields of a pin, used to detect edited pins
+    :rtype: int
+    """
+    fields = [pin.get(field) for field in PIN_FIELDS]
+    return zlib.crc32(json.dumps(fields).encode('utf-8'))
+
+
+class SyncDelta:
+    """
+    Changes found by Pinterest.sync_user_pins(). Each list holds dicts:
+    boards and sections as returned by boards() and sections(), pins as
+    {'board_id', 'section_id', 'pin'} (or 'pin_id' for removed pins).
+    """
+
+    def __init__(self):
+        self.boards_added = []
+        self.boards_removed = []
+        self.boards_changed = []
+        self.sections_added = []
+        self.sections_removed = []
+        self.sections_changed = []
+        self.pins_added = []
+        self.pins_removed = []
+        self.pins_changed = []
+
+    def is_empty(self):
+        return not any((self.boards_added, self.boards_removed, self.boards_changed,
+                        self.sections_added, self.sections_removed, self.sections_changed,
+                        self.pins_added, self.pins_removed, self.pins_changed))
+
+    def to_dict(self):
+        return {
+            'boards': {'added': self.boards_added, 'removed': self.boards_removed,
+                       'changed': self.boards_changed},
+            'sections': {'added': self.sections_added, 'removed': self.sections_removed,
+                         'changed': self.sections_changed},
+            'pins': {'added': self.pins_added, 'removed': self.pins_removed,
+                     'changed': self.pins_changed},
+        }
+
+    def __repr__(self):
+        return 'SyncDelta(boards +%d -%d ~%d, sections +%d -%d ~%d, pins +%d -%d ~%d)' % (
+            len(self.boards_added), len(self.boards_removed), len(self.boards_changed),
+            len(self.sections_added), len(self.sections_removed), len(self.sections_changed),
+            len(self.pins_added), len(self.pins_removed), len(self.pins_changed))
+
+
+class AccountSnapshot:
+    """
+    What the last sync saw of an account: its boards and sections with
+    their counts, and the ids and checksums of the pins of every feed, in
+    feed order (newest first).
+
+    {'boards': {board_id: {'board': {...}, 'pins': [[pin_id, checksum], ...],
+                           'sections': {section_id: {'section': {...},
+                                                     'pins': [...]}}}}}
+    """
+
+    def __init__(self, data=None):
+        self.data = data if data is not None else {'boards': {}}
+
+    @property
+    def boards(self):
+        return self.data['boards']
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a snapshot saved by save(), or return an empty one
+        :rtype: AccountSnapshot
+        """
+        if os.path.isfile(path):
+            with open(path, 'rb') as f:
+                return cls(pickle.load(f))
+        return cls()
+
+    def save(self, path):
+        write_atomic(path, self.data)
+
+    @staticmethod
+    def diff_feed(feed, known, growth=None):
+        """
+        Walk a pin feed against the pins known from the last sync.
+
+        Pins are newest first, so once a known pin shows up every pin after
+        it is known too. When the pins added so far account for all the
+        `growth` of the feed (its pin count difference), nothing was
+        removed and the walk stops there. Otherwise the whole feed is
+        walked to find removed and edited pins.
+
+        :param known: [[pin_id, checksum], ...] of the last sync
+        :return: (added pins, removed pin ids, changed pins, new known list)
+        :rtype: tuple
+        """
+        checksums = dict((pin_id, checksum) for pin_id, checksum in known)
+        added = []
+        changed = []
+        seen = []
+        for pin in feed:
+            checksum = pin_checksum(pin)
+            if pin['id'] in checksums:
+                if not seen or len(seen) == len(added):
+                    if growth is not None and len(added) == growth:
+                        entries = [[p['id'], pin_checksum(p)] for p in added]
+                        return added, [], [], entries + list(known)
+                if checksums[pin['id']] != checksum:
+                    changed.append(pin)
+            else:
+                added.append(pin)
+            seen.append([pin['id'], checksum])
+        seen_ids = set(pin_id for pin_id, checksum in seen)
+        removed = [pin_id for pin_id, checksum in known if pin_id not in seen_ids]
+        return added, removed, changed, seen
@@ -0,0 +1,624 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import os
+import time
+import uuid
+import requests
+import requests.cookies
+from pinterest.exceptions import PinterestException
+from pinterest.exceptions import PinterestRequestException
+from pinterest import Registry
+from pinterest.Pinterest import PinterestBase
+from pinterest.BulkExecutor import AsyncBulkExecutor
+from pinterest.BulkExecutor import BulkResult
+from pinterest.FeedIterator import AsyncFeedIterator
+from pinterest.FeedIterator import AsyncPrefetchFeedIterator
+from pinterest.ResourceResponse import ResourceResponse
+from pinterest.utils import async_extract_script
+from pinterest.utils import parse_retry_after
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncResponse:
+    """
+    Body and status of a finished aiohttp response
+    """
+
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class AsyncPinterest(PinterestBase):
+    """
+    asyncio version of Pinterest. It has the same methods, as coroutines,
+    and shares payload building and response parsing with Pinterest.
+
+    Requires aiohttp. Several clients can share one aiohttp.ClientSession:
+    cookies are kept per client and never stored in the session.
+    """
+
+    def __init__(self, username_or_email, password,
+                 proxies=None, agent_string=None, write_behind=True,
+                 data_dir=None, registry=None, rate_limiter=None,
+                 retry_policy=None, response_cache=None, upload_cache=None,
+                 metrics=None, json_codec=None, login_delay=(2.0, 3.0),
+                 search_cursors=None, session=None, max_concurrency=None):
+        """
+        :param session: aiohttp.ClientSession to send the requests with.
+            When omitted the client creates its own, closed by close().
+        :param max_concurrency: maximum number of requests of this client
+            in flight at the same time
+        """
+        if aiohttp is None:
+            raise PinterestException('AsyncPinterest requires aiohttp')
+        PinterestBase.__init__(self, username_or_email, password,
+                               proxies=proxies, agent_string=agent_string,
+                               write_behind=write_behind, data_dir=data_dir,
+                               registry=registry, rate_limiter=rate_limiter,
+                               retry_policy=retry_policy,
+                               response_cache=response_cache,
+                               upload_cache=upload_cache,
+                               metrics=metrics, json_codec=json_codec,
+                               login_delay=login_delay,
+                               search_cursors=search_cursors)
+        self.session = session
+        self.__own_session = session is None
+        self.__semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        if self.__own_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+        self.registry.flush()
+
+    def flush(self):
+        """
+        Write any pending registry changes (cookies, user agent) to disk
+        :rtype: bool
+        """
+        return self.registry.flush()
+
+    async def request(self, method, url, data=None, headers=None, ajax=False, script=None):
+        """
+        :param script: marker of a script of an html page. Only that script
+            is read, see extract_script(), and given as the content of the
+            response, and the connection is closed as soon as it is read.
+        :rtype: AsyncResponse
+        """
+        if self.session is None:
+            self.session = aiohttp.ClientSession(cookie_jar=aiohttp.DummyCookieJar())
+        csrftoken = None
+        if ajax:
+            csrftoken = self.cookies.get('csrftoken', domain=self.host)
+        _headers = self._headers(method, ajax=ajax, headers=headers,
+                                 csrftoken=csrftoken)
+        if isinstance(data, aiohttp.FormData):
+            # Let aiohttp write the multipart boundary
+            del _headers['Content-Type']
+        cookie_header = requests.cookies.get_cookie_header(
+            self.cookies, requests.Request(method, url))
+        if cookie_header:
+            _headers['Cookie'] = cookie_header
+        proxy = None
+        if self.proxies:
+            proxy = self.proxies.get(url.split(':', 1)[0])
+
+        family = None
+        if self.rate_limiter is not None:
+            family = self.rate_limiter.family(method, url)
+        endpoint = None
+        if self.metrics is not None:
+            endpoint = self.metrics.endpoint(url)
+            sent = len(url) + self._body_size(data)
+        # A multipart body (image upload) can only be sent once
+        replayable = not isinstance(data, aiohttp.FormData)
+        policy = self.retry_policy
+        policy.record()
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            if family is not None:
+                wait = self.rate_limiter.reserve(family)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            connect_timeout, read_timeout = policy.timeout(started)
+            timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout,
+                                            sock_read=read_timeout)
+            error = None
+            if self.__semaphore is not None:
+                await self.__semaphore.acquire()
+            sent_at = time.monotonic()
+            try:
+                async with self.session.request(method, url, data=data,
+                                                headers=dict(_headers), proxy=proxy,
+                                                timeout=timeout) as r:
+                    if script is None:
+                        content = await r.read()
+                        received = len(content)
+                    else:
+                        content = await async_extract_script(
+                            r.content.iter_chunked(16384), script)
+                        received = int(r.headers.get('Content-Length') or 0)
+                    response = AsyncResponse(str(r.url), r.status, r.headers, content)
+                    cookies = [morsel for morsel in r.cookies.values()]
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+            finally:
+                if self.__semaphore is not None:
+                    self.__semaphore.release()
+            if endpoint is not None:
+                if error is None:
+                    self.metrics.observe(endpoint, method, response.status_code,
+                                         time.monotonic() - sent_at, sent, received,
+                                         retry=attempt > 0)
+                else:
+                    self.metrics.observe(endpoint, method, latency=time.monotonic() - sent_at,
+                                         sent=sent, error=error, retry=attempt > 0)
+
+            if error is not None:
+                if (replayable or policy.is_connect_error(error)) and \
+                        policy.should_retry(method, url, attempt, error=error):
+                    wait = policy.delay(attempt, started)
+                    if wait is not None:
+                        await asyncio.sleep(wait)
+                        attempt += 1
+                        continue
+                raise error
+
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if family is not None:
+                self.rate_limiter.update(family, response.status_code, retry_after)
+            if replayable and response.status_code >= 400 and \
+                    policy.should_retry(method, url, attempt,
+                                        status_code=response.status_code):
+                wait = policy.delay(attempt, started, retry_after)
+                if wait is not None:
+                    await asyncio.sleep(wait)
+                    attempt += 1
+                    continue
+            break
+
+        if response.status_code >= 400:
+            raise PinterestRequestException('[%s] %s' % (response.status_code, url),
+                                            response=response)
+        if cookies:
+            jar = requests.cookies.RequestsCookieJar()
+            for morsel in cookies:
+                cookie = requests.cookies.morsel_to_cookie(morsel)
+                if not cookie.domain:
+                    cookie.domain = self.host
+                jar.set_cookie(cookie)
+            self.cookies.update(jar)
+            self.registry.update(Registry.Key.COOKIES, jar)
+        return response
+
+    async def get(self, url, headers=None, ajax=False, script=None):
+        """
+        :rtype: AsyncResponse
+        """
+        return await self.request('GET', url=url, headers=headers, ajax=ajax, script=script)
+
+    async def post(self, url, data=None, headers=None, ajax=False):
+        """
+        :rtype: AsyncResponse
+        """
+        return await self.request('POST', url=url, data=data,
+                                  headers=headers, ajax=ajax)
+
+    async def __fetch_user_data(self):
+        """
+        Return the logged in user from the home page, None if not logged in
+        :rtype: dict|None
+        """
+        r = await self.get(self.home_page, script=b'jsInit1')
+        return self._user_data_from_script(r.content)
+
+    async def call_resource(self, resource, action, options, source_url, method=None):
+        """
+        Call a Pinterest resource, see Pinterest.call_resource()
+        :rtype: ResourceResponse
+        """
+        method = method or self._resource_method(action)
+        url, data = self._encode_resource_call(method, resource, action, options, source_url)
+        key, entry = self._cache_lookup(method, resource, options, source_url)
+        if entry is not None and entry.fresh():
+            return ResourceResponse(resource, action, options, entry.result, from_cache=True)
+        headers = entry.validators() if entry is not None else None
+        r = await self.request(method, url, data=data, headers=headers, ajax=True)
+        if r.status_code == 304 and entry is not None:
+            self.response_cache.refresh(key)
+            return ResourceResponse(resource, action, options, entry.result,
+                                    r.status_code, r.headers, from_cache=True)
+        response = ResourceResponse(resource, action, options,
+                                    self.json_codec.decode_resource(r.content),
+                                    r.status_code, r.headers)
+        self._cache_store(method, key, response)
+        return response
+
+    async def login(self, resume=True):
+        """
+        Login to pinterest site. If OK return True, see Pinterest.login()
+        :rtype: bool
+        """
+        if resume and await self.__resume_session():
+            return self.is_logged_in
+        self.user = await self.__fetch_user_data()
+        if self.user:
+            self.is_logged_in = True
+        else:
+            await asyncio.sleep(self.login_delay[0])
+            login_page = self.home_page + 'login/?referrer=home_page'
+            await self.get(login_page)
+            await asyncio.sleep(self.login_delay[1])
+            result = await self.call_resource(*self._login_request())
+            self._session_error(result)
+            self.user = await self.__fetch_user_data()
+            self.is_logged_in = True
+        self._remember_user(self.user)
+        return self.is_logged_in
+
+    async def __resume_session(self):
+        """
+        Reuse the saved session if the site still accepts it
+        :rtype: bool
+        """
+        user = self._resumable_user()
+        if user is None:
+            return False
+        try:
+            result = await self.call_resource(*self._session_probe_request())
+        except PinterestRequestException:
+            return False
+        if not self._session_probe_result(result, user):
+            return False
+        self.user = user
+        self.is_logged_in = True
+        return True
+
+    async def logout(self):
+        """
+        Logout from pinterest site. If OK return False
+        :rtype: bool
+        """
+        self.user = await self.__fetch_user_data()
+        if self.user:
+            self.is_logged_in = True
+            await asyncio.sleep(self.login_delay[1])
+            result = await self.call_resource(*self._logout_request())
+            self._session_error(result)
+            self.user = await self.__fetch_user_data()
+            self.is_logged_in = False
+            self._remember_user(None)
+        return self.is_logged_in
+
+    async def boards(self):
+        """
+        Return all boards of logged in user
+        :rtype: list
+        """
+        self.login_required()
+        return self._boards_result(await self.call_resource(*self._boards_request()))
+
+    async def create_board(self, name, description='', category='other',
+                           privacy='public', layout='default'):
+        self.login_required()
+        result = await self.call_resource(*self._create_board_request(
+            name, description, category, privacy, layout))
+        return self._create_board_result(result)
+
+    async def follow_board(self, board_id, board_url):
+        self.login_required()
+        result = await self.call_resource(*self._follow_board_request(
+            'create', board_id, board_url))
+        return self._resource_ok(result)
+
+    async def unfollow_board(self, board_id, board_url):
+        self.login_required()
+        result = await self.call_resource(*self._follow_board_request(
+            'delete', board_id, board_url))
+        return self._resource_ok(result)
+
+    async def follow_user(self, user_id, username):
+        self.login_required()
+        result = await self.call_resource(*self._follow_user_request(
+            'create', user_id, username))
+        return self._resource_ok(result)
+
+    async def unfollow_user(self, user_id, username):
+        self.login_required()
+        result = await self.call_resource(*self._follow_user_request(
+            'delete', user_id, username))
+        return self._resource_ok(result)
+
+    async def pin(self, board_id, image_url, description='', link='',
+                  share_facebook=False, share_twitter=False):
+        self.login_required()
+        result = await self.call_resource(*self._pin_request(
+            board_id, image_url, description, link, share_facebook, share_twitter))
+        return self._pin_result(result)
+
+    async def upload_pin(self, board_id, image_file, description='',
+                         share_facebook=False, share_twitter=False):
+        self.login_required()
+        image_url, key, uploaded = await self.__image_url(image_file)
+        if image_url is not None:
+            result = await self.call_resource(*self._upload_pin_request(
+                board_id, image_url, description, share_facebook, share_twitter))
+            self._uploaded_pin(key, result)
+            return self._pin_result(result)
+        return None
+
+    async def __image_url(self, image_file):
+        """
+        Return the url of `image_file` once uploaded or found in the upload
+        cache, its upload cache key and whether it was uploaded now, see
+        Pinterest.upload_pin()
+        :rtype: tuple
+        """
+        key = None
+        if self.upload_cache is not None:
+            # Hashing reads the whole file, keep it off the event loop
+            key = await asyncio.get_running_loop().run_in_executor(
+                None, self.upload_cache.key, image_file)
+            image_url = self.upload_cache.get(key)
+            if image_url is not None:
+                return image_url, key, False
+        uploaded_image = await self.__upload_image(image_file)
+        if uploaded_image.get('success') is not True:
+            return None, key, True
+        if key is not None:
+            self.upload_cache.put(key, uploaded_image['image_url'])
+        return uploaded_image['image_url'], key, True
+
+    async def __upload_image(self, image_file):
+        self.login_required()
+        file_name, mime_type = self._image_file_info(image_file)
+        with open(image_file, 'rb') as f:
+            m = aiohttp.FormData()
+            m.add_field('qquuid', '%s' % uuid.uuid4())
+            m.add_field('qqfilename', file_name)
+            m.add_field('img', f, filename=file_name, content_type=mime_type)
+            headers = {'X-UPLOAD-SOURCE': 'pinner_uploader'}
+            url = self._upload_image_url(file_name)
+            r = await self.post(url=url, data=m, headers=headers, ajax=True)
+        return self.json_codec.loads(r.content)
+
+    async def upload_pins(self, board_id, files, description='', max_concurrency=4,
+                          callback=None, progress=None):
+        """
+        Upload many image files and pin them to a board, see
+        Pinterest.upload_pins(). At most max_concurrency images are
+        uploaded at the same time; pin creations do not count against it.
+        :rtype: list of BulkResult
+        """
+        self.login_required()
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(index, operation):
+            result = BulkResult(index, operation)
+            started = time.time()
+            options = self._upload_options(operation, description)
+            try:
+                async with semaphore:
+                    result.data = {'size': os.path.getsize(options['image_file'])}
+                    image_url, key, uploaded = await self.__image_url(options['image_file'])
+                result.data['uploaded'] = uploaded
+                if image_url is not None:
+                    data = result.data
+                    data['image_url'] = image_url
+                    response = await self.call_resource(*self._upload_pin_request(
+                        board_id, image_url, options['description'],
+                        options['share_facebook'], options['share_twitter']))
+                    self._uploaded_pin(key, response)
+                    result.set_response(response)
+                    result.data = data
+                else:
+                    result.error = 'Image upload failed'
+            except Exception as e:
+                result.set_exception(e)
+            result.latency = time.time() - started
+            return result
+
+        # Pin creations overlap the uploads of the next files
+        executor = AsyncBulkExecutor(max_tasks=max(1, max_concurrency) * 2,
+                                     callback=self._upload_progress(callback, progress))
+        return await executor.run_tasks(run, files)
+
+    async def repin(self, board_id, pin_id, link='', title='', description='',
+                    share_facebook=False, share_twitter=False):
+        """
+        Save this Pin to a Board. For 'save button'
+        """
+        self.login_required()
+        result = await self.call_resource(*self._repin_request(board_id, pin_id, link, title,
+                                                               description, share_facebook,
+                                                               share_twitter))
+        return self._pin_result(result)
+
+    async def like(self, pin_id):
+        self.login_required()
+        result = await self.call_resource(*self._like_request('create', pin_id))
+        return self._resource_ok(result)
+
+    async def undo_like(self, pin_id):
+        self.login_required()
+        result = await self.call_resource(*self._like_request('delete', pin_id))
+        return self._resource_ok(result)
+
+    async def delete_pin(self, pin_id):
+        self.login_required()
+        return self._resource_ok(await self.call_resource(*self._delete_pin_request(pin_id)))
+
+    async def comment(self, pin_id, text):
+        self.login_required()
+        result = await self.call_resource(*self._comment_request(pin_id, text))
+        return self._comment_result(result)
+
+    async def delete_comment(self, pin_id, comment_id):
+        self.login_required()
+        result = await self.call_resource(*self._delete_comment_request(pin_id, comment_id))
+        return self._resource_ok(result)
+
+    async def invite(self, board_id, board_url, user_id):
+        self.login_required()
+        result = await self.call_resource(*self._invite_request(board_id, board_url, user_id))
+        return self._resource_ok(result)
+
+    async def delete_invite(self, board_id, board_url, invited_user_id, also_block=False):
+        self.login_required()
+        result = await self.call_resource(*self._delete_invite_request(
+            board_id, board_url, invited_user_id, also_block))
+        return self._resource_ok(result)
+
+    async def search(self, scope, query, next_page=False):
+        """
+        Return a page of results of a search, see Pinterest.search()
+        :rtype: list
+        """
+        if next_page is True and self._has_next_page(scope, query):
+            r = await self.call_resource(*self._search_next_page_request(scope, query))
+            return self._search_next_page_result(r, scope, query)
+        r = await self.get(self._search_url(scope, query), script=b'application/json')
+        return self._search_script_result(r.content, scope, query)
+
+    async def search_boards(self, query, next_page=False):
+        results = await self.search('boards', query, next_page=next_page)
+        return self._search_boards_result(results)
+
+    async def search_pins(self, query, next_page=False):
+        results = await self.search('pins', query, next_page=next_page)
+        return self._search_pins_result(results)
+
+    async def search_users(self, query, next_page=False):
+        results = await self.search('people', query, next_page=next_page)
+        return self._search_users_result(results)
+
+    def iter_search_boards(self, query, limit=None, prefetch=1, bookmarks=None):
+        """
+        Iterate asynchronously over the boards found by a search
+        :rtype: AsyncPrefetchFeedIterator
+        """
+        return self.__iter_search('boards', query, self._search_boards_result,
+                                  limit, prefetch, bookmarks)
+
+    def iter_search_pins(self, query, limit=None, prefetch=1, bookmarks=None):
+        """
+        Iterate asynchronously over the pins found by a search, see
+        Pinterest.iter_search_pins()
+        :rtype: AsyncPrefetchFeedIterator
+        """
+        return self.__iter_search('pins', query, self._search_pins_result,
+                                  limit, prefetch, bookmarks)
+
+    def iter_search_users(self, query, limit=None, prefetch=1, bookmarks=None):
+        """
+        Iterate asynchronously over the users found by a search
+        :rtype: AsyncPrefetchFeedIterator
+        """
+        return self.__iter_search('people', query, self._search_users_result,
+                                  limit, prefetch, bookmarks)
+
+    def __iter_search(self, scope, query, parse, limit, prefetch, bookmarks):
+        async def fetch_page(page):
+            if page:
+                r = await self.call_resource(*self._search_page_request(scope, query, page))
+                results, next_page = self._search_page_result(r)
+            else:
+                r = await self.get(self._search_url(scope, query), script=b'application/json')
+                results, next_page = self._search_script_page(r.content)
+            return parse(results), next_page
+        return AsyncPrefetchFeedIterator(fetch_page, bookmarks, prefetch=prefetch,
+                                         limit=limit)
+
+    def iter_sections(self, tablero, bookmarks=None):
+        """
+        Iterate asynchronously over the sections of a board
+        :rtype: AsyncFeedIterator
+        """
+        self.login_required()
+
+        async def fetch_page(page):
+            response = await self.call_resource(*self._sections_request(tablero, page))
+            return self._sections_result(response)
+        return AsyncFeedIterator(fetch_page, bookmarks)
+
+    def iter_board_pins(self, tablero, bookmarks=None):
+        """
+        Iterate asynchronously over the pins of a board (not from the sections)
+        :rtype: AsyncFeedIterator
+        """
+        self.login_required()
+
+        async def fetch_page(page):
+            response = await self.call_resource(*self._pins_board_request(tablero, page))
+            return self._pins_result(response)
+        return AsyncFeedIterator(fetch_page, bookmarks)
+
+    def iter_section_pins(self, tablero, seccion, bookmarks=None):
+        """
+        Iterate asynchronously over the pins of a section
+        :rtype: AsyncFeedIterator
+        """
+        self.login_required()
+
+        async def fetch_page(page):
+            response = await self.call_resource(
+                *self._pins_section_request(tablero, seccion, page))
+            return self._pins_result(response)
+        return AsyncFeedIterator(fetch_page, bookmarks)
+
+    async def sections(self, tablero):
+        """
+        Return all sections from a board
+        """
+        return [section async for section in self.iter_sections(tablero)]
+
+    async def pins_board(self, tablero):
+        """
+        Return all pines from a board (not from the sections)
+        """
+        return [pin async for pin in self.iter_board_pins(tablero)]
+
+    async def pins_section(self, tablero, seccion):
+        """
+        Return all pins of a section (from a board)
+        """
+        return [pin async for pin in self.iter_section_pins(tablero, seccion)]
+
+    async def fetch_user_pins(self):
+        """
+        Return all boards, sections and pins from the logged user with
+        extra information. Boards and sections are crawled concurrently,
+        bounded by max_concurrency.
+        """
+        boards = await self.boards()
+
+        async def fetch_board(board):
+            pins, sections = await asyncio.gather(self.pins_board(board),
+                                                  self.sections(board))
+            board['pins'] = pins
+            section_pins = await asyncio.gather(*[self.pins_section(board, section)
+                                                  for section in sections])
+            for section, pins in zip(sections, section_pins):
+                section['pins'] = pins
+            board['sections'] = sections
+
+        await asyncio.gather(*[fetch_board(board) for board in boards])
+        return boards
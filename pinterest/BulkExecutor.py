@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+
+
+class BulkResult:
+    """
+    Outcome of one operation of a bulk call
+    """
+    __slots__ = ('index', 'operation', 'success', 'id', 'error_code',
+                 'error', 'latency', 'data')
+
+    def __init__(self, index, operation, success=False, id=None,
+                 error_code=None, error=None, latency=0.0, data=None):
+        self.index = index
+        self.operation = operation
+        self.success = success
+        self.id = id
+        self.error_code = error_code
+        self.error = error
+        self.latency = latency
+        self.data = data
+
+    def __repr__(self):
+        return 'BulkResult(index=%r, success=%r, id=%r, error_code=%r, latency=%.3f)' % \
+               (self.index, self.success, self.id, self.error_code, self.latency)
+
+    def set_response(self, response):
+        """
+        Record the outcome of the ResourceResponse of the operation
+        """
+        error = response.error
+        data = response.data
+        self.data = data
+        if error is None:
+            self.success = True
+            if isinstance(data, dict):
+                self.id = data.get('id')
+        else:
+            self.error = error.get('message')
+            self.error_code = error.get('code', error.get('http_status'))
+
+    def set_exception(self, e):
+        """
+        Record the exception the operation raised, with the HTTP status of
+        its response if any
+        """
+        self.error = e
+        self.error_code = getattr(getattr(e, 'response', None), 'status_code', None)
+
+
+class BulkExecutor:
+    """
+    Run many resource calls with a bounded number of workers, starting at
+    most one call every `interval` seconds. A failing operation is reported
+    in its BulkResult and never stops the batch.
+    """
+
+    def __init__(self, max_workers=4, interval=0.0, callback=None):
+        """
+        :param callback: called with each BulkResult as soon as it is ready
+        """
+        self.max_workers = max_workers
+        self.interval = interval
+        self.callback = callback
+        self.__lock = threading.Lock()
+        self.__next_start = 0.0
+
+    def run(self, call, operations):
+        """
+        Call `call` once per operation. An operation is a dict of keyword
+        arguments, a tuple or list of positional arguments, or a single
+        argument. `call` returns the ResourceResponse of the call.
+        :rtype: list
+        """
+        return self.run_tasks(lambda index, operation: self.__run_one(call, index, operation),
+                              operations)
+
+    def run_tasks(self, task, operations):
+        """
+        Run `task(index, operation)` in the workers once per operation and
+        return the BulkResults it returns, sorted by index. A task may
+        return instead the Future of a BulkResult still being worked on,
+        e.g. by another executor, which is then waited for.
+        :rtype: list
+        """
+        results = []
+        # Keep a bounded window of submitted operations so huge iterables
+        # are consumed lazily.
+        window = max(1, self.max_workers) * 2
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = set()
+            for index, operation in enumerate(operations):
+                pending.add(executor.submit(task, index, operation))
+                while len(pending) >= window:
+                    pending = self.__collect(pending, results)
+            while pending:
+                pending = self.__collect(pending, results)
+        results.sort(key=lambda result: result.index)
+        return results
+
+    def __collect(self, pending, results):
+        """
+        Wait for the first of the `pending` futures to finish and add the
+        results of the finished ones, in the order they finished
+        :rtype: set
+        """
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            result = future.result()
+            if isinstance(result, Future):
+                pending.add(result)
+                continue
+            results.append(result)
+            if self.callback:
+                self.callback(result)
+        return pending
+
+    def __pace(self):
+        if not self.interval:
+            return
+        with self.__lock:
+            now = time.time()
+            start = max(now, self.__next_start)
+            self.__next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+    def __run_one(self, call, index, operation):
+        self.__pace()
+        result = BulkResult(index, operation)
+        started = time.time()
+        try:
+            if isinstance(operation, dict):
+                response = call(**operation)
+            elif isinstance(operation, (tuple, list)):
+                response = call(*operation)
+            else:
+                response = call(operation)
+        except Exception as e:
+            result.set_exception(e)
+        else:
+            result.set_response(response)
+        result.latency = time.time() - started
+        return result
+
+
+class AsyncBulkExecutor:
+    """
+    asyncio version of BulkExecutor.run_tasks(): runs at most `max_tasks`
+    tasks at the same time
+    """
+
+    def __init__(self, max_tasks=8, callback=None):
+        """
+        :param callback: called with each BulkResult as soon as it is ready
+        """
+        self.max_tasks = max_tasks
+        self.callback = callback
+
+    async def run_tasks(self, task, operations):
+        """
+        Await `task(index, operation)` once per operation and return the
+        BulkResults it returns, sorted by index
+        :rtype: list
+        """
+        import asyncio
+        results = []
+        pending = set()
+        operations = enumerate(operations)
+        while True:
+            for index, operation in operations:
+                pending.add(asyncio.ensure_future(task(index, operation)))
+                if len(pending) >= self.max_tasks:
+                    break
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                results.append(result)
+                if self.callback:
+                    self.callback(result)
+        results.sort(key=lambda result: result.index)
+        return results
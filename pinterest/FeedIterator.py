@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+import queue
+import threading
+from pinterest.exceptions import PinterestException
+
+
+class FeedIterator:
+    """
+    Iterator over the items of a paginated Pinterest resource, fetching one
+    page at a time.
+
+    `bookmarks` are the bookmarks of the page being consumed and
+    `next_bookmarks` those of the page after it. Save either of them to
+    checkpoint a crawl and pass it back to the iter_* method to resume:
+    resuming from `bookmarks` repeats the items already seen in the current
+    page, resuming from `next_bookmarks` once a page is fully consumed
+    repeats nothing.
+    """
+    END = '-end-'
+
+    def __init__(self, fetch_page, bookmarks=None):
+        """
+        :param fetch_page: callable taking the bookmarks of a page and
+            returning the page items and the bookmarks of the next page
+        """
+        if isinstance(bookmarks, str):
+            bookmarks = [bookmarks]
+        self.bookmarks = list(bookmarks or [])
+        self.next_bookmarks = None
+        self.finished = False
+        self._fetch_page = fetch_page
+        self._items = iter(())
+        self._started = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while True:
+            for item in self._items:
+                return item
+            if self.finished or not self._advance():
+                self.finished = True
+                raise StopIteration
+            items, self.next_bookmarks = self._fetch_page(self.bookmarks)
+            self._items = iter(items)
+
+    next = __next__
+
+    def _advance(self):
+        """
+        Move to the next page. Return False when the feed is exhausted.
+        """
+        if not self._started:
+            self._started = True
+            return True
+        bookmarks = _next_page_bookmarks(self.next_bookmarks)
+        if bookmarks is None:
+            return False
+        self.bookmarks = bookmarks
+        return True
+
+
+class AsyncFeedIterator(FeedIterator):
+    """
+    Asynchronous FeedIterator, `fetch_page` being a coroutine function
+    """
+    __iter__ = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            for item in self._items:
+                return item
+            if self.finished or not self._advance():
+                self.finished = True
+                raise StopAsyncIteration
+            items, self.next_bookmarks = await self._fetch_page(self.bookmarks)
+            self._items = iter(items)
+
+
+class PrefetchFeedIterator(FeedIterator):
+    """
+    FeedIterator fetching the next pages in a background thread while the
+    current one is consumed, at most `prefetch` pages ahead, so the wait
+    for the network overlaps with the processing of the items.
+
+    `limit` stops the iteration after that many items. Call close(), or
+    drop the iterator, to stop fetching before the feed ends. An error
+    fetching a page is raised when the iteration reaches that page.
+    """
+
+    def __init__(self, fetch_page, bookmarks=None, prefetch=1, limit=None):
+        """
+        :param prefetch: pages fetched ahead of the one being consumed
+        """
+        FeedIterator.__init__(self, fetch_page, bookmarks)
+        self.prefetch = max(1, prefetch)
+        self.limit = limit
+        self.count = 0
+        self.__pages = None
+        self.__slots = None
+        self.__stop = threading.Event()
+        self.__thread = None
+
+    def __next__(self):
+        if self.limit is not None and self.count >= self.limit:
+            self.close()
+        while True:
+            for item in self._items:
+                self.count += 1
+                return item
+            if self.finished:
+                raise StopIteration
+            if self.__thread is None:
+                self.__pages = queue.Queue()
+                self.__slots = threading.Semaphore(self.prefetch)
+                self.__thread = threading.Thread(
+                    target=_prefetch,
+                    args=(self._fetch_page, self.bookmarks, self.__pages, self.__slots,
+                          self.__stop))
+                self.__thread.daemon = True
+                self.__thread.start()
+            page = self.__pages.get()
+            self.__slots.release()
+            _take_page(self, page)
+
+    next = __next__
+
+    def close(self):
+        """
+        Stop fetching pages and end the iteration
+        """
+        self.finished = True
+        self._items = iter(())
+        self.__stop.set()
+        if self.__slots is not None:
+            self.__slots.release()
+
+    def __del__(self):
+        self.__stop.set()
+
+
+class AsyncPrefetchFeedIterator(AsyncFeedIterator):
+    """
+    Asynchronous PrefetchFeedIterator, the next pages being fetched by a
+    task
+    """
+
+    def __init__(self, fetch_page, bookmarks=None, prefetch=1, limit=None):
+        AsyncFeedIterator.__init__(self, fetch_page, bookmarks)
+        self.prefetch = max(1, prefetch)
+        self.limit = limit
+        self.count = 0
+        self.__pages = None
+        self.__slots = None
+        self.__task = None
+
+    async def __anext__(self):
+        if self.limit is not None and self.count >= self.limit:
+            self.close()
+        while True:
+            for item in self._items:
+                self.count += 1
+                return item
+            if self.finished:
+                raise StopAsyncIteration
+            if self.__task is None:
+                # Only async clients pay for importing asyncio
+                import asyncio
+                self.__pages = asyncio.Queue()
+                self.__slots = asyncio.Semaphore(self.prefetch)
+                self.__task = asyncio.ensure_future(
+                    _async_prefetch(self._fetch_page, self.bookmarks, self.__pages,
+                                    self.__slots))
+            page = await self.__pages.get()
+            self.__slots.release()
+            _take_page(self, page)
+
+    def close(self):
+        """
+        Stop fetching pages and end the iteration
+        """
+        self.finished = True
+        self._items = iter(())
+        if self.__task is not None:
+            self.__task.cancel()
+
+
+# Put by the prefetchers after the last page
+_END = object()
+
+
+def _next_page_bookmarks(next_bookmarks):
+    """
+    Return the bookmarks of the next page as given by a page, None when the
+    feed ends there. A page without any, such as an answer missing its
+    'resource', is an error: reading it as the first page again would
+    never end.
+    :rtype: list|None
+    """
+    if next_bookmarks is None:
+        raise PinterestException('Feed page without the bookmarks of the next page')
+    if not next_bookmarks or next_bookmarks[0] == FeedIterator.END:
+        return None
+    return next_bookmarks
+
+
+def _take_page(iterator, page):
+    """
+    Make `page`, as put by a prefetcher, the page being consumed by
+    `iterator`
+    """
+    if page is _END:
+        iterator.finished = True
+        return
+    if isinstance(page, BaseException):
+        iterator.finished = True
+        raise page
+    iterator.bookmarks, items, iterator.next_bookmarks = page
+    iterator._items = iter(items)
+
+
+def _prefetch(fetch_page, bookmarks, pages, slots, stop):
+    """
+    Fetch the pages of a feed into the `pages` queue, each once a `slots`
+    slot is free. Holds no reference to the iterator, so dropping it stops
+    the thread.
+    """
+    try:
+        while bookmarks is not None:
+            while not slots.acquire(timeout=1.0):
+                if stop.is_set():
+                    return
+            if stop.is_set():
+                return
+            items, next_bookmarks = fetch_page(bookmarks)
+            pages.put((bookmarks, items, next_bookmarks))
+            bookmarks = _next_page_bookmarks(next_bookmarks)
+    except Exception as e:
+        pages.put(e)
+        return
+    pages.put(_END)
+
+
+async def _async_prefetch(fetch_page, bookmarks, pages, slots):
+    try:
+        while bookmarks is not None:
+            await slots.acquire()
+            items, next_bookmarks = await fetch_page(bookmarks)
+            pages.put_nowait((bookmarks, items, next_bookmarks))
+            bookmarks = _next_page_bookmarks(next_bookmarks)
+    except Exception as e:
+        pages.put_nowait(e)
+        return
+    pages.put_nowait(_END)
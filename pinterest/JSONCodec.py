@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+import json
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj):
+    # Models (Board, Pin...) are written as the dicts they stand for
+    to_dict = getattr(obj, 'to_dict', None)
+    if to_dict is None:
+        raise TypeError('Object of type %s is not JSON serializable' % type(obj).__name__)
+    return to_dict()
+
+
+_json_encoder = json.JSONEncoder(separators=(',', ':'), default=_default)
+_json_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r'\s*')
+_RESOURCE_RESPONSE = re.compile(r'\s*\{\s*"resource_response"\s*:\s*')
+_RESOURCE = re.compile(r'"resource"\s*:\s*(?=\{)')
+# What may follow the last member read at the top level: more members with
+# scalar values, then the end of the object
+_SCALAR = r'(?:"(?:[^"\\]|\\.)*"|-?[0-9][0-9.eE+-]*|true|false|null)'
+_TAIL = re.compile(r'\s*(?:,\s*"(?:[^"\\]|\\.)*"\s*:\s*%s\s*)*\}\s*\Z' % _SCALAR)
+
+
+class JSONCodec:
+    """
+    JSON encoding and decoding of the resource calls. Uses orjson when it
+    is installed and the json module otherwise.
+
+    With `lazy`, resource call answers are only decoded where the client
+    reads them: 'resource_response' (data and error) and 'resource' (the
+    options and their bookmarks). The rest of the answer, 'client_context'
+    with the site settings of the session, is skipped without being
+    parsed. Answers laid out differently are decoded in full. With orjson,
+    'resource_response' is cut out of the answer and decoded by orjson, so
+    lazy decoding only pays off when 'client_context' is large.
+    """
+    ORJSON = 'orjson'
+    JSON = 'json'
+
+    def __init__(self, backend=None, lazy=False):
+        """
+        :param backend: 'orjson' or 'json', defaults to orjson when it is
+            installed
+        """
+        if backend is None:
+            backend = self.ORJSON if orjson is not None else self.JSON
+        if backend == self.ORJSON and orjson is None:
+            raise ValueError('orjson is not installed')
+        if backend not in (self.ORJSON, self.JSON):
+            raise ValueError('Unknown JSON backend %r' % backend)
+        self.backend = backend
+        self.lazy = lazy
+
+    def __repr__(self):
+        return '<JSONCodec %s%s>' % (self.backend, ' lazy' if self.lazy else '')
+
+    def loads(self, content):
+        """
+        :param content: str or utf-8 bytes
+        """
+        if self.backend == self.ORJSON:
+            return orjson.loads(content)
+        return json.loads(content)
+
+    def dumps(self, obj):
+        """
+        Return the compact JSON of `obj`, models included
+        :rtype: str
+        """
+        if self.backend == self.ORJSON:
+            return orjson.dumps(obj, default=_default,
+                               option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        return _json_encoder.encode(obj)
+
+    def decode_resource(self, content):
+        """
+        Decode the answer of a resource call
+        :rtype: dict
+        """
+        if self.lazy:
+            result = self.__decode_partial(content)
+            if result is not None:
+                return result
+        return self.loads(content)
+
+    def __decode_partial(self, content):
+        """
+        Return the 'resource_response' and 'resource' members of an answer
+        laid out as the site does, resource_response first and resource
+        last but for scalar members, None for any other layout
+        :rtype: dict|None
+        """
+        text = content.decode('utf-8') if isinstance(content, bytes) else content
+        match = _RESOURCE_RESPONSE.match(text)
+        if match is None:
+            return None
+        if self.backend == self.ORJSON:
+            found = self.__decode_member(text, match.end())
+            if found is None:
+                return None
+            resource_response, end = found
+        else:
+            resource_response, end = self.__decode_value(text, match.end())
+        result = {'resource_response': resource_response}
+        resource = None
+        for resource in _RESOURCE.finditer(text, end):
+            pass
+        if resource is None:
+            return result if _TAIL.match(text, end) else None
+        value, end = self.__decode_value(text, resource.end())
+        if not _TAIL.match(text, end):
+            return None
+        result['resource'] = value
+        return result
+
+    @staticmethod
+    def __decode_member(text, start):
+        """
+        Decode with orjson the JSON value starting at `start` and return it
+        with the position of the top level member following it, None when
+        that member is not found. orjson cannot stop at the end of a value,
+        so the value is cut before the member, looked for from the end of
+        the answer so only the skipped members are scanned, and a cut that
+        does not decode is given up on.
+        :rtype: tuple|None
+        """
+        end = text.rfind('"resource"', start)
+        if end == -1:
+            return None
+        context = text.rfind('"client_context"', start, end)
+        if context != -1:
+            end = context
+        comma = text.rfind(',', start, end)
+        if comma == -1 or text[comma + 1:end].strip():
+            return None
+        try:
+            return orjson.loads(text[start:comma]), comma
+        except orjson.JSONDecodeError:
+            return None
+
+    @staticmethod
+    def __decode_value(text, start):
+        """
+        Decode the JSON value starting at `start` and return it with the
+        position following it. Used for 'resource', which is small, with
+        either backend and for every part with the json module.
+        :rtype: tuple
+        """
+        value, end = _json_decoder.raw_decode(text, start)
+        return value, _WHITESPACE.match(text, end).end()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import atexit
+import os
+import pickle
+import threading
+import weakref
+from collections import OrderedDict
+from pinterest.utils import write_atomic
+
+
+class LRUCache:
+    """
+    Base of ResponseCache and UploadCache: at most `max_entries` entries
+    in `_entries`, the least recently used evicted first, guarded by
+    `_lock`. With `path`, the entries are saved there on save() and at exit
+    and loaded back on start.
+    """
+
+    def __init__(self, max_entries, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if path:
+            if os.path.isfile(path):
+                with open(path, 'rb') as f:
+                    self._entries = self._load(pickle.load(f))
+            atexit.register(_save_at_exit, weakref.ref(self))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _load(self, entries):
+        """
+        Return the entries to keep of those saved to `path`
+        :rtype: OrderedDict
+        """
+        return OrderedDict(entries)
+
+    def _put(self, key, entry):
+        """
+        Store `entry` as the most recently used, evicting the least recently
+        used ones beyond `max_entries`. The caller holds `_lock`.
+        """
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def save(self):
+        if self.path:
+            with self._lock:
+                entries = OrderedDict(self._entries)
+            write_atomic(self.path, entries)
+
+
+def _save_at_exit(ref):
+    cache = ref()
+    if cache is not None:
+        cache.save()
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+import bisect
+import threading
+import urllib.parse
+
+
+class _EndpointStats:
+    """
+    Counters of one endpoint
+    """
+    __slots__ = ('requests', 'retries', 'errors', 'status_codes', 'buckets',
+                 'latency_sum', 'sent', 'received')
+
+    def __init__(self, bucket_count):
+        self.requests = 0
+        self.retries = 0
+        self.errors = {}
+        self.status_codes = {}
+        # One count per bucket bound plus one for +Inf, not cumulative
+        self.buckets = [0] * (bucket_count + 1)
+        self.latency_sum = 0.0
+        self.sent = 0
+        self.received = 0
+
+    def to_dict(self, bounds):
+        cumulative = []
+        count = 0
+        for bound, bucket in zip(bounds + (float('inf'),), self.buckets):
+            count += bucket
+            cumulative.append((bound, count))
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'errors': dict(self.errors),
+            'status_codes': dict(self.status_codes),
+            'latency_sum': self.latency_sum,
+            'latency_buckets': cumulative,
+            'bytes_sent': self.sent,
+            'bytes_received': self.received,
+        }
+
+
+class Metrics:
+    """
+    Request metrics per endpoint: latency histogram, bytes sent and
+    received, status codes, errors and retries. An endpoint is a resource
+    call such as 'BoardFeedResource/get' or a page such as 'search'.
+
+    Every HTTP attempt of the clients given this object is recorded, so a
+    retried call counts one request per attempt and one retry per attempt
+    after the first. One Metrics can be shared by many clients. Read it
+    with snapshot() or to_prometheus(), or pass a `callback` called with
+    every observation.
+    """
+    DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    # Counters of to_prometheus(): metric name, snapshot field, help text
+    COUNTERS = (
+        ('retries_total', 'retries', 'Request attempts that were retries.'),
+        ('request_bytes_total', 'bytes_sent', 'Bytes of request urls and bodies sent.'),
+        ('response_bytes_total', 'bytes_received', 'Bytes of response bodies received.'),
+    )
+
+    def __init__(self, buckets=None, callback=None, prefix='pinterest'):
+        """
+        :param buckets: upper bounds in seconds of the latency histogram
+        :param callback: called with a dict per request attempt: endpoint,
+            method, status_code, latency, bytes_sent, bytes_received, error
+            and retry
+        :param prefix: prefix of the Prometheus metric names
+        """
+        self.buckets = tuple(sorted(buckets or self.DEFAULT_BUCKETS))
+        self.callback = callback
+        self.prefix = prefix
+        self.__endpoints = {}
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def endpoint(url):
+        """
+        Return the endpoint name of an url: 'Resource/action' for resource
+        calls, the first path segment ('search', 'upload-image'...) or
+        'home' for other pages
+        :rtype: str
+        """
+        path = [part for part in urllib.parse.urlsplit(url).path.split('/') if part]
+        if len(path) > 2 and path[0] == 'resource':
+            return '%s/%s' % (path[1], path[2])
+        return path[0] if path else 'home'
+
+    def observe(self, endpoint, method, status_code=None, latency=0.0, sent=0,
+                received=0, error=None, retry=False):
+        """
+        Record one request attempt. `error` is the exception that prevented
+        a response, if any.
+        """
+        with self.__lock:
+            stats = self.__endpoints.get(endpoint)
+            if stats is None:
+                stats = self.__endpoints[endpoint] = _EndpointStats(len(self.buckets))
+            stats.requests += 1
+            if retry:
+                stats.retries += 1
+            if error is not None:
+                name = type(error).__name__
+                stats.errors[name] = stats.errors.get(name, 0) + 1
+            if status_code is not None:
+                stats.status_codes[status_code] = stats.status_codes.get(status_code, 0) + 1
+            stats.buckets[bisect.bisect_left(self.buckets, latency)] += 1
+            stats.latency_sum += latency
+            stats.sent += sent
+            stats.received += received
+        if self.callback is not None:
+            self.callback({'endpoint': endpoint, 'method': method,
+                           'status_code': status_code, 'latency': latency,
+                           'bytes_sent': sent, 'bytes_received': received,
+                           'error': error, 'retry': retry})
+
+    def snapshot(self):
+        """
+        Return the counters of every endpoint. Latency buckets are
+        cumulative (bound, count) pairs, the last bound being infinity.
+        :rtype: dict
+        """
+        with self.__lock:
+            return dict((endpoint, stats.to_dict(self.buckets))
+                        for endpoint, stats in self.__endpoints.items())
+
+    def reset(self):
+        with self.__lock:
+            self.__endpoints.clear()
+
+    def to_prometheus(self):
+        """
+        Return the metrics in the Prometheus text exposition format
+        :rtype: str
+        """
+        snapshot = self.snapshot()
+        prefix = self.prefix
+        lines = []
+
+        def header(name, kind, text):
+            lines.append('# HELP %s_%s %s' % (prefix, name, text))
+            lines.append('# TYPE %s_%s %s' % (prefix, name, kind))
+
+        header('requests_total', 'counter', 'Request attempts by endpoint and status code.')
+        for endpoint, stats in sorted(snapshot.items()):
+            for status_code, count in sorted(stats['status_codes'].items()):
+                lines.append('%s_requests_total{endpoint="%s",status="%s"} %d'
+                             % (prefix, _label(endpoint), status_code, count))
+        header('errors_total', 'counter', 'Request attempts that got no response, by error.')
+        for endpoint, stats in sorted(snapshot.items()):
+            for error, count in sorted(stats['errors'].items()):
+                lines.append('%s_errors_total{endpoint="%s",error="%s"} %d'
+                             % (prefix, _label(endpoint), _label(error), count))
+        for name, field, text in self.COUNTERS:
+            header(name, 'counter', text)
+            for endpoint, stats in sorted(snapshot.items()):
+                lines.append('%s_%s{endpoint="%s"} %d'
+                             % (prefix, name, _label(endpoint), stats[field]))
+        header('request_duration_seconds', 'histogram', 'Latency of request attempts.')
+        for endpoint, stats in sorted(snapshot.items()):
+            label = _label(endpoint)
+            for bound, count in stats['latency_buckets']:
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                lines.append('%s_request_duration_seconds_bucket{endpoint="%s",le="%s"} %d'
+                             % (prefix, label, le, count))
+            lines.append('%s_request_duration_seconds_sum{endpoint="%s"} %r'
+                         % (prefix, label, stats['latency_sum']))
+            lines.append('%s_request_duration_seconds_count{endpoint="%s"} %d'
+                         % (prefix, label, stats['requests']))
+        return '\n'.join(lines) + '\n'
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
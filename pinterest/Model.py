@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+import sys
+import threading
+import weakref
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class Model:
+    """
+    Compact record of a Pinterest object, kept in __slots__ instead of a
+    dict. It still reads like the dict it replaces: model['id'],
+    model.get('id'), 'id' in model, dict(model) and model == {...} all
+    work, and to_dict() returns plain dicts all the way down.
+
+    Fields the site did not send are left unset and are neither keys nor
+    part of to_dict().
+    """
+    __slots__ = ()
+    # Field order, which is also the key order of to_dict()
+    _fields = ()
+    # Fields with a handful of string values repeated across objects
+    # (privacy, layout). Interned strings stay in a table of the
+    # interpreter that only grows, so names, urls and usernames, which
+    # shared() already keeps once per board or user, are not interned.
+    _interned = ()
+
+    def __init__(self, **fields):
+        for name, value in fields.items():
+            self[name] = value
+
+    @classmethod
+    def shared(cls, **fields):
+        """
+        Return the instance holding `fields`, reusing the one already built
+        for equal fields. Used for the boards and users every pin refers to,
+        so a crawl keeps one object per board or pinner instead of one per
+        pin; do not change a shared instance in place.
+        """
+        # Nested models are shared too, so they are keyed on their identity
+        key = (cls, tuple(sorted((name, id(value) if isinstance(value, Model) else value)
+                                 for name, value in fields.items())))
+        with _shared_lock:
+            instance = _shared.get(key)
+            if instance is None:
+                instance = cls(**fields)
+                _shared[key] = instance
+        return instance
+
+    def __getitem__(self, key):
+        if key in self._fields:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self._fields:
+            raise KeyError(key)
+        if key in self._interned:
+            value = _intern(value)
+        setattr(self, key, value)
+
+    def __delitem__(self, key):
+        try:
+            delattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self._fields and hasattr(self, key)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __eq__(self, other):
+        if isinstance(other, Model):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self.to_dict())
+
+    def __getstate__(self):
+        # Slots have no __dict__ for pickle to save
+        return dict(self.items())
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            self[name] = value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def keys(self):
+        return [name for name in self._fields if hasattr(self, name)]
+
+    def values(self):
+        return [getattr(self, name) for name in self.keys()]
+
+    def items(self):
+        return [(name, getattr(self, name)) for name in self.keys()]
+
+    def to_dict(self):
+        """
+        Return the fields as plain dicts and lists, e.g. for json.dumps():
+        json.dumps(boards, default=Board.to_dict) serializes any model
+        :rtype: dict
+        """
+        return dict((name, _to_plain(value)) for name, value in self.items())
+
+
+def _to_plain(value):
+    if isinstance(value, Model):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_to_plain(item) for item in value]
+    return value
+
+
+class User(Model):
+    _fields = ('id', 'username', 'full_name', 'blocked_by_me', 'image_medium_url',
+               'followed_by_me', 'follower_count', 'pin_count', 'board_count')
+    __slots__ = _fields + ('__weakref__',)
+
+
+class Board(Model):
+    _fields = ('id', 'name', 'url', 'privacy', 'layout', 'followed_by_me', 'owner',
+               'description', 'section_count', 'pin_count', 'pins', 'sections', 'error')
+    _interned = ('privacy', 'layout')
+    __slots__ = _fields + ('__weakref__',)
+
+
+class Section(Model):
+    _fields = ('id', 'title', 'slug', 'pin_count', 'pins', 'error')
+    __slots__ = _fields
+
+
+class Pin(Model):
+    _fields = ('id', 'description', 'image', 'img', 'like_count', 'comment_count',
+               'repin_count', 'liked_by_me', 'link', 'title', 'is_video', 'board',
+               'pinner')
+    __slots__ = _fields
+
+
+_shared = weakref.WeakValueDictionary()
+_shared_lock = threading.Lock()
@@ -1,104 +1,261 @@
 # -*- coding: utf-8 -*-
-import json
-import mimetypes
+import functools
 import os
 import uuid
 import time
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
 import requests
 import requests.cookies
 from requests.structures import CaseInsensitiveDict
-from requests_toolbelt import MultipartEncoder
 from pinterest.exceptions import PinterestLoginFailedException
 from pinterest.exceptions import PinterestLoginRequiredException
-from pinterest.exceptions import PinterestException
 from pinterest import Registry
+from pinterest.AccountSnapshot import AccountSnapshot
+from pinterest.AccountSnapshot import SyncDelta
+from pinterest.BulkExecutor import BulkExecutor
+from pinterest.BulkExecutor import BulkResult
+from pinterest.FeedIterator import FeedIterator
+from pinterest.FeedIterator import PrefetchFeedIterator
+from pinterest.JSONCodec import JSONCodec
+from pinterest.Model import Board
+from pinterest.Model import Pin
+from pinterest.Model import Section
+from pinterest.Model import User
+from pinterest.ResourceResponse import ResourceResponse
+from pinterest.RetryPolicy import RetryPolicy
+from pinterest.SearchCursor import SearchCursorStore
+from pinterest.Transport import Transport
 from pinterest.utils import url_encode
 from pinterest.utils import basestring
+from pinterest.utils import parse_retry_after
+from pinterest.utils import extract_script
 
 AGENT_STRING = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) " \
                "AppleWebKit/537.36 (KHTML, like Gecko) " \
                "Chrome/71.0.3578.80 Safari/537.36"
 
-class Pinterest:
+# Header and payload fragments that are the same for every call
+_STATIC_HEADERS = (
+    ('Accept', 'text/html,application/xhtml+xml,application/'
+               'xml;q=0.9,image/webp,image/apng,*/*;q=0.8'),
+    ('Accept-Encoding', 'gzip, deflate'),
+    ('Accept-Language', 'es-ES,es;q=0.8'),
+    ('Accept-Charset', 'ISO-8859-1,utf-8;q=0.7,*;q=0.7'),
+    ('Cache-Control', 'no-cache'),
+    ('Connection', 'keep-alive'))
+_POST_HEADERS = (('Content-Type', 'application/x-www-form-urlencoded; charset=UTF-8'),)
+_AJAX_HEADERS = (('Accept', 'application/json'),
+                 ('X-Requested-With', 'XMLHttpRequest'))
+_DATA_PREFIX = '{"options":'
+_DATA_SUFFIX = ',"context":{}}'
+
+
+class PinterestBase:
+    """
+    Account settings, payload building and response parsing shared by the
+    synchronous Pinterest client and AsyncPinterest. Subclasses only
+    implement the I/O.
+    """
     host = 'www.pinterest.es'
     home_page = 'https://' + host + '/'
 
     def __init__(self, username_or_email, password,
-                 proxies=None, agent_string=None):
+                 proxies=None, agent_string=None, write_behind=True,
+                 data_dir=None, registry=None, rate_limiter=None,
+                 retry_policy=None, response_cache=None, upload_cache=None,
+                 metrics=None, json_codec=None, login_delay=(2.0, 3.0),
+                 search_cursors=None):
+        """
+        :param data_dir: directory holding the account registries, defaults
+            to the 'data' directory of this package
+        :param registry: Registry used to persist this account's session,
+            e.g. a SQLiteRegistry shared by many accounts. When omitted a
+            pickle Registry is created under data_dir.
+        :param rate_limiter: RateLimiter pacing the requests, it can be
+            shared by many clients
+        :param retry_policy: RetryPolicy of the requests, defaults to
+            RetryPolicy() with its 3 retries
+        :param response_cache: ResponseCache of read-only resource calls,
+            None to always go to the network
+        :param upload_cache: UploadCache of the images already uploaded,
+            None to upload every image
+        :param metrics: Metrics recording every request, it can be shared
+            by many clients
+        :param json_codec: JSONCodec of the resource calls, defaults to
+            JSONCodec() with orjson when it is installed
+        :param login_delay: seconds waited before opening the login page
+            and before sending the credentials, (0, 0) not to wait
+        :param search_cursors: SearchCursorStore of the searches paged with
+            next_page=True, defaults to one keeping 1000 searches in memory
+        """
         self.debug = False
         self.is_logged_in = False
         self.user = None
-        self.http = requests.session()
         self.username_or_email = username_or_email
         self.password = password
         self.proxies = proxies
-        self.data_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'data',
-                                      self.username_or_email) + os.sep
-        if not os.path.isdir(self.data_path):
-            os.makedirs(self.data_path)
-        self.registry = Registry('%sregistry.dat' % self.data_path)
-        if agent_string:
+        if data_dir is None:
+            data_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'data')
+        self.data_path = os.path.join(data_dir, self.username_or_email) + os.sep
+        if registry is None:
+            registry = Registry('%sregistry.dat' % self.data_path,
+                                write_behind=write_behind)
+        self.registry = registry
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.response_cache = response_cache
+        self.upload_cache = upload_cache
+        self.metrics = metrics
+        self.json_codec = json_codec if json_codec is not None else JSONCodec()
+        self.login_delay = login_delay
+        # Without an agent string the registry is only read on the first
+        # request, and AGENT_STRING used when it has none
+        if agent_string and self.registry.get(Registry.Key.USER_AGENT) != agent_string:
             self.registry.set(Registry.Key.USER_AGENT, agent_string)
-        elif not self.registry.get(Registry.Key.USER_AGENT):
-            self.registry.set(Registry.Key.USER_AGENT, AGENT_STRING)
-        old_cookies = self.registry.get(Registry.Key.COOKIES)
-        if old_cookies:
-            self.http.cookies.update(old_cookies)
-        self.next_book_marks = {'pins': {}, 'boards': {}, 'people': {}}
+        self.__cookies = None
+        if search_cursors is None:
+            search_cursors = SearchCursorStore()
+        self.search_cursors = search_cursors
+        self.__header_fragments = (None, ())
+
+    @property
+    def next_book_marks(self):
+        """
+        The next page bookmark of every search by scope and query, built
+        from search_cursors for older callers
+        :rtype: dict
+        """
+        bookmarks = {'pins': {}, 'boards': {}, 'people': {}}
+        for cursor in self.search_cursors:
+            bookmarks.setdefault(cursor.scope, {})[cursor.query] = cursor.next_bookmark
+        return bookmarks
 
-    def request(self, method, url,
-                params=None, data=None, files=None,
-                headers=None, ajax=False, stream=None):
+    def search_cursor(self, scope, query):
         """
-        :rtype: requests.models.Response
+        Return the cursor of a search paged with next_page=True, None if
+        its first page was not fetched
+        :rtype: SearchCursor|None
+        """
+        return self.search_cursors.get(scope, query)
+
+    @property
+    def cookies(self):
+        """
+        Cookie jar of this account, filled from the registry on first use
+        :rtype: requests.cookies.RequestsCookieJar
+        """
+        if self.__cookies is None:
+            cookies = requests.cookies.RequestsCookieJar()
+            old_cookies = self.registry.get(Registry.Key.COOKIES)
+            if old_cookies:
+                cookies.update(old_cookies)
+            self.__cookies = cookies
+        return self.__cookies
+
+    @cookies.setter
+    def cookies(self, cookies):
+        self.__cookies = cookies
+
+    def _headers(self, method, ajax=False, headers=None, csrftoken=None):
+        """
+        :rtype: requests.structures.CaseInsensitiveDict
         """
-        _headers = CaseInsensitiveDict([
-            ('Accept', 'text/html,application/xhtml+xml,application/' \
-             'xml;q=0.9,image/webp,image/apng,*/*;q=0.8'),
-            ('Accept-Encoding', 'gzip, deflate'),
-            ('Accept-Language', 'es-ES,es;q=0.8'),
-            ('Accept-Charset', 'ISO-8859-1,utf-8;q=0.7,*;q=0.7'),
-            ('Cache-Control', 'no-cache'),
-            ('Connection', 'keep-alive'),
-            ('Host', self.host),
-            ('Origin', self.home_page[:-1]),
-            ('Referer', self.home_page),
-            ('User-Agent', self.registry.get(Registry.Key.USER_AGENT))])
+        _headers = list(self.__base_headers())
         if method.upper() == 'POST':
-            _headers.update([('Content-Type',
-                              'application/x-www-form-urlencoded; charset=UTF-8')])
+            _headers.extend(_POST_HEADERS)
         if ajax:
-            _headers.update([('Accept', 'application/json')])
-            csrftoken = self.http.cookies.get('csrftoken',
-                                              domain=self.host)
+            _headers.extend(_AJAX_HEADERS)
             if csrftoken:
-                _headers.update([('X-CSRFToken', csrftoken)])
-            _headers.update([('X-Requested-With', 'XMLHttpRequest')])
+                _headers.append(('X-CSRFToken', csrftoken))
+        _headers = CaseInsensitiveDict(_headers)
         if headers:
             _headers.update(headers)
+        return _headers
 
-        response = self.http.request(method, url, params=params, data=data,
-                                     headers=_headers, files=files, timeout=60,
-                                     proxies=self.proxies, stream=stream)
+    def __base_headers(self):
+        """
+        Return the headers sent with every request, rebuilt only when the
+        host or the user agent change
+        :rtype: tuple
+        """
+        key = (self.host, self.home_page,
+               self.registry.get(Registry.Key.USER_AGENT) or AGENT_STRING)
+        if self.__header_fragments[0] != key:
+            self.__header_fragments = (key, _STATIC_HEADERS + (
+                ('Host', key[0]),
+                ('Origin', key[1][:-1]),
+                ('Referer', key[1]),
+                ('User-Agent', key[2])))
+        return self.__header_fragments[1]
+
+    @staticmethod
+    def _body_size(data):
+        """
+        Return the size of a request body, 0 when it is not known
+        :rtype: int
+        """
+        if data is None:
+            return 0
+        if isinstance(data, (str, bytes)):
+            return len(data)
+        return getattr(data, 'len', 0)
 
-        response.raise_for_status()
-        self.registry.update(Registry.Key.COOKIES, response.cookies)
-        return response
+    @staticmethod
+    def _resource_method(action):
+        return 'GET' if action == 'get' else 'POST'
 
-    def get(self, url, params=None, headers=None, ajax=False, stream=None):
+    def _encode_resource_call(self, method, resource, action, options, source_url):
         """
-        :rtype: requests.models.Response
+        Build the (url, data) of a call to a Pinterest resource. GET calls
+        carry the payload in the query string.
+        :rtype: tuple
         """
-        return self.request('GET', url=url, params=params, headers=headers,
-                            ajax=ajax, stream=stream)
+        query = {
+            'source_url': source_url,
+            'data': _DATA_PREFIX + self.json_codec.dumps(options) + _DATA_SUFFIX
+        }
+        url = self.home_page + 'resource/%s/%s/' % (resource, action)
+        if method == 'GET':
+            query['_'] = '%s' % int(time.time() * 1000)
+            return url + '?%s' % url_encode(query), None
+        return url, url_encode(query)
 
-    def post(self, url, data=None, files=None, headers=None, ajax=False,
-             stream=None):
+    def _cache_lookup(self, method, resource, options, source_url):
         """
-        :rtype: requests.models.Response
+        Return the response cache key of a resource call and its cached
+        entry, (None, None) when the call is not cacheable
+        :rtype: tuple
         """
-        return self.request('POST', url=url, data=data, files=files,
-                            headers=headers, ajax=ajax, stream=stream)
+        if self.response_cache is None or method != 'GET' or \
+                not self.response_cache.cacheable(resource):
+            return None, None
+        key = self.response_cache.key(resource, options, source_url, self.username_or_email)
+        return key, self.response_cache.get(key)
+
+    def _cache_store(self, method, key, response):
+        """
+        Cache the result of a read call, or invalidate what a write changed
+        """
+        if self.response_cache is None or not response.ok:
+            return
+        if key is not None:
+            self.response_cache.put(key, response.result, response.headers)
+        elif method == 'POST':
+            self.response_cache.invalidate_write(response.resource, response.options,
+                                                 self.username_or_email)
+
+    @staticmethod
+    def _resource_ok(response):
+        return response.ok
+
+    @staticmethod
+    def _pin_result(response):
+        if response.ok:
+            pin = {'id': response.data['id']}
+            return pin
+        return None
 
     def extract_user_data(self, html_page=''):
         """
@@ -113,278 +270,905 @@ class Pinterest:
             # Searching for "jsInit1" instead required data appear and it works.
             s = html_page[html_page.rfind(b'jsInit1'):]
             if s and s.rfind(self.username_or_email.encode('utf-8')) > -1:
-                s = s[s.find(b'{'): s.find(b'</script>')]
-                s = json.loads(s)
-                try:
-                    user = s['context']['user']
-                    return user
-                except KeyError:
-                    pass
+                return self._user_data_from_script(s[:s.find(b'</script>')])
+        return None
+
+    def _user_data_from_script(self, script):
+        """
+        Return the user data of the jsInit1 script, as returned by
+        extract_script(), if it belongs to the logged in user
+        :rtype: dict|None
+        """
+        if script and script.find(self.username_or_email.encode('utf-8')) > -1:
+            s = self.json_codec.loads(script[script.find(b'{'):])
+            try:
+                user = s['context']['user']
+                return user
+            except KeyError:
+                pass
+        return None
+
+    def login_required(self):
+        if not self.is_logged_in:
+            raise PinterestLoginRequiredException("Login is required")
+
+    def _login_request(self):
+        return (
+            'UserSessionResource', 'create',
+            {'username_or_email': self.username_or_email,
+             'password': self.password},
+            '/login/?referrer=home_page')
+
+    def _logout_request(self):
+        return (
+            'UserSessionResource', 'delete',
+            {'username_or_email': True},
+            '/login/?referrer=home_page')
+
+    @staticmethod
+    def _session_probe_request():
+        return 'UserSettingsResource', 'get', {}, '/settings/'
+
+    def _resumable_user(self):
+        """
+        Return the user saved by the last login when its session cookie is
+        still there, else None
+        :rtype: dict|None
+        """
+        user = self.registry.get(Registry.Key.USER)
+        if user and self.cookies.get('_pinterest_sess'):
+            return user
+        return None
+
+    @staticmethod
+    def _session_probe_result(response, user):
+        """
+        Return whether the session probe answered for `user`
+        :rtype: bool
+        """
+        data = response.data if response.ok else None
+        return isinstance(data, dict) and data.get('username') == user.get('username')
+
+    def _remember_user(self, user):
+        """
+        Save the logged in user, or None after a logout, for the next
+        session to resume
+        """
+        if self.registry.get(Registry.Key.USER) != user:
+            self.registry.set(Registry.Key.USER, user)
+
+    @staticmethod
+    def _session_error(response):
+        """
+        Raise PinterestLoginFailedException if a UserSessionResource call failed
+        """
+        error = response.error
+        if error is not None:
+            raise PinterestLoginFailedException('[%s Login failed] %s' %
+                                                (error['http_status'], error['message']))
+
+    def _boards_request(self):
+        return (
+            'BoardPickerBoardsResource', 'get',
+            {"filter": "all", "field_set_key": "board_picker",
+             "allow_stale": "true", "from": "app"},
+            '/%s/pins/' % self.user['username'])
+
+    @staticmethod
+    def _boards_result(response):
+        boards = []
+        try:
+            if response.data['all_boards']:
+                all_boards = response.data['all_boards']
+                for board in all_boards:
+                    boards.append(Board(
+                        id=board.get('id'),
+                        name=board.get('name'),
+                        section_count=board.get('section_count'),
+                        pin_count=board.get('pin_count'),
+                        url=board.get('url')
+                    ))
+        except (KeyError, TypeError):
+            pass
+        return boards
+
+    def _create_board_request(self, name, description, category, privacy, layout):
+        return (
+            'BoardResource', 'create',
+            {
+                "name": name,
+                "description": description,
+                "category": category,
+                "privacy": privacy,
+                "layout": layout,
+                "collab_board_email": 'true',
+                "collaborator_invites_enabled": 'true'
+            },
+            '/%s/boards/' % self.user['username'])
+
+    @staticmethod
+    def _create_board_result(response):
+        if response.ok:
+            board = response.data
+            return board
+        return None
+
+    def _follow_board_request(self, action, board_id, board_url):
+        return ('BoardFollowResource', action,
+                {"board_id": board_id}, board_url)
+
+    def _follow_user_request(self, action, user_id, username):
+        return ('UserFollowResource', action,
+                {"user_id": user_id}, '/%s/' % username)
+
+    def _pin_request(self, board_id, image_url, description='', link='',
+                     share_facebook=False, share_twitter=False):
+        return (
+            'PinResource', 'create',
+            {
+                "board_id": board_id,
+                "image_url": image_url,
+                "description": description,
+                "link": link if link else image_url,
+                "scrape_metric": {"source": "www_url_scrape"},
+                "method": "scraped",
+                "share_facebook": share_facebook,
+                "share_twitter": share_twitter},
+            '/pin/find/?url=%s' % url_encode(image_url))
+
+    def _upload_pin_request(self, board_id, image_url, description,
+                            share_facebook, share_twitter):
+        return (
+            'PinResource', 'create',
+            {
+                "board_id": board_id,
+                "image_url": image_url,
+                "description": description,
+                "upload_metric": {"source": "pinner_upload_standalone"},
+                "method": "uploaded",
+                "share_facebook": share_facebook,
+                "share_twitter": share_twitter},
+            '/%s/' % self.user['username'])
+
+    @staticmethod
+    def _image_file_info(image_file):
+        """
+        Return the file name and mime type used to upload an image file
+        :rtype: tuple
+        """
+        # Imported on first upload, so creating a client stays cheap
+        import mimetypes
+        file_name = os.path.basename(image_file)
+        mime_type = mimetypes.guess_type(image_file)[0]
+        if mime_type is None:
+            extension = os.path.splitext(image_file)[1][1:]
+            if extension == 'jpg':
+                mime_type = 'image/jpeg'
+            else:
+                mime_type = 'image/%s' % extension
+        return file_name, mime_type
+
+    def _upload_image_url(self, file_name):
+        return self.home_page + 'upload-image/?img=%s' % url_encode(file_name)
+
+    def _uploaded_pin(self, key, response):
+        """
+        Forget the cached image url of a pin the site did not create, in
+        case the url is the reason
+        """
+        if key is not None and not response.ok:
+            self.upload_cache.discard(key)
+
+    @staticmethod
+    def _upload_options(operation, description):
+        """
+        Return the arguments of upload_pin() (but board_id) of an
+        upload_pins() operation: a file path, a tuple or a dict
+        :rtype: dict
+        """
+        options = {'description': description, 'share_facebook': False,
+                   'share_twitter': False}
+        if isinstance(operation, dict):
+            options.update(operation)
+        elif isinstance(operation, (tuple, list)):
+            options.update(zip(('image_file', 'description', 'share_facebook',
+                                'share_twitter'), operation))
+        else:
+            options['image_file'] = operation
+        return options
+
+    @staticmethod
+    def _upload_progress(callback, progress):
+        """
+        Return the callback of the BulkResults of upload_pins(), passing
+        each on to `callback` and the files finished and bytes uploaded so
+        far to `progress`
+        :rtype: callable
+        """
+        totals = [0, 0]
+
+        def finished(result):
+            totals[0] += 1
+            if result.data and result.data.get('image_url') and result.data['uploaded']:
+                totals[1] += result.data['size']
+            if callback is not None:
+                callback(result)
+            if progress is not None:
+                progress(totals[0], totals[1])
+        return finished
+
+    def _repin_request(self, board_id, pin_id, link='', title='', description='',
+                       share_facebook=False, share_twitter=False):
+        return (
+            'RepinResource', 'create',
+            {
+                "board_id": board_id,
+                "pin_id": pin_id,
+                "link": link,
+                "title": title,
+                "description": description,
+                "is_buyable_pin": False,
+                "share_facebook": share_facebook,
+                "share_twitter": share_twitter
+            },
+            '/pin/%s/' % pin_id)
+
+    def _like_request(self, action, pin_id):
+        return ('PinLikeResource', action,
+                {"pin_id": pin_id}, '/pin/%s/' % pin_id)
+
+    def _delete_pin_request(self, pin_id):
+        return ('PinResource', 'delete',
+                {"id": pin_id}, '/pin/%s/' % pin_id)
+
+    def _comment_request(self, pin_id, text):
+        return ('PinCommentResource', 'create',
+                {"pin_id": "657384876829999984", "text": text},
+                '/pin/%s/' % pin_id)
+
+    @staticmethod
+    def _comment_result(response):
+        if response.ok:
+            comment = {
+                'id': response.data['id'],
+                'text': response.data['text'],
+                'created_at': response.data['created_at']
+            }
+            return comment
         return None
 
-    def login(self):
+    def _delete_comment_request(self, pin_id, comment_id):
+        return ('PinCommentResource', 'delete',
+                {"pin_id": pin_id, "comment_id": comment_id},
+                '/pin/%s/' % pin_id)
+
+    def _invite_request(self, board_id, board_url, user_id):
+        return ('BoardInviteResource', 'create',
+                {"board_id": board_id, "invited_user_ids": [user_id]},
+                board_url)
+
+    def _delete_invite_request(self, board_id, board_url, invited_user_id, also_block):
+        return (
+            'BoardInviteResource', 'delete',
+            {
+                "ban": also_block,
+                "board_id": board_id,
+                "field_set_key": "boardEdit",
+                "invited_user_id": invited_user_id},
+            board_url)
+
+    def _search_url(self, scope, query):
+        q = url_encode({
+            'q': query,
+            '_': '%s' % int(time.time() * 1000)
+        })
+        return self.home_page + 'search/%s/?%s' % (scope, q)
+
+    def _search_script_result(self, script, scope, query):
+        """
+        Return the results of the first search page from its
+        application/json script, as returned by extract_script()
+        :rtype: list
+        """
+        results, bookmarks = self._search_script_page(script)
+        self.search_cursors.update(scope, query, bookmarks, first_page=True)
+        return results
+
+    def _search_script_page(self, script):
+        """
+        Return the results of the first search page and the bookmarks of
+        the next one
+        :rtype: tuple
+        """
+        results = []
+        bookmarks = []
+        if not script:
+            return results, bookmarks
+        search_result = self.json_codec.loads(script[script.find(b'{'):])
+        try:
+            if search_result['resources']['data']['BaseSearchResource']:
+                search_resource = list(search_result['resources'] \
+                                       ['data']['BaseSearchResource'].values())[0]
+                results = search_resource['data']['results']
+                bookmarks = [search_resource['nextBookmark']]
+        except KeyError:
+            pass
+        return results, bookmarks
+
+    def _has_next_page(self, scope, query):
+        cursor = self.search_cursors.get(scope, query)
+        return cursor is not None and cursor.next_bookmark is not None
+
+    def _search_next_page_request(self, scope, query):
+        cursor = self.search_cursors.get(scope, query)
+        return self._search_page_request(scope, query, cursor.bookmarks[:1])
+
+    def _search_page_request(self, scope, query, bookmarks):
+        return (
+            'SearchResource', 'get',
+            {
+                'bookmarks': bookmarks,
+                'query': query,
+                'scope': scope
+            },
+            '/search/%s/?q=%s' % (scope, query))
+
+    def _search_next_page_result(self, response, scope, query):
+        results, bookmarks = self._search_page_result(response)
+        if bookmarks:
+            self.search_cursors.update(scope, query, bookmarks)
+        return results
+
+    @staticmethod
+    def _search_page_result(response):
+        """
+        Return the results of a search page and the bookmarks of the next
+        one
+        :rtype: tuple
+        """
+        response.raise_for_error()
+        results = response.data or []
+        bookmarks = response.bookmarks
+        if isinstance(bookmarks, basestring):
+            bookmarks = [bookmarks]
+        return results, bookmarks or []
+
+    @staticmethod
+    def _search_boards_result(results):
+        boards = []
+        for result in results:
+            if result['type'] == 'board':
+                boards.append(Board(
+                    id=result['id'],
+                    name=result['name'],
+                    url=result['url'],
+                    privacy=result['privacy'],
+                    layout=result['layout'],
+                    followed_by_me=result['followed_by_me'],
+                    owner=User.shared(
+                        id=result['owner']['id'],
+                        username=result['owner']['username'],
+                        full_name=result['owner']['full_name'],
+                        followed_by_me=result['owner']['explicitly_followed_by_me'],
+                    ),
+                    description=result['description'],
+                    pin_count=result['pin_count'],
+                ))
+        return boards
+
+    @staticmethod
+    def _search_pins_result(results):
+        pins = []
+        for result in results:
+            if result['type'] == 'pin':
+                pins.append(Pin(
+                    id=result['id'],
+                    description=result['description'],
+                    img=result['images']['orig']['url'],
+                    like_count=result['like_count'],
+                    comment_count=result['comment_count'],
+                    repin_count=result['repin_count'],
+                    liked_by_me=result['liked_by_me'],
+                    link=result['link'],
+                    title=result['title'],
+                    is_video=result['is_video'],
+                    board=Board.shared(
+                        id=result['board']['id'],
+                        name=result['board']['name'],
+                        url=result['board']['url'],
+                        privacy=result['board']['privacy'],
+                        followed_by_me=result['board']['followed_by_me'],
+                        owner=User.shared(id=result['board']['owner']['id']),
+                    ),
+                    pinner=User.shared(
+                        id=result['pinner']['id'],
+                        username=result['pinner']['username'],
+                    )
+                ))
+        return pins
+
+    @staticmethod
+    def _search_users_result(results):
+        users = []
+        for result in results:
+            if result['type'] == 'user':
+                users.append(User(
+                    id=result['id'],
+                    username=result['username'],
+                    full_name=result['full_name'],
+                    blocked_by_me=result['blocked_by_me'],
+                    image_medium_url=result['image_medium_url'],
+                    followed_by_me=result['explicitly_followed_by_me'],
+                    follower_count=result['follower_count'],
+                    pin_count=result['pin_count'],
+                    board_count=result['board_count'],
+                ))
+        return users
+
+    def _sections_request(self, tablero, bookmarks):
+        return (
+            'BoardSectionsResource', 'get',
+            {'bookmarks': bookmarks,
+             'isPrefetch': 'False',
+             'board_id': tablero['id'],
+             'redux_normalize_feed': 'true'},
+            '/%s/%s/' % (self.user['username'], tablero['name']))
+
+    @staticmethod
+    def _sections_result(response):
+        """
+        Return the sections of one page and the bookmarks of the next one
+        :rtype: tuple
+        """
+        response.raise_for_error()
+        sections = []
+        try:
+            if response.data:
+                for section in response.data:
+                    sections.append(Section(id=section['id'],
+                                            title=section['title'],
+                                            slug=section['slug'],
+                                            pin_count=section.get('pin_count')))
+        except KeyError:
+            pass
+        return sections, response.bookmarks
+
+    def _pins_board_request(self, tablero, bookmarks):
+        return (
+            'BoardFeedResource', 'get',
+            {'bookmarks': bookmarks,
+             'isPrefetch': 'False',
+             'board_id': tablero['id'],
+             'board_url': '/%s/%s/' % (self.user['username'],
+                                       tablero['name']),
+             'filter_section_pins': 'true',
+             'redux_normalize_feed': 'true'},
+            '/%s/%s/' % (self.user['username'], tablero['name']))
+
+    def _pins_section_request(self, tablero, seccion, bookmarks):
+        return (
+            'BoardSectionPinsResource', 'get',
+            {'bookmarks': bookmarks,
+             'isPrefetch': 'False',
+             'section_id': seccion['id'],
+             'redux_normalize_feed': 'false',
+             'is_own_profile_pins': 'true'},
+            '/%s/%s/%s/' % (self.user['username'],
+                            tablero['name'],
+                            seccion['slug']))
+
+    @staticmethod
+    def _pins_result(response):
+        """
+        Return the pins of one feed page and the bookmarks of the next one
+        :rtype: tuple
+        """
+        response.raise_for_error()
+        pins = []
+        try:
+            if response.data:
+                for pin in response.data:
+                    pins.append(Pin(id=pin['id'],
+                                    description=pin['description'],
+                                    image=pin['images']['orig']['url'],
+                                    link=pin['link'],
+                                    title=pin['title']))
+        except KeyError:
+            pass
+        return pins, response.bookmarks
+
+
+class Pinterest(PinterestBase):
+
+    def __init__(self, username_or_email, password,
+                 proxies=None, agent_string=None, write_behind=True,
+                 data_dir=None, registry=None, rate_limiter=None,
+                 retry_policy=None, response_cache=None, upload_cache=None,
+                 metrics=None, json_codec=None, login_delay=(2.0, 3.0),
+                 search_cursors=None, transport=None):
+        """
+        :param transport: Transport holding the HTTP connection pool, it
+            can be shared by many clients. Each client keeps its own
+            cookies in `cookies`.
+        """
+        PinterestBase.__init__(self, username_or_email, password,
+                               proxies=proxies, agent_string=agent_string,
+                               write_behind=write_behind, data_dir=data_dir,
+                               registry=registry, rate_limiter=rate_limiter,
+                               retry_policy=retry_policy,
+                               response_cache=response_cache,
+                               upload_cache=upload_cache,
+                               metrics=metrics, json_codec=json_codec,
+                               login_delay=login_delay,
+                               search_cursors=search_cursors)
+        self.transport = transport if transport is not None else Transport()
+        self.http = self.transport.session
+
+    def request(self, method, url,
+                params=None, data=None, files=None,
+                headers=None, ajax=False, stream=None):
+        """
+        :rtype: requests.models.Response
+        """
+        csrftoken = None
+        if ajax:
+            csrftoken = self.cookies.get('csrftoken', domain=self.host)
+        _headers = self._headers(method, ajax=ajax, headers=headers,
+                                 csrftoken=csrftoken)
+
+        family = None
+        if self.rate_limiter is not None:
+            family = self.rate_limiter.family(method, url)
+        endpoint = None
+        if self.metrics is not None:
+            endpoint = self.metrics.endpoint(url)
+            sent = len(url) + self._body_size(data)
+        # A streamed body (image upload) can only be sent once
+        replayable = not hasattr(data, 'read')
+        policy = self.retry_policy
+        policy.record()
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            if family is not None:
+                self.rate_limiter.acquire(family)
+            sent_at = time.monotonic()
+            try:
+                response = self.transport.request(method, url, cookies=self.cookies,
+                                                  params=params, data=data,
+                                                  headers=_headers, files=files,
+                                                  timeout=policy.timeout(started),
+                                                  proxies=self.proxies, stream=stream)
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout,
+                    requests.exceptions.ChunkedEncodingError) as e:
+                if endpoint is not None:
+                    self.metrics.observe(endpoint, method, latency=time.monotonic() - sent_at,
+                                         sent=sent, error=e, retry=attempt > 0)
+                if (replayable or policy.is_connect_error(e)) and \
+                        policy.should_retry(method, url, attempt, error=e):
+                    wait = policy.delay(attempt, started)
+                    if wait is not None:
+                        time.sleep(wait)
+                        attempt += 1
+                        continue
+                raise
+
+            if endpoint is not None:
+                # A streamed body is not read yet, its latency is the time
+                # to the headers and its size the announced one
+                if stream:
+                    received = int(response.headers.get('Content-Length') or 0)
+                else:
+                    received = len(response.content)
+                self.metrics.observe(endpoint, method, response.status_code,
+                                     time.monotonic() - sent_at, sent, received,
+                                     retry=attempt > 0)
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if family is not None:
+                self.rate_limiter.update(family, response.status_code, retry_after)
+            if replayable and response.status_code >= 400 and \
+                    policy.should_retry(method, url, attempt,
+                                        status_code=response.status_code):
+                wait = policy.delay(attempt, started, retry_after)
+                if wait is not None:
+                    response.close()
+                    time.sleep(wait)
+                    attempt += 1
+                    continue
+            break
+
+        received = requests.cookies.RequestsCookieJar()
+        for r in response.history + [response]:
+            received.update(r.cookies)
+        if received:
+            self.cookies.update(received)
+            self.registry.update(Registry.Key.COOKIES, received)
+        response.raise_for_status()
+        return response
+
+    def flush(self):
+        """
+        Write any pending registry changes (cookies, user agent) to disk
+        :rtype: bool
+        """
+        return self.registry.flush()
+
+    def get(self, url, params=None, headers=None, ajax=False, stream=None):
+        """
+        :rtype: requests.models.Response
+        """
+        return self.request('GET', url=url, params=params, headers=headers,
+                            ajax=ajax, stream=stream)
+
+    def post(self, url, data=None, files=None, headers=None, ajax=False,
+             stream=None):
+        """
+        :rtype: requests.models.Response
+        """
+        return self.request('POST', url=url, data=data, files=files,
+                            headers=headers, ajax=ajax, stream=stream)
+
+    def __fetch_script(self, url, marker):
+        """
+        Stream an html page and return its script starting at `marker`,
+        closing the connection as soon as the script has been read
+        :rtype: bytes|None
+        """
+        r = self.get(url, stream=True)
+        try:
+            return extract_script(r.iter_content(chunk_size=16384), marker)
+        finally:
+            r.close()
+
+    def __fetch_user_data(self):
+        """
+        Return the logged in user from the home page, None if not logged in
+        :rtype: dict|None
+        """
+        return self._user_data_from_script(self.__fetch_script(self.home_page, b'jsInit1'))
+
+    def call_resource(self, resource, action, options, source_url, method=None):
+        """
+        Call a Pinterest resource, e.g.
+        call_resource('PinLikeResource', 'create', {'pin_id': pin_id}, '/pin/%s/' % pin_id)
+
+        Every resource call of the client goes through here. `method`
+        defaults to GET for the 'get' action and POST for the others. With a
+        response cache, read calls are answered from it when possible and
+        writes invalidate what they change. Errors reported by the site are
+        in the `error` of the response, see ResourceResponse.raise_for_error().
+        :rtype: ResourceResponse
+        """
+        method = method or self._resource_method(action)
+        url, data = self._encode_resource_call(method, resource, action, options, source_url)
+        key, entry = self._cache_lookup(method, resource, options, source_url)
+        if entry is not None and entry.fresh():
+            return ResourceResponse(resource, action, options, entry.result, from_cache=True)
+        headers = entry.validators() if entry is not None else None
+        r = self.request(method, url, data=data, headers=headers, ajax=True)
+        if r.status_code == 304 and entry is not None:
+            self.response_cache.refresh(key)
+            return ResourceResponse(resource, action, options, entry.result,
+                                    r.status_code, r.headers, from_cache=True)
+        response = ResourceResponse(resource, action, options,
+                                    self.json_codec.decode_resource(r.content),
+                                    r.status_code, r.headers)
+        self._cache_store(method, key, response)
+        return response
+
+    def login(self, resume=True):
         """
         Login to pinterest site. If OK return True
+
+        With `resume`, a session saved by a previous login is checked with
+        one small resource call and reused, without loading the home page.
         :rtype: bool
         """
-        r = self.get(self.home_page)
-        self.user = self.extract_user_data(r.content)
+        if resume and self.__resume_session():
+            return self.is_logged_in
+        self.user = self.__fetch_user_data()
         if self.user:
             self.is_logged_in = True
         else:
-            time.sleep(2)
+            time.sleep(self.login_delay[0])
             login_page = self.home_page + 'login/?referrer=home_page'
             self.get(login_page)
-            time.sleep(3)
-            data = url_encode({
-                'source_url': '/login/?referrer=home_page',
-                'data': json.dumps({
-                    'options': {'username_or_email': self.username_or_email,
-                                'password': self.password},
-                    "context": {}
-                }).replace(' ', '')
-            })
-            url = self.home_page + 'resource/UserSessionResource/create/'
-            result = self.post(url=url, data=data, ajax=True).json()
-            # By using get avoid KeyError if "error" key is not present
-            error = result['resource_response'].get('error')
-            if error is None:
-                self.user = self.extract_user_data(self.get(self.home_page).content)
-                self.is_logged_in = True
-            else:
-                raise PinterestLoginFailedException('[%s Login failed] %s' %
-                                                    (error['http_status'], error['message']))
+            time.sleep(self.login_delay[1])
+            result = self.call_resource(*self._login_request())
+            self._session_error(result)
+            self.user = self.__fetch_user_data()
+            self.is_logged_in = True
+        self._remember_user(self.user)
         return self.is_logged_in
-    
+
+    def __resume_session(self):
+        """
+        Reuse the saved session if the site still accepts it
+        :rtype: bool
+        """
+        user = self._resumable_user()
+        if user is None:
+            return False
+        try:
+            result = self.call_resource(*self._session_probe_request())
+        except requests.exceptions.HTTPError:
+            return False
+        if not self._session_probe_result(result, user):
+            return False
+        self.user = user
+        self.is_logged_in = True
+        return True
+
     def logout(self):
         """
         Logout from pinterest site. If OK return False
         :rtype: bool
         """
-        r = self.get(self.home_page)
-        self.user = self.extract_user_data(r.content)
+        self.user = self.__fetch_user_data()
         if self.user:
             self.is_logged_in = True
-            time.sleep(3)
-
-            data = url_encode({
-                'source_url': '/login/?referrer=home_page',
-                'data': json.dumps({
-                    'options': {'username_or_email': True},
-                    "context": {}
-                }).replace(' ', '')
-            })
-            url = self.home_page + 'resource/UserSessionResource/delete/'
-            result = self.post(url=url, data=data, ajax=True).json()
-            # By using get avoid KeyError if "error" key is not present
-            error = result['resource_response'].get('error')
-            if error is None:
-                self.user = self.extract_user_data(self.get(self.home_page).content)
-                self.is_logged_in = True
-            else:
-                raise PinterestLoginFailedException('[%s Login failed] %s' %
-                                                    (error['http_status'], error['message']))
+            time.sleep(self.login_delay[1])
+            result = self.call_resource(*self._logout_request())
+            self._session_error(result)
+            self.user = self.__fetch_user_data()
             self.is_logged_in = False
+            self._remember_user(None)
         return self.is_logged_in
 
-    def login_required(self):
-        if not self.is_logged_in:
-            raise PinterestLoginRequiredException("Login is required")
-
     def boards(self):
         """
         Return all boards of logged in user
         :rtype: list
         """
         self.login_required()
-        data = url_encode({
-            'source_url': '/%s/pins/' % self.user['username'],
-            'data': json.dumps({
-                'options': {"filter": "all", "field_set_key": "board_picker",
-                            "allow_stale": "true", "from": "app"},
-                "context": {}
-            }).replace(' ', ''),
-            '_': '%s' % int(time.time() * 1000)
-        })
-        url = self.home_page + 'resource/BoardPickerBoardsResource/get/?%s' % data
-        r = self.get(url=url, ajax=True)
-        result = r.json()
-        boards = []
-        try:
-            if result['resource_response']['data']['all_boards']:
-                all_boards = result['resource_response']['data']['all_boards']
-                for board in all_boards:
-                    boards.append({
-                        'id': board.get('id'),
-                        'name': board.get('name'),
-                        'section_count': board.get('section_count'),
-                        'url': board.get('url')
-                    })
-        except KeyError:
-            pass
-        return boards
+        return self._boards_result(self.call_resource(*self._boards_request()))
 
     def create_board(self, name, description='', category='other',
                      privacy='public', layout='default'):
         self.login_required()
-        url = self.home_page + 'resource/BoardResource/create/'
-        data = url_encode({
-            'source_url': '/%s/boards/' % self.user['username'],
-            'data': json.dumps({
-                'options': {
-                    "name": name,
-                    "description": description,
-                    "category": category,
-                    "privacy": privacy,
-                    "layout": layout,
-                    "collab_board_email": 'true',
-                    "collaborator_invites_enabled": 'true'
-                },
-                "context": {}
-            }).replace(' ', '')
-        })
-        r = self.post(url=url, data=data, ajax=True)
-        result = r.json()
-        if result['resource_response']['error'] is None:
-            board = result['resource_response']['data']
-            return board
-        return None
+        result = self.call_resource(*self._create_board_request(
+            name, description, category, privacy, layout))
+        return self._create_board_result(result)
 
     def follow_board(self, board_id, board_url):
         self.login_required()
-        url = self.home_page + 'resource/BoardFollowResource/create/'
-        data = url_encode({
-            'source_url': board_url,
-            'data': json.dumps({
-                'options': {"board_id": board_id},
-                "context": {}
-            }).replace(' ', '')
-        })
-        result = self.post(url=url, data=data, ajax=True).json()
-        if result['resource_response']['error'] is None:
-            return True
-        return False
+        result = self.call_resource(*self._follow_board_request(
+            'create', board_id, board_url))
+        return self._resource_ok(result)
 
     def unfollow_board(self, board_id, board_url):
         self.login_required()
-        url = self.home_page + 'resource/BoardFollowResource/delete/'
-        data = url_encode({
-            'source_url': board_url,
-            'data': json.dumps({
-                'options': {"board_id": board_id},
-                "context": {}
-            }).replace(' ', '')
-        })
-        result = self.post(url=url, data=data, ajax=True).json()
-        if result['resource_response']['error'] is None:
-            return True
-        return False
+        result = self.call_resource(*self._follow_board_request(
+            'delete', board_id, board_url))
+        return self._resource_ok(result)
 
     def follow_user(self, user_id, username):
         self.login_required()
-        url = self.home_page + 'resource/UserFollowResource/create/'
-        data = url_encode({
-            'source_url': '/%s/' % username,
-            'data': json.dumps({
-                'options': {"user_id": user_id},
-                "context": {}
-            }).replace(' ', '')
-        })
-        result = self.post(url=url, data=data, ajax=True).json()
-        if result['resource_response']['error'] is None:
-            return True
-        return False
+        result = self.call_resource(*self._follow_user_request('create', user_id, username))
+        return self._resource_ok(result)
 
     def unfollow_user(self, user_id, username):
         self.login_required()
-        url = self.home_page + 'resource/UserFollowResource/delete/'
-        data = url_encode({
-            'source_url': '/%s/' % username,
-            'data': json.dumps({
-                'options': {"user_id": user_id},
-                "context": {}
-            }).replace(' ', '')
-        })
-        result = self.post(url=url, data=data, ajax=True).json()
-        if result['resource_response']['error'] is None:
-            return True
-        return False
+        result = self.call_resource(*self._follow_user_request('delete', user_id, username))
+        return self._resource_ok(result)
 
     def pin(self, board_id, image_url, description='', link='',
             share_facebook=False, share_twitter=False):
         self.login_required()
-        url = self.home_page + 'resource/PinResource/create/'
-        data = url_encode({
-            'source_url': '/pin/find/?url=%s' % url_encode(image_url),
-            'data': json.dumps({
-                'options': {
-                    "board_id": board_id,
-                    "image_url": image_url,
-                    "description": description,
-                    "link": link if link else image_url,
-                    "scrape_metric": {"source": "www_url_scrape"},
-                    "method": "scraped",
-                    "share_facebook": share_facebook,
-                    "share_twitter": share_twitter},
-                "context": {}
-            }).replace(' ', '')
-        })
-        result = self.post(url=url, data=data, ajax=True).json()
-        if result['resource_response']['error'] is None:
-            pin = {'id': result['resource_response']['data']['id']}
-            return pin
-        return None
+        result = self.call_resource(*self._pin_request(board_id, image_url, description,
+                                                       link, share_facebook, share_twitter))
+        return self._pin_result(result)
 
     def upload_pin(self, board_id, image_file, description='',
                    share_facebook=False, share_twitter=False):
         self.login_required()
-        url = self.home_page + 'resource/PinResource/create/'
-        uploaded_image = self.__upload_image(image_file)
-        if uploaded_image['success'] is True:
-            image_url = uploaded_image['image_url']
-            data = url_encode({
-                'source_url': '/%s/' % self.user['username'],
-                'data': json.dumps({
-                    'options': {
-                        "board_id": board_id,
-                        "image_url": image_url,
-                        "description": description,
-                        "upload_metric": {"source": "pinner_upload_standalone"},
-                        "method": "uploaded",
-                        "share_facebook": share_facebook,
-                        "share_twitter": share_twitter},
-                    "context": {}
-                }).replace(' ', '')
-            })
-            result = self.post(url=url, data=data, ajax=True).json()
-            if result['resource_response']['error'] is None:
-                pin = {'id': result['resource_response']['data']['id']}
-                return pin
+        image_url, key, uploaded = self.__image_url(image_file)
+        if image_url is not None:
+            result = self.call_resource(*self._upload_pin_request(
+                board_id, image_url, description, share_facebook, share_twitter))
+            self._uploaded_pin(key, result)
+            return self._pin_result(result)
         return None
 
+    def __image_url(self, image_file):
+        """
+        Return the url of `image_file` once uploaded, or of the same content
+        uploaded before when found in the upload cache, with its upload
+        cache key and whether it was uploaded now. The url is None when the
+        upload failed.
+        :rtype: tuple
+        """
+        key = None
+        if self.upload_cache is not None:
+            key = self.upload_cache.key(image_file)
+            image_url = self.upload_cache.get(key)
+            if image_url is not None:
+                return image_url, key, False
+        uploaded_image = self.__upload_image(image_file)
+        if uploaded_image.get('success') is not True:
+            return None, key, True
+        if key is not None:
+            self.upload_cache.put(key, uploaded_image['image_url'])
+        return uploaded_image['image_url'], key, True
+
     def __upload_image(self, image_file):
+        """
+        Upload an image file, streamed from disk by the multipart encoder
+        :rtype: dict
+        """
+        from requests_toolbelt import MultipartEncoder
         self.login_required()
-        file_name = os.path.basename(image_file)
-        mime_type = mimetypes.guess_type(image_file)[0]
-        if mime_type is None:
-            extension = os.path.splitext(image_file)[1][1:]
-            if extension == 'jpg':
-                mime_type = 'image/jpeg'
-            else:
-                mime_type = 'image/%s' % extension
-        m = MultipartEncoder(fields={
-            'qquuid': '%s' % uuid.uuid4(),
-            'qqfilename': file_name,
-            'img': ('%s' % file_name, open(image_file, 'rb'), mime_type)
-        })
-        headers = {
-            'Content-Length': '%s' % m.len,
-            'Content-Type': m.content_type,
-            'X-UPLOAD-SOURCE': 'pinner_uploader'
-        }
-        url = self.home_page + 'upload-image/?img=%s' % url_encode(file_name)
-        result = self.post(url=url, data=m, headers=headers, ajax=True).json()
-        return result
+        file_name, mime_type = self._image_file_info(image_file)
+        with open(image_file, 'rb') as f:
+            m = MultipartEncoder(fields={
+                'qquuid': '%s' % uuid.uuid4(),
+                'qqfilename': file_name,
+                'img': ('%s' % file_name, f, mime_type)
+            })
+            headers = {
+                'Content-Length': '%s' % m.len,
+                'Content-Type': m.content_type,
+                'X-UPLOAD-SOURCE': 'pinner_uploader'
+            }
+            url = self._upload_image_url(file_name)
+            r = self.post(url=url, data=m, headers=headers, ajax=True)
+        return self.json_codec.loads(r.content)
+
+    def upload_pins(self, board_id, files, description='', max_concurrency=4,
+                    callback=None, progress=None):
+        """
+        Upload many image files and pin them to a board. `files` is an
+        iterable of file paths, or of dicts (or tuples) with the arguments
+        of upload_pin() but board_id; `description` is the default one.
+
+        Up to max_concurrency images are streamed from disk at the same
+        time, each file closed once sent, while the pins of the images
+        already uploaded are created by another max_concurrency workers.
+        With an upload cache, images uploaded before are not sent again.
+        `callback` gets the BulkResult of each file as it finishes (with
+        its 'size', 'image_url' and whether it was 'uploaded' in data), and
+        `progress` the number of files finished and of bytes uploaded so far.
+        :rtype: list of BulkResult
+        """
+        self.login_required()
+
+        def create(result, image_url, key, options, started):
+            try:
+                response = self.call_resource(*self._upload_pin_request(
+                    board_id, image_url, options['description'],
+                    options['share_facebook'], options['share_twitter']))
+                self._uploaded_pin(key, response)
+                data = result.data
+                result.set_response(response)
+                result.data = data
+            except Exception as e:
+                result.set_exception(e)
+            result.latency = time.time() - started
+            return result
+
+        def upload(index, operation):
+            result = BulkResult(index, operation)
+            started = time.time()
+            options = self._upload_options(operation, description)
+            try:
+                result.data = {'size': os.path.getsize(options['image_file'])}
+                image_url, key, uploaded = self.__image_url(options['image_file'])
+                result.data['uploaded'] = uploaded
+                if image_url is not None:
+                    result.data['image_url'] = image_url
+                    return creates.submit(create, result, image_url, key,
+                                          options, started)
+                result.error = 'Image upload failed'
+            except Exception as e:
+                result.set_exception(e)
+            result.latency = time.time() - started
+            return result
+
+        executor = BulkExecutor(max_workers=max_concurrency,
+                                callback=self._upload_progress(callback, progress))
+        with ThreadPoolExecutor(max_workers=max_concurrency) as creates:
+            return executor.run_tasks(upload, files)
 
     def repin(self, board_id, pin_id, link='', title='', description='',
               share_facebook=False, share_twitter=False):
@@ -392,414 +1176,225 @@ class Pinterest:
         Save this Pin to a Board. For 'save button'
         """
         self.login_required()
-        url = self.home_page + 'resource/RepinResource/create/'
-        data = url_encode({
-            'source_url': '/pin/%s/' % pin_id,
-            'data': json.dumps({
-                'options': {
-                    "board_id": board_id,
-                    "pin_id": pin_id,
-                    "link": link,
-                    "title": title,
-                    "description": description,
-                    "is_buyable_pin": False,
-                    "share_facebook": share_facebook,
-                    "share_twitter": share_twitter
-                },
-                "context": {}
-            }).replace(' ', '')
-        })
-        result = self.post(url=url, data=data, ajax=True).json()
-        if result['resource_response']['error'] is None:
-            pin = {'id': result['resource_response']['data']['id']}
-            return pin
-        return None
+        result = self.call_resource(*self._repin_request(board_id, pin_id, link, title,
+                                                         description, share_facebook,
+                                                         share_twitter))
+        return self._pin_result(result)
 
     def like(self, pin_id):
         self.login_required()
-        url = self.home_page + 'resource/PinLikeResource/create/'
-        data = url_encode({
-            'source_url': '/pin/%s/' % pin_id,
-            'data': json.dumps({
-                'options': {"pin_id": pin_id},
-                "context": {}
-            }).replace(' ', '')
-        })
-        result = self.post(url=url, data=data, ajax=True).json()
-        if result['resource_response']['error'] is None:
-            return True
-        return False
+        return self._resource_ok(self.call_resource(*self._like_request('create', pin_id)))
 
     def undo_like(self, pin_id):
         self.login_required()
-        url = self.home_page + 'resource/PinLikeResource/delete/'
-        data = url_encode({
-            'source_url': '/pin/%s/' % pin_id,
-            'data': json.dumps({
-                'options': {"pin_id": pin_id},
-                "context": {}
-            }).replace(' ', '')
-        })
-        result = self.post(url=url, data=data, ajax=True).json()
-        if result['resource_response']['error'] is None:
-            return True
-        return False
+        return self._resource_ok(self.call_resource(*self._like_request('delete', pin_id)))
 
     def delete_pin(self, pin_id):
         self.login_required()
-        url = self.home_page + 'resource/PinResource/delete/'
-        data = url_encode({
-            'source_url': '/pin/%s/' % pin_id,
-            'data': json.dumps({
-                'options': {"id": pin_id},
-                "context": {}
-            }).replace(' ', '')
-        })
-        result = self.post(url=url, data=data, ajax=True).json()
-        if result['resource_response']['error'] is None:
-            return True
-        return False
+        return self._resource_ok(self.call_resource(*self._delete_pin_request(pin_id)))
 
     def comment(self, pin_id, text):
         self.login_required()
-        url = self.home_page + 'resource/PinCommentResource/create/'
-        data = url_encode({
-            'source_url': '/pin/%s/' % pin_id,
-            'data': json.dumps({
-                'options': {"pin_id": "657384876829999984", "text": text},
-                "context": {}
-            }).replace(' ', '')
-        })
-        result = self.post(url=url, data=data, ajax=True).json()
-        if result['resource_response']['error'] is None:
-            comment = {
-                'id': result['resource_response']['data']['id'],
-                'text': result['resource_response']['data']['text'],
-                'created_at': result['resource_response']['data']['created_at']
-            }
-            return comment
-        return None
+        return self._comment_result(self.call_resource(*self._comment_request(pin_id, text)))
 
     def delete_comment(self, pin_id, comment_id):
         self.login_required()
-        url = self.home_page + 'resource/PinCommentResource/delete/'
-        data = url_encode({
-            'source_url': '/pin/%s/' % pin_id,
-            'data': json.dumps({
-                'options': {"pin_id": pin_id, "comment_id": comment_id},
-                "context": {}
-            }).replace(' ', '')
-        })
-        result = self.post(url=url, data=data, ajax=True).json()
-        if result['resource_response']['error'] is None:
-            return True
-        return False
+        result = self.call_resource(*self._delete_comment_request(pin_id, comment_id))
+        return self._resource_ok(result)
 
     def invite(self, board_id, board_url, user_id):
         self.login_required()
-        url = self.home_page + 'resource/BoardInviteResource/create/'
-        data = url_encode({
-            'source_url': board_url,
-            'data': json.dumps({
-                'options': {"board_id": board_id, "invited_user_ids": [user_id]},
-                "context": {}
-            }).replace(' ', '')
-        })
-        result = self.post(url=url, data=data, ajax=True).json()
-        if result['resource_response']['error'] is None:
-            return True
-        return False
+        result = self.call_resource(*self._invite_request(board_id, board_url, user_id))
+        return self._resource_ok(result)
 
     def delete_invite(self, board_id, board_url, invited_user_id, also_block=False):
         self.login_required()
-        url = self.home_page + 'resource/BoardInviteResource/delete/'
-        data = url_encode({
-            'source_url': board_url,
-            'data': json.dumps({
-                'options': {
-                    "ban": also_block,
-                    "board_id": board_id,
-                    "field_set_key": "boardEdit",
-                    "invited_user_id": invited_user_id},
-                "context": {}
-            }).replace(' ', '')
-        })
-        result = self.post(url=url, data=data, ajax=True).json()
-        if result['resource_response']['error'] is None:
-            return True
-        return False
+        result = self.call_resource(*self._delete_invite_request(board_id, board_url,
+                                                                 invited_user_id, also_block))
+        return self._resource_ok(result)
+
+    def pin_many(self, pins, max_workers=4, interval=0.0, callback=None):
+        """
+        Create many pins from image urls. `pins` is an iterable of dicts
+        (or tuples) with the arguments of pin().
+        :rtype: list of BulkResult
+        """
+        return self.__bulk(self._pin_request, pins, max_workers, interval, callback)
+
+    def repin_many(self, repins, max_workers=4, interval=0.0, callback=None):
+        """
+        Save many pins to boards. `repins` is an iterable of dicts (or
+        tuples) with the arguments of repin().
+        :rtype: list of BulkResult
+        """
+        return self.__bulk(self._repin_request, repins, max_workers, interval, callback)
+
+    def like_many(self, pin_ids, max_workers=4, interval=0.0, callback=None):
+        """
+        Like many pins
+        :rtype: list of BulkResult
+        """
+        return self.__bulk(functools.partial(self._like_request, 'create'),
+                           pin_ids, max_workers, interval, callback)
+
+    def follow_many(self, boards, max_workers=4, interval=0.0, callback=None):
+        """
+        Follow many boards. `boards` is an iterable of dicts (or tuples)
+        with the arguments of follow_board().
+        :rtype: list of BulkResult
+        """
+        return self.__bulk(functools.partial(self._follow_board_request, 'create'),
+                           boards, max_workers, interval, callback)
+
+    def __bulk(self, build_request, operations, max_workers, interval, callback):
+        self.login_required()
+        executor = BulkExecutor(max_workers=max_workers, interval=interval,
+                                callback=callback)
+
+        def call(*args, **kwargs):
+            return self.call_resource(*build_request(*args, **kwargs))
+        return executor.run(call, operations)
 
     def search(self, scope, query, next_page=False):
-        if next_page is True and self.next_book_marks[scope].get(query):
+        """
+        Return the first page of results of a search, or with `next_page`
+        the page after the last one returned, which search_cursors keeps
+        (across restarts when it saves to the registry)
+        :rtype: list
+        """
+        if next_page is True and self._has_next_page(scope, query):
             return self.__search_next_page(scope, query)
-        q = url_encode({
-            'q': query,
-            '_': '%s' % int(time.time() * 1000)
-        })
-        url = self.home_page + 'search/%s/?%s' % (scope, q)
-        r = self.get(url=url)
-        html = r.content[r.content.find(b'application/json'):]
-        html = html[html.find(b'{'):html.find(b'</script>')]
-        search_result = json.loads(html)
-        results = []
-        try:
-            if search_result['resources']['data']['BaseSearchResource']:
-                print(search_result['resources']['data']['BaseSearchResource'].values())
-                search_resource = list(search_result['resources'] \
-                                       ['data']['BaseSearchResource'].values())[0]
-                results = search_resource['data']['results']
-                self.next_book_marks[scope][query] = search_resource['nextBookmark']
-        except KeyError:
-            pass
-        return results
+        script = self.__fetch_script(self._search_url(scope, query), b'application/json')
+        return self._search_script_result(script, scope, query)
 
     def __search_next_page(self, scope, query):
-        q = url_encode({
-            'source_url': '/search/%s/?q=%s' % (scope, query),
-            'data': json.dumps({
-                'options': {
-                    'bookmarks': [self.next_book_marks[scope][query]],
-                    'query': query,
-                    'scope': scope
-                },
-                "context": {}
-            }).replace(' ', ''),
-            '_': '%s' % int(time.time() * 1000)
-        })
-        url = self.home_page + 'resource/SearchResource/get/?%s' % q
-        r = self.get(url=url, ajax=True).json()
-        results = []
-        try:
-            if r['resource_response']['error'] is not None:
-                error = r['resource_response']['error']
-                raise PinterestException('[%s] %s' % (error['http_status'], error['message']))
-            results = r['resource_response']['data']
-            bookmarks = r['resource']['options']['bookmarks']
-            if isinstance(bookmarks, basestring):
-                self.next_book_marks[scope][query] = bookmarks
-            else:
-                self.next_book_marks[scope][query] = bookmarks[0]
-        except KeyError:
-            pass
-        return results
+        r = self.call_resource(*self._search_next_page_request(scope, query))
+        return self._search_next_page_result(r, scope, query)
 
     def search_boards(self, query, next_page=False):
         results = self.search('boards', query, next_page=next_page)
-        boards = []
-        for result in results:
-            if result['type'] == 'board':
-                boards.append({
-                    'id': result['id'],
-                    'name': result['name'],
-                    'url': result['url'],
-                    'privacy': result['privacy'],
-                    'layout': result['layout'],
-                    'followed_by_me': result['followed_by_me'],
-                    'owner': {
-                        'id': result['owner']['id'],
-                        'username': result['owner']['username'],
-                        'full_name': result['owner']['full_name'],
-                        'followed_by_me': result['owner']['explicitly_followed_by_me'],
-                    },
-                    'description': result['description'],
-                    'pin_count': result['pin_count'],
-                })
-        return boards
+        return self._search_boards_result(results)
 
     def search_pins(self, query, next_page=False):
         results = self.search('pins', query, next_page=next_page)
-        pins = []
-        for result in results:
-            if result['type'] == 'pin':
-                pins.append({
-                    'id': result['id'],
-                    'description': result['description'],
-                    'img': result['images']['orig']['url'],
-                    'like_count': result['like_count'],
-                    'comment_count': result['comment_count'],
-                    'repin_count': result['repin_count'],
-                    'liked_by_me': result['liked_by_me'],
-                    'link': result['link'],
-                    'title': result['title'],
-                    'is_video': result['is_video'],
-                    'board': {
-                        'id': result['board']['id'],
-                        'name': result['board']['name'],
-                        'url': result['board']['url'],
-                        'privacy': result['board']['privacy'],
-                        'followed_by_me': result['board']['followed_by_me'],
-                        'owner': {'id': result['board']['owner']['id']},
-                    },
-                    'pinner': {
-                        'id': result['pinner']['id'],
-                        'username': result['pinner']['username'],
-                    }
-                })
-        return pins
+        return self._search_pins_result(results)
 
     def search_users(self, query, next_page=False):
         results = self.search('people', query, next_page=next_page)
-        users = []
-        for result in results:
-            if result['type'] == 'user':
-                users.append({
-                    'id': result['id'],
-                    'username': result['username'],
-                    'full_name': result['full_name'],
-                    'blocked_by_me': result['blocked_by_me'],
-                    'image_medium_url': result['image_medium_url'],
-                    'followed_by_me': result['explicitly_followed_by_me'],
-                    'follower_count': result['follower_count'],
-                    'pin_count': result['pin_count'],
-                    'board_count': result['board_count'],
-                })
-        return users
+        return self._search_users_result(results)
 
-    def sections(self, tablero):
+    def iter_search_boards(self, query, limit=None, prefetch=1, bookmarks=None):
         """
-        Return all sections from a board
+        Iterate over the boards found by a search, see iter_search_pins()
+        :rtype: PrefetchFeedIterator
         """
-        self.login_required()
+        return self.__iter_search('boards', query, self._search_boards_result,
+                                  limit, prefetch, bookmarks)
 
-        bookmarks = []
-        sections = []
-
-        while True:
-            data = url_encode({
-                'source_url': '/%s/%s/' % (self.user['username'], tablero['name']),
-                'data': json.dumps({
-                    'options': {'bookmarks': bookmarks,
-                                'isPrefetch': 'False',
-                                'board_id': tablero['id'],
-                                'redux_normalize_feed': 'true'},
-                    "context": {}
-                }).replace(' ', ''),
-                '_': '%s' % int(time.time() * 1000)
-            })
-            url = self.home_page + 'resource/BoardSectionsResource/get/?%s' % data
-
-            r = self.get(url=url, ajax=True)
-            result = r.json()
-
-            try:
-                if result['resource_response']['data']:
-                    for section in result['resource_response']['data']:
-                        sections.append({'id': section['id'],
-                                         'title': section['title'],
-                                         'slug': section['slug']})
-            except KeyError:
-                pass
-
-            bookmarks = result['resource']['options']['bookmarks']
-            if bookmarks[0] == '-end-':
-                break
+    def iter_search_pins(self, query, limit=None, prefetch=1, bookmarks=None):
+        """
+        Iterate over the pins found by a search, at most `limit`. The next
+        `prefetch` pages are fetched in the background while the current
+        one is consumed. Pass the `bookmarks` of a previous iterator to
+        resume it. Unlike search_pins(), it leaves search_cursors alone.
+        :rtype: PrefetchFeedIterator
+        """
+        return self.__iter_search('pins', query, self._search_pins_result,
+                                  limit, prefetch, bookmarks)
 
-        return sections
+    def iter_search_users(self, query, limit=None, prefetch=1, bookmarks=None):
+        """
+        Iterate over the users found by a search, see iter_search_pins()
+        :rtype: PrefetchFeedIterator
+        """
+        return self.__iter_search('people', query, self._search_users_result,
+                                  limit, prefetch, bookmarks)
+
+    def __iter_search(self, scope, query, parse, limit, prefetch, bookmarks):
+        def fetch_page(page):
+            if page:
+                r = self.call_resource(*self._search_page_request(scope, query, page))
+                results, next_page = self._search_page_result(r)
+            else:
+                script = self.__fetch_script(self._search_url(scope, query),
+                                             b'application/json')
+                results, next_page = self._search_script_page(script)
+            return parse(results), next_page
+        return PrefetchFeedIterator(fetch_page, bookmarks, prefetch=prefetch, limit=limit)
 
-    def pins_board(self, tablero):
+    def iter_sections(self, tablero, bookmarks=None):
         """
-        Return all pines from a board (not from the sections)
+        Iterate over the sections of a board, one page at a time.
+        Pass the `bookmarks` of a previous iterator to resume it.
+        :rtype: FeedIterator
         """
         self.login_required()
 
-        bookmarks = []
-        pins = []
+        def fetch_page(page):
+            response = self.call_resource(*self._sections_request(tablero, page))
+            return self._sections_result(response)
+        return FeedIterator(fetch_page, bookmarks)
 
-        while True:
+    def iter_board_pins(self, tablero, bookmarks=None):
+        """
+        Iterate over the pins of a board (not from the sections), one page
+        at a time. Pass the `bookmarks` of a previous iterator to resume it.
+        :rtype: FeedIterator
+        """
+        self.login_required()
 
-            data = url_encode({
-                'source_url': '/%s/%s/' % (self.user['username'],
-                                           tablero['name']),
-                'data': json.dumps({
-                    'options': {'bookmarks': bookmarks,
-                                'isPrefetch': 'False',
-                                'board_id': tablero['id'],
-                                'board_url': '/%s/%s/' % (self.user['username'],
-                                                          tablero['name']),
-                                'filter_section_pins': 'true',
-                                'redux_normalize_feed': 'true'},
-                    "context": {}
-                }).replace(' ', ''),
-                '_': '%s' % int(time.time() * 1000)
-            })
-            url = self.home_page + 'resource/BoardFeedResource/get/?%s' % data
+        def fetch_page(page):
+            response = self.call_resource(*self._pins_board_request(tablero, page))
+            return self._pins_result(response)
+        return FeedIterator(fetch_page, bookmarks)
 
-            r = self.get(url=url, ajax=True)
-            result = r.json()
+    def iter_section_pins(self, tablero, seccion, bookmarks=None):
+        """
+        Iterate over the pins of a section, one page at a time.
+        Pass the `bookmarks` of a previous iterator to resume it.
+        :rtype: FeedIterator
+        """
+        self.login_required()
 
-            try:
-                if result['resource_response']['data']:
-                    for pin in result['resource_response']['data']:
-                        pins.append({'id': pin['id'],
-                                     'description': pin['description'],
-                                     'image': pin['images']['orig']['url'],
-                                     'link': pin['link'],
-                                     'title': pin['title']})
-            except KeyError:
-                pass
+        def fetch_page(page):
+            response = self.call_resource(*self._pins_section_request(tablero, seccion, page))
+            return self._pins_result(response)
+        return FeedIterator(fetch_page, bookmarks)
 
-            bookmarks = result['resource']['options']['bookmarks']
-            if bookmarks[0] == '-end-':
-                break
+    def sections(self, tablero):
+        """
+        Return all sections from a board
+        """
+        return list(self.iter_sections(tablero))
 
-        return pins
+    def pins_board(self, tablero):
+        """
+        Return all pines from a board (not from the sections)
+        """
+        return list(self.iter_board_pins(tablero))
 
     def pins_section(self, tablero, seccion):
         """
         Return all pins of a section (from a board)
         """
-        self.login_required()
-
-        bookmarks = []
-        pins = []
+        return list(self.iter_section_pins(tablero, seccion))
 
-        while True:
-
-            data = url_encode({
-                'source_url': '/%s/%s/%s/' % (self.user['username'],
-                                              tablero['name'],
-                                              seccion['slug']),
-                'data': json.dumps({
-                    'options': {'bookmarks': bookmarks,
-                                'isPrefetch': 'False',
-                                'section_id': seccion['id'],
-                                'redux_normalize_feed': 'false',
-                                'is_own_profile_pins': 'true'},
-                    "context": {}
-                }).replace(' ', ''),
-                '_': '%s' % int(time.time() * 1000)
-            })
-
-            url = self.home_page + 'resource/BoardSectionPinsResource/get/?%s' % data
-
-            r = self.get(url=url, ajax=True)
-            result = r.json()
-
-            try:
-                if result['resource_response']['data']:
-                    for pin in result['resource_response']['data']:
-                        pins.append({'id': pin['id'],
-                                     'description': pin['description'],
-                                     'image': pin['images']['orig']['url'],
-                                     'link': pin['link'],
-                                     'title': pin['title']})
-            except KeyError:
-                pass
-
-            bookmarks = result['resource']['options']['bookmarks']
-
-            if bookmarks[0] == '-end-':
-                break
-
-        return pins
-
-    def fetch_user_pins(self):
+    def fetch_user_pins(self, max_workers=None):
         """
         Return all boards, sections and pins from the logged user with
         extra information.
+
+        With max_workers, boards and sections are crawled concurrently by
+        that many threads. The result keeps the same order, and a board or
+        section whose crawl failed gets its exception under 'error' instead
+        of aborting the whole crawl.
         """
         boards = self.boards()
 
+        if max_workers:
+            self.__fetch_user_pins_concurrently(boards, max_workers)
+            return boards
+
         for board in boards:
 
             pins = self.pins_board(board)
@@ -814,3 +1409,128 @@ class Pinterest:
             board['sections'] = sections
 
         return boards
+
+    def sync_user_pins(self, snapshot):
+        """
+        Bring `snapshot`, an AccountSnapshot of a previous sync (empty the
+        first time), up to date with the boards, sections and pins of the
+        logged user and return what changed.
+
+        Boards and sections whose counts did not change are not fetched,
+        and a feed stops paginating at its first known pin when its count
+        shows nothing was removed from it.
+        :rtype: SyncDelta
+        """
+        delta = SyncDelta()
+        boards = self.boards()
+        for board in boards:
+            entry = snapshot.boards.get(board['id'])
+            if entry is None:
+                entry = {'board': board.to_dict(), 'pins': [], 'sections': {}}
+                snapshot.boards[board['id']] = entry
+                delta.boards_added.append(board)
+                self.__sync_board(board, entry, None, delta)
+                continue
+            old = entry['board']
+            entry['board'] = board.to_dict()
+            if old.get('name') != board.get('name') or old.get('url') != board.get('url'):
+                delta.boards_changed.append(board)
+            if board.get('pin_count') is not None and \
+                    old.get('pin_count') == board.get('pin_count') and \
+                    old.get('section_count') == board.get('section_count'):
+                continue
+            self.__sync_board(board, entry, old, delta)
+        board_ids = set(board['id'] for board in boards)
+        for board_id in list(snapshot.boards):
+            if board_id not in board_ids:
+                delta.boards_removed.append(snapshot.boards.pop(board_id)['board'])
+        return delta
+
+    def __sync_board(self, board, entry, old, delta):
+        sections = []
+        if board.get('section_count') or entry['sections']:
+            sections = self.sections(board)
+        # Pins added to sections, to tell them from pins added to the board
+        # feed itself; None once it can not be known
+        sections_growth = 0
+        for section in sections:
+            section_entry = entry['sections'].get(section['id'])
+            if section_entry is None:
+                section_entry = {'section': section.to_dict(), 'pins': []}
+                entry['sections'][section['id']] = section_entry
+                delta.sections_added.append(dict(section, board_id=board['id']))
+                old_count = 0
+            else:
+                old_section = section_entry['section']
+                section_entry['section'] = section.to_dict()
+                if old_section.get('title') != section.get('title') or \
+                        old_section.get('slug') != section.get('slug'):
+                    delta.sections_changed.append(dict(section, board_id=board['id']))
+                old_count = old_section.get('pin_count')
+                new_count = section.get('pin_count')
+                if new_count is not None and old_count == new_count:
+                    continue
+            growth = None
+            if section.get('pin_count') is not None and old_count is not None:
+                growth = section['pin_count'] - old_count
+            if growth is None or sections_growth is None:
+                sections_growth = None
+            else:
+                sections_growth += growth
+            self.__sync_feed(self.iter_section_pins(board, section), section_entry,
+                             growth, delta, board['id'], section['id'])
+        section_ids = set(section['id'] for section in sections)
+        for section_id in list(entry['sections']):
+            if section_id not in section_ids:
+                removed = entry['sections'].pop(section_id)
+                delta.sections_removed.append(dict(removed['section'], board_id=board['id']))
+                sections_growth = None
+        # The board pin count includes the pins of its sections
+        growth = None
+        if old is not None and sections_growth is not None and \
+                board.get('pin_count') is not None and old.get('pin_count') is not None:
+            growth = board['pin_count'] - old['pin_count'] - sections_growth
+        self.__sync_feed(self.iter_board_pins(board), entry, growth, delta, board['id'])
+
+    @staticmethod
+    def __sync_feed(feed, entry, growth, delta, board_id, section_id=None):
+        added, removed, changed, entry['pins'] = AccountSnapshot.diff_feed(
+            feed, entry['pins'], growth)
+        where = {'board_id': board_id, 'section_id': section_id}
+        for pin in added:
+            delta.pins_added.append(dict(where, pin=pin))
+        for pin_id in removed:
+            delta.pins_removed.append(dict(where, pin_id=pin_id))
+        for pin in changed:
+            delta.pins_changed.append(dict(where, pin=pin))
+
+    def __fetch_user_pins_concurrently(self, boards, max_workers):
+        # Every crawl is submitted to one pool from this thread, so no
+        # worker ever waits for another and max_workers caps the requests.
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            tasks = {}
+            for board in boards:
+                board['pins'] = []
+                board['sections'] = []
+                tasks[executor.submit(self.pins_board, board)] = ('pins', board, None)
+                tasks[executor.submit(self.sections, board)] = ('sections', board, None)
+            while tasks:
+                done, _ = wait(tasks, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind, board, section = tasks.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        target = board if section is None else section
+                        target.setdefault('error', e)
+                        continue
+                    if kind == 'pins':
+                        board['pins'] = result
+                    elif kind == 'sections':
+                        board['sections'] = result
+                        for section in result:
+                            section['pins'] = []
+                            future = executor.submit(self.pins_section, board, section)
+                            tasks[future] = ('section_pins', board, section)
+                    else:
+                        section['pins'] = result
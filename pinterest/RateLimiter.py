@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Callers reserve tokens and get back how long
+    they must wait before sending, so it works for threads and coroutines.
+    """
+
+    def __init__(self, rate, capacity=None):
+        """
+        :param rate: tokens added per second
+        :param capacity: maximum burst size, defaults to one second of tokens
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.__tokens = self.capacity
+        self.__last = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def __refill(self, now):
+        if now > self.__last:
+            self.__tokens = min(self.capacity,
+                                self.__tokens + (now - self.__last) * self.rate)
+            self.__last = now
+
+    def reserve(self, tokens=1):
+        """
+        Take `tokens` from the bucket and return the seconds to wait before
+        using them
+        :rtype: float
+        """
+        with self.__lock:
+            now = time.monotonic()
+            self.__refill(now)
+            self.__tokens -= tokens
+            wait = max(0.0, self.__last - now)
+            if self.__tokens < 0:
+                wait += -self.__tokens / self.rate
+            return wait
+
+    def acquire(self, tokens=1):
+        """
+        Block until `tokens` are available
+        :rtype: float
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds):
+        """
+        Hand out no token for the next `seconds`
+        """
+        with self.__lock:
+            now = time.monotonic()
+            self.__refill(now)
+            self.__tokens = min(self.__tokens, 0.0)
+            self.__last = max(self.__last, now + seconds)
+
+    def set_rate(self, rate):
+        with self.__lock:
+            self.__refill(time.monotonic())
+            self.rate = float(rate)
+
+
+class RateLimiter:
+    """
+    Token buckets per endpoint family, with adaptive throttling: a 429 (or a
+    Retry-After) halves the family rate and pauses it, and every successful
+    call then brings the rate back up towards its configured value.
+
+    One RateLimiter can be shared by many Pinterest instances and threads
+    to pace all of them together.
+    """
+    READ = 'read'
+    WRITE = 'write'
+    UPLOAD = 'upload'
+
+    def __init__(self, read_rate=5.0, write_rate=1.0, upload_rate=0.5,
+                 burst=None, min_ratio=0.1, recovery=0.05, backoff=30.0):
+        """
+        :param burst: bucket capacity of every family, defaults to one
+            second of requests
+        :param min_ratio: lowest fraction of the configured rate the
+            adaptive throttling can go down to
+        :param recovery: fraction of the configured rate recovered after
+            each successful call
+        :param backoff: seconds to pause a family on a 429 without
+            Retry-After header
+        """
+        self.rates = {self.READ: read_rate, self.WRITE: write_rate,
+                      self.UPLOAD: upload_rate}
+        self.buckets = dict((family, TokenBucket(rate, burst))
+                            for family, rate in self.rates.items())
+        self.min_ratio = min_ratio
+        self.recovery = recovery
+        self.backoff_time = backoff
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def family(cls, method, url):
+        """
+        Return the endpoint family of a request
+        :rtype: str
+        """
+        if '/upload-image/' in url:
+            return cls.UPLOAD
+        if method.upper() == 'GET':
+            return cls.READ
+        return cls.WRITE
+
+    def reserve(self, family):
+        """
+        :rtype: float
+        """
+        return self.buckets[family].reserve()
+
+    def acquire(self, family):
+        """
+        Block until a request of `family` can be sent
+        :rtype: float
+        """
+        return self.buckets[family].acquire()
+
+    def backoff(self, family, retry_after=None):
+        """
+        Slow `family` down after the site asked us to (429 or Retry-After)
+        """
+        bucket = self.buckets[family]
+        with self.__lock:
+            bucket.set_rate(max(self.rates[family] * self.min_ratio, bucket.rate / 2.0))
+        bucket.pause(retry_after if retry_after is not None else self.backoff_time)
+
+    def success(self, family):
+        """
+        Recover part of the configured rate of `family` after a successful call
+        """
+        bucket = self.buckets[family]
+        rate = self.rates[family]
+        if bucket.rate < rate:
+            with self.__lock:
+                bucket.set_rate(min(rate, bucket.rate + rate * self.recovery))
+
+    def update(self, family, status_code, retry_after=None):
+        """
+        Feed the response of a request of `family` back to the limiter
+        """
+        if status_code == 429 or (retry_after is not None and status_code >= 500):
+            self.backoff(family, retry_after)
+        elif status_code < 400:
+            self.success(family)
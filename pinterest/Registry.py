@@ -1,59 +1,346 @@
 # -*- coding: utf-8 -*-
+import atexit
 import os
 import pickle
+import threading
+import time
+from pinterest.utils import write_atomic
 
 
 class Registry:
-    __committed = True
-    __path = None
-    __data = dict()
+    """
+    Key/value store of one account (cookies, CSRF token, user agent...)
+    persisted as a pickle file. The file is read on the first access, and
+    only written once something changed.
+    """
 
-    def __init__(self, path):
-        self.__path = path
-        if os.path.isfile(path):
-            with open(path, 'rb') as f:
-                self.__data = dict(pickle.load(f))
+    def __init__(self, path, write_behind=False, flush_interval=5.0,
+                 flush_threshold=50):
+        """
+        :param write_behind: when True, commit() only marks the registry as
+            dirty and the changes are written later: after flush_interval
+            seconds, once flush_threshold commits are pending, on flush(),
+            close() or at interpreter exit.
+        """
+        self._path = path
+        self.__data = None
+        self._dirty = set()
+        self._lock = threading.RLock()
+        self._pending = 0
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+
+    @property
+    def _data(self):
+        """
+        The stored keys and values, loaded on first use
+        :rtype: dict
+        """
+        if self.__data is None:
+            with self._lock:
+                if self.__data is None:
+                    # Only kept once read in full: a load that fails leaves
+                    # nothing a flush could write over the stored registry
+                    self.__data = self._load()
+        return self.__data
+
+    def _load(self):
+        """
+        Read the stored keys and values
+        :rtype: dict
+        """
+        if os.path.isfile(self._path):
+            with open(self._path, 'rb') as f:
+                return dict(pickle.load(f))
+        return {}
+
+    def _write(self, keys):
+        """
+        Persist the registry. `keys` are the keys changed since the last
+        write; the pickle backend always rewrites the whole file.
+        """
+        write_atomic(self._path, self._data)
 
     def get(self, key, default=None):
-        if key in self.__data:
-            return self.__data[key]
+        if key in self._data:
+            return self._data[key]
         return default
 
     def set(self, key, value, commit=True):
         if key:
-            self.__data[key] = value
-            self.__committed = False
+            with self._lock:
+                self._data[key] = value
+                self._dirty.add(key)
             if commit:
                 self.commit()
             return True
         return False
 
     def update(self, key, value, commit=True):
-        if hasattr(self.get(key), 'update'):
-            self.get(key).update(value)
-            self.__committed = False
+        current = self.get(key)
+        if hasattr(current, 'update'):
+            with self._lock:
+                before = _fingerprint(current)
+                current.update(value)
+                if before is not None and _fingerprint(current) == before:
+                    return True
+                self._dirty.add(key)
             if commit:
                 self.commit()
             return True
         return self.set(key, value, commit)
 
     def commit(self):
-        if not self.__committed:
-            with open(self.__path, 'wb') as f:
-                pickle.dump(self.__data, f, 1)
-            self.__committed = True
-        return self.__committed
+        if not self.write_behind:
+            return self.flush()
+        with self._lock:
+            if not self._dirty:
+                return True
+            self._pending += 1
+            if self._pending >= self.flush_threshold:
+                return self.flush()
+            _flusher.schedule(self, self.flush_interval)
+        return False
+
+    def flush(self):
+        """
+        Write pending changes now. The pickle backend writes a temporary
+        file which then replaces the registry file, so a crash never leaves
+        a truncated registry behind.
+        :rtype: bool
+        """
+        with self._lock:
+            self._pending = 0
+            if self._dirty:
+                self._write(self._dirty)
+                self._dirty = set()
+            _flusher.cancel(self)
+        return True
+
+    def close(self):
+        """
+        Write pending changes and stop writing behind: later commits are
+        written at once, and the registry is no longer flushed in the
+        background or at exit.
+        :rtype: bool
+        """
+        with self._lock:
+            self.write_behind = False
+            return self.flush()
 
     def hasKey(self, key):
-        return key in self.__data
+        return key in self._data
 
     def keys(self):
-        return self.__data.keys()
+        return self._data.keys()
 
     class Key:
         USER_AGENT = 'user_agent'
         CSRF_TOKEN = 'token'
         COOKIES = 'cookies'
+        USER = 'user'
+        SEARCH_CURSORS = 'search_cursors'
 
         def __init__(self):
             pass
+
+
+class SQLiteRegistry(Registry):
+    """
+    Registry of one account stored in a SQLite database shared by many
+    accounts. The database runs in WAL mode so readers never block the
+    writer, and commits only upsert the rows of the keys that changed.
+    """
+    __connections = {}
+    __connections_lock = threading.Lock()
+
+    def __init__(self, path, account, write_behind=False, flush_interval=5.0,
+                 flush_threshold=50):
+        self.account = account
+        self.__connection = None
+        Registry.__init__(self, path, write_behind=write_behind,
+                          flush_interval=flush_interval,
+                          flush_threshold=flush_threshold)
+
+    @classmethod
+    def __connect(cls, path):
+        """
+        Return the (connection, lock) pair of the database at `path`,
+        shared by every registry of the process.
+        """
+        # Only SQLite registries pay for importing sqlite3
+        import sqlite3
+        path = os.path.realpath(path)
+        with cls.__connections_lock:
+            if path not in cls.__connections:
+                directory = os.path.dirname(path)
+                if not os.path.isdir(directory):
+                    os.makedirs(directory)
+                connection = sqlite3.connect(path, timeout=30,
+                                             check_same_thread=False,
+                                             isolation_level=None)
+                connection.execute('PRAGMA journal_mode=WAL')
+                connection.execute('PRAGMA synchronous=NORMAL')
+                connection.execute('CREATE TABLE IF NOT EXISTS registry ('
+                                   'account TEXT NOT NULL, '
+                                   'key TEXT NOT NULL, '
+                                   'value BLOB, '
+                                   'PRIMARY KEY (account, key)) WITHOUT ROWID')
+                cls.__connections[path] = (connection, threading.Lock())
+            return cls.__connections[path]
+
+    @property
+    def _connection(self):
+        """
+        The (connection, lock) pair of the database, opened on first use
+        :rtype: tuple
+        """
+        if self.__connection is None:
+            self.__connection = SQLiteRegistry.__connect(self._path)
+        return self.__connection
+
+    def _load(self):
+        connection, lock = self._connection
+        with lock:
+            rows = connection.execute('SELECT key, value FROM registry '
+                                      'WHERE account = ?',
+                                      (self.account,)).fetchall()
+        return dict((key, pickle.loads(value)) for key, value in rows)
+
+    def _write(self, keys):
+        rows = [(self.account, key, pickle.dumps(self._data[key], 2))
+                for key in keys if key in self._data]
+        connection, lock = self._connection
+        with lock:
+            connection.execute('BEGIN')
+            try:
+                connection.executemany('INSERT OR REPLACE INTO registry '
+                                       '(account, key, value) VALUES (?, ?, ?)',
+                                       rows)
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+            connection.execute('COMMIT')
+
+    @classmethod
+    def accounts(cls, path):
+        """
+        Return the accounts stored in the database at `path`
+        :rtype: list
+        """
+        connection, lock = cls.__connect(path)
+        with lock:
+            rows = connection.execute('SELECT DISTINCT account FROM registry').fetchall()
+        return [row[0] for row in rows]
+
+
+def _fingerprint(value):
+    """
+    Return a comparable snapshot of a mapping or cookie jar, used to detect
+    whether an update actually changed anything.
+    """
+    if hasattr(value, 'set_cookie'):
+        return sorted((c.domain, c.path, c.name, c.value, c.expires)
+                      for c in value)
+    try:
+        return sorted(value.items())
+    except (AttributeError, TypeError):
+        return None
+
+
+class _Flusher:
+    """
+    Writes the pending changes of the write-behind registries of the
+    process: each one flush_interval seconds after its first pending
+    commit, from a single thread shared by all of them, and every one left
+    at interpreter exit, from a single atexit hook.
+
+    A registry with pending changes is held until they are written, so the
+    cookies of a client dropped before its flush are still saved.
+    """
+
+    def __init__(self):
+        # Registry -> time.monotonic() to flush it at, None for exit only
+        self.__deadlines = {}
+        self.__condition = threading.Condition()
+        self.__thread = None
+        self.__hooked = False
+
+    def schedule(self, registry, delay):
+        """
+        Flush `registry` in `delay` seconds, at exit only when None, unless
+        it is scheduled already
+        """
+        with self.__condition:
+            if registry in self.__deadlines:
+                return
+            self.__deadlines[registry] = None if delay is None else time.monotonic() + delay
+            if not self.__hooked:
+                atexit.register(self.flush_all)
+                self.__hooked = True
+            if delay is None:
+                return
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__run, name='RegistryFlusher')
+                self.__thread.daemon = True
+                self.__thread.start()
+            self.__condition.notify()
+
+    def cancel(self, registry):
+        """
+        Release `registry`, flushed or closed. The exit hook goes once no
+        registry is left.
+        """
+        with self.__condition:
+            self.__deadlines.pop(registry, None)
+            if self.__hooked and not self.__deadlines:
+                atexit.unregister(self.flush_all)
+                self.__hooked = False
+
+    def flush_all(self):
+        """
+        Flush every registry with pending changes, raising the first error
+        once all of them were tried
+        """
+        with self.__condition:
+            registries = list(self.__deadlines.keys())
+        error = None
+        for registry in registries:
+            try:
+                registry.flush()
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+
+    def __run(self):
+        while True:
+            self.__flush_due()
+
+    def __flush_due(self):
+        """
+        Wait for the next deadline and flush the registries due
+        """
+        with self.__condition:
+            now = time.monotonic()
+            due = [registry for registry, deadline in self.__deadlines.items()
+                   if deadline is not None and deadline <= now]
+            if not due:
+                upcoming = [deadline for deadline in self.__deadlines.values()
+                            if deadline is not None]
+                self.__condition.wait(min(upcoming) - now if upcoming else None)
+                return
+        for registry in due:
+            try:
+                registry.flush()
+            except Exception:
+                # The changes stay pending: tried again after another
+                # interval, and raised by flush() or at exit
+                with self.__condition:
+                    if registry in self.__deadlines:
+                        self.__deadlines[registry] = \
+                            time.monotonic() + registry.flush_interval
+
+
+_flusher = _Flusher()
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+import http.client
+import json
+import os
+import sqlite3
+import threading
+import urllib.parse
+import zlib
+import requests.models
+from requests.structures import CaseInsensitiveDict
+from pinterest.exceptions import PinterestRequestException
+from pinterest.Transport import Transport
+
+
+class ReplayTransport(Transport):
+    """
+    Transport recording the responses it gets to a SQLite store and serving
+    them back, for offline runs that give the same results every time.
+
+    RECORD sends every request and stores its response, REPLAY only serves
+    stored responses and raises PinterestRequestException for the others,
+    AUTO serves what is stored and records the rest (cache warming).
+
+    Requests are looked up by method, path and normalized parameters: the
+    '_' timestamp is dropped, resource options are compared as sorted JSON
+    and feed bookmarks are replaced by the number of the page they point
+    to, so a replayed crawl matches its recording even though bookmarks
+    change from one session to the next.
+
+    Credentials never reach the store: passwords are replaced in the keys,
+    and passwords, cookie values and the CSRF token of an exchange are
+    replaced in its stored body and credential headers dropped.
+    """
+    RECORD = 'record'
+    REPLAY = 'replay'
+    AUTO = 'auto'
+    REDACTED = '<redacted>'
+    # Request fields and resource options holding a secret
+    SECRET_FIELDS = ('password',)
+    # Headers holding a secret, never stored
+    SECRET_HEADERS = ('set-cookie', 'cookie', 'authorization', 'x-csrftoken')
+    # Shorter cookie values ('true', '1'...) are left alone in the bodies
+    MIN_SECRET_LENGTH = 6
+
+    def __init__(self, path, mode=AUTO, transport=None, **kwargs):
+        """
+        :param path: SQLite file of the recorded exchanges
+        :param transport: Transport sending the requests that are not
+            replayed, a new one built with `kwargs` when omitted
+        """
+        if mode not in (self.RECORD, self.REPLAY, self.AUTO):
+            raise ValueError('Unknown mode %r' % mode)
+        self.mode = mode
+        self.transport = transport if transport is not None else Transport(**kwargs)
+        self.keep_alive = self.transport.keep_alive
+        self.session = self.transport.session
+        self.stats = {'replayed': 0, 'recorded': 0, 'missed': 0}
+        # Page number of every bookmark seen, by feed
+        self.__pages = {}
+        self.__lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.__connection = sqlite3.connect(path, check_same_thread=False,
+                                            isolation_level=None)
+        self.__connection.execute('PRAGMA journal_mode=WAL')
+        self.__connection.execute('PRAGMA synchronous=NORMAL')
+        self.__connection.execute('CREATE TABLE IF NOT EXISTS exchanges ('
+                                  'key TEXT PRIMARY KEY, '
+                                  'method TEXT NOT NULL, '
+                                  'endpoint TEXT NOT NULL, '
+                                  'status INTEGER NOT NULL, '
+                                  'headers TEXT NOT NULL, '
+                                  'body BLOB NOT NULL) WITHOUT ROWID')
+
+    def __len__(self):
+        with self.__lock:
+            return self.__connection.execute('SELECT COUNT(*) FROM exchanges').fetchone()[0]
+
+    def request(self, method, url, cookies=None, params=None, data=None,
+                headers=None, files=None, timeout=None, proxies=None,
+                stream=None):
+        """
+        :rtype: requests.models.Response
+        """
+        key, feed, page, secrets = self.__key(method, url, params, data)
+        if self.mode != self.RECORD:
+            with self.__lock:
+                row = self.__connection.execute('SELECT status, headers, body FROM exchanges '
+                                                'WHERE key = ?', (key,)).fetchone()
+            if row is not None:
+                self.stats['replayed'] += 1
+                response = self.__response(url, row[0], json.loads(row[1]),
+                                           zlib.decompress(row[2]))
+                self.__index_bookmarks(feed, page, response)
+                return response
+            self.stats['missed'] += 1
+            if self.mode == self.REPLAY:
+                raise PinterestRequestException('No recorded response for %s %s'
+                                                % (method, url))
+        response = self.transport.request(method, url, cookies=cookies, params=params,
+                                          data=data, headers=headers, files=files,
+                                          timeout=timeout, proxies=proxies, stream=stream)
+        # The stored body is decoded already
+        stored_headers = dict((name, value) for name, value in response.headers.items()
+                              if name.lower() not in self.SECRET_HEADERS and
+                              name.lower() not in ('content-encoding', 'transfer-encoding',
+                                                   'content-length'))
+        for jar in (cookies, self.session.cookies, response.cookies):
+            if jar is not None:
+                secrets.extend(jar.values())
+        secrets.extend(value for name, value in (headers or {}).items()
+                       if name.lower() in self.SECRET_HEADERS)
+        with self.__lock:
+            self.__connection.execute('INSERT OR REPLACE INTO exchanges '
+                                      '(key, method, endpoint, status, headers, body) '
+                                      'VALUES (?, ?, ?, ?, ?, ?)',
+                                      (key, method, urllib.parse.urlsplit(url).path,
+                                       response.status_code, json.dumps(stored_headers),
+                                       sqlite3.Binary(zlib.compress(
+                                           self.__redact(response.content, secrets)))))
+        self.stats['recorded'] += 1
+        self.__index_bookmarks(feed, page, response)
+        return response
+
+    def close(self):
+        self.transport.close()
+        with self.__lock:
+            self.__connection.close()
+
+    def __key(self, method, url, params, data):
+        """
+        Return the store key of a request, the feed and page number of the
+        resource calls carrying bookmarks, and the secrets the key leaves out
+        :rtype: tuple
+        """
+        parts = urllib.parse.urlsplit(url)
+        query = urllib.parse.parse_qsl(parts.query)
+        if params:
+            query.extend(params.items() if hasattr(params, 'items') else params)
+        if isinstance(data, (str, bytes)):
+            if isinstance(data, bytes):
+                data = data.decode('utf-8', 'replace')
+            query.extend(urllib.parse.parse_qsl(data))
+        feed = page = None
+        secrets = []
+        normalized = []
+        for name, value in query:
+            if name == '_':
+                continue
+            if name in self.SECRET_FIELDS:
+                secrets.append(value)
+                value = self.REDACTED
+            if name == 'data':
+                try:
+                    payload = json.loads(value)
+                except ValueError:
+                    payload = None
+                if isinstance(payload, dict) and isinstance(payload.get('options'), dict):
+                    options = dict(payload['options'])
+                    for secret in self.SECRET_FIELDS:
+                        if options.get(secret):
+                            secrets.append(options[secret])
+                            options[secret] = self.REDACTED
+                    if 'bookmarks' in options:
+                        bookmarks = options.pop('bookmarks')
+                        feed = '%s %s' % (parts.path, json.dumps(options, sort_keys=True))
+                        page = self.__page(feed, bookmarks)
+                        options['bookmarks'] = page
+                    payload['options'] = options
+                    value = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+            normalized.append((name, value))
+        normalized.sort()
+        key = '%s %s?%s' % (method, parts.path, urllib.parse.urlencode(normalized))
+        return key, feed, page, secrets
+
+    def __redact(self, content, secrets):
+        """
+        Return `content` with the `secrets` it holds, as they are or
+        escaped in JSON strings, replaced
+        :rtype: bytes
+        """
+        redacted = self.REDACTED.encode('utf-8')
+        for secret in set(secrets):
+            if not isinstance(secret, str) or len(secret) < self.MIN_SECRET_LENGTH:
+                continue
+            for form in (secret, json.dumps(secret)[1:-1]):
+                content = content.replace(form.encode('utf-8'), redacted)
+        return content
+
+    def __page(self, feed, bookmarks):
+        """
+        Return the page number of the feed page at `bookmarks`, or the
+        bookmarks themselves when they were never seen in a response
+        """
+        if not bookmarks or bookmarks == [None]:
+            return 0
+        token = json.dumps(bookmarks, sort_keys=True)
+        with self.__lock:
+            return self.__pages.get((feed, token), token)
+
+    def __index_bookmarks(self, feed, page, response):
+        """
+        Remember that the bookmarks of a feed page response lead to the
+        next page
+        """
+        if feed is None or not isinstance(page, int):
+            return
+        try:
+            bookmarks = response.json()['resource']['options']['bookmarks']
+        except (ValueError, KeyError, TypeError):
+            return
+        token = json.dumps(bookmarks, sort_keys=True)
+        with self.__lock:
+            self.__pages.setdefault((feed, token), page + 1)
+
+    @staticmethod
+    def __response(url, status_code, headers, content):
+        response = requests.models.Response()
+        response.status_code = status_code
+        response.headers = CaseInsensitiveDict(headers)
+        response.url = url
+        response.reason = http.client.responses.get(status_code, '')
+        response._content = content
+        response._content_consumed = True
+        return response
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+from pinterest.exceptions import PinterestResourceException
+
+
+class ResourceResponse:
+    """
+    Answer of a Pinterest resource call, as returned by call_resource().
+    `result` is the decoded JSON; `data`, `error` and `bookmarks` are read
+    from it.
+    """
+    __slots__ = ('resource', 'action', 'options', 'result', 'status_code',
+                 'headers', 'from_cache')
+
+    def __init__(self, resource, action, options, result, status_code=None,
+                 headers=None, from_cache=False):
+        self.resource = resource
+        self.action = action
+        self.options = options
+        self.result = result
+        self.status_code = status_code
+        self.headers = headers
+        self.from_cache = from_cache
+
+    def __repr__(self):
+        return '<ResourceResponse %s/%s %s>' % (
+            self.resource, self.action, 'ok' if self.ok else 'error')
+
+    @property
+    def resource_response(self):
+        return self.result.get('resource_response') or {}
+
+    @property
+    def data(self):
+        return self.resource_response.get('data')
+
+    @property
+    def error(self):
+        """
+        The error the site reported, a dict with 'http_status', 'message'
+        and usually 'code', or None
+        :rtype: dict|None
+        """
+        return self.resource_response.get('error')
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def bookmarks(self):
+        """
+        The bookmarks of the next page of a feed, None when the call has none
+        """
+        try:
+            return self.result['resource']['options']['bookmarks']
+        except (KeyError, TypeError):
+            return None
+
+    def json(self):
+        return self.result
+
+    def raise_for_error(self):
+        """
+        Raise PinterestResourceException if the site reported an error
+        """
+        error = self.error
+        if error is not None:
+            raise PinterestResourceException('[%s] %s' % (error.get('http_status'),
+                                                          error.get('message')),
+                                             response=self)
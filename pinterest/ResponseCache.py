@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+import json
+import time
+from collections import OrderedDict
+from pinterest.LRUCache import LRUCache
+
+
+class CacheEntry:
+    __slots__ = ('result', 'etag', 'last_modified', 'expires')
+
+    def __init__(self, result, etag=None, last_modified=None, expires=0.0):
+        self.result = result
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires = expires
+
+    def __getstate__(self):
+        return self.result, self.etag, self.last_modified, self.expires
+
+    def __setstate__(self, state):
+        self.result, self.etag, self.last_modified, self.expires = state
+
+    def fresh(self):
+        return time.time() < self.expires
+
+    def validators(self):
+        """
+        Return the conditional headers to revalidate this entry, if any
+        :rtype: dict|None
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers or None
+
+
+class ResponseCache(LRUCache):
+    """
+    Bounded LRU cache of read-only resource responses, keyed on the resource
+    name, its normalized options (the '_' timestamp is ignored), its source
+    URL and the account calling it, so clients sharing a cache never read
+    each other's answers.
+
+    Entries live for the TTL of their resource. A stale entry carrying an
+    ETag or Last-Modified header is revalidated with a conditional request
+    instead of being downloaded again. Writes made through the client
+    (pin, repin, delete_pin, create_board...) invalidate the entries they
+    change. With `path`, the cache is saved there on save() and at exit and
+    loaded back on start.
+    """
+    DEFAULT_TTL = {
+        'BoardPickerBoardsResource': 60.0,
+        'BoardSectionsResource': 300.0,
+        'BoardFeedResource': 300.0,
+        'BoardSectionPinsResource': 300.0,
+        'SearchResource': 600.0,
+    }
+    # Resources whose entries a write to the key resource makes stale
+    INVALIDATES = {
+        'PinResource': ('BoardFeedResource', 'BoardSectionPinsResource',
+                        'BoardPickerBoardsResource'),
+        'RepinResource': ('BoardFeedResource', 'BoardSectionPinsResource',
+                          'BoardPickerBoardsResource'),
+        'BoardResource': ('BoardPickerBoardsResource',),
+        'BoardSectionResource': ('BoardSectionsResource', 'BoardPickerBoardsResource'),
+    }
+
+    def __init__(self, max_entries=1024, ttl=None, path=None):
+        """
+        :param ttl: seconds to keep each resource, merged over DEFAULT_TTL.
+            Only the resources listed there are cached.
+        """
+        self.ttl = dict(self.DEFAULT_TTL)
+        if ttl:
+            self.ttl.update(ttl)
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0,
+                      'evictions': 0, 'invalidations': 0}
+        LRUCache.__init__(self, max_entries, path)
+
+    def _load(self, entries):
+        # Entries saved without their account are dropped
+        return OrderedDict((key, entry) for key, entry in entries.items() if len(key) == 4)
+
+    def cacheable(self, resource):
+        return resource in self.ttl
+
+    @staticmethod
+    def key(resource, options, source_url=None, account=None):
+        """
+        :param account: the account making the call, e.g. its username or
+            email
+        :rtype: tuple
+        """
+        return (resource, json.dumps(options, sort_keys=True, separators=(',', ':')),
+                source_url, account)
+
+    def get(self, key):
+        """
+        Return the entry of `key`, fresh or stale, or None
+        :rtype: CacheEntry|None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            if entry.fresh():
+                self.stats['hits'] += 1
+            return entry
+
+    def put(self, key, result, headers=None):
+        headers = headers or {}
+        entry = CacheEntry(result, headers.get('ETag'), headers.get('Last-Modified'),
+                           time.time() + self.ttl.get(key[0], 0.0))
+        with self._lock:
+            self._put(key, entry)
+
+    def refresh(self, key):
+        """
+        Extend the life of an entry the site confirmed unchanged (304)
+        :rtype: CacheEntry|None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.expires = time.time() + self.ttl.get(key[0], 0.0)
+                self.stats['revalidated'] += 1
+            return entry
+
+    def invalidate(self, resource=None, account=None, **options):
+        """
+        Drop the entries of `resource` (every resource when None) of
+        `account` (every account when None) whose options match the given
+        ones
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if resource is not None and key[0] != resource:
+                    continue
+                if account is not None and key[3] != account:
+                    continue
+                if options:
+                    cached = json.loads(key[1])
+                    if any(name in cached and cached[name] != value
+                           for name, value in options.items()):
+                        continue
+                del self._entries[key]
+                self.stats['invalidations'] += 1
+
+    def invalidate_write(self, resource, options, account=None):
+        """
+        Drop the entries of `account` made stale by a write to `resource`
+        """
+        match = {}
+        if options.get('board_id'):
+            match['board_id'] = options['board_id']
+        for stale in self.INVALIDATES.get(resource, ()):
+            if stale == 'BoardPickerBoardsResource':
+                self.invalidate(stale, account)
+            else:
+                self.invalidate(stale, account, **match)
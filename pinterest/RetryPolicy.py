@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+import random
+import threading
+import time
+
+
+class RetryPolicy:
+    """
+    When and how long to wait before retrying a failed request.
+
+    GET calls and '/delete/' resource calls are idempotent and are retried
+    on any transient error. Other POST calls ('/create/'...) are only
+    retried when the site surely did not act on them: the connection could
+    not be established, or the site answered 429 or 503.
+
+    Backoff is exponential with full jitter, and the retries of one request
+    never go beyond `deadline` seconds. Retry-After headers are honoured up
+    to `max_backoff`: a request asked to wait longer is given up, and its
+    error response tells the caller when to come back. Retry counts and
+    backoff time are kept in `stats`.
+    """
+    CONNECT_ERRORS = ('ConnectTimeout', 'NewConnectionError',
+                      'ClientConnectorError', 'ConnectionRefusedError')
+
+    def __init__(self, total=3, backoff_factor=0.5, max_backoff=30.0,
+                 jitter=True, status_forcelist=(429, 500, 502, 503, 504),
+                 connect_timeout=10.0, read_timeout=60.0, deadline=None):
+        """
+        :param total: maximum number of retries of one request
+        :param deadline: maximum seconds spent on one request, retries
+            included, None for no limit
+        """
+        self.total = total
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.status_forcelist = frozenset(status_forcelist)
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.deadline = deadline
+        self.stats = {'requests': 0, 'retries': 0, 'backoff_time': 0.0,
+                      'gave_up': 0}
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def is_idempotent(method, url):
+        """
+        :rtype: bool
+        """
+        if method.upper() in ('GET', 'HEAD', 'OPTIONS'):
+            return True
+        return '/delete/' in url
+
+    @classmethod
+    def is_connect_error(cls, error):
+        """
+        Return True if `error` happened before the request was sent
+        :rtype: bool
+        """
+        seen = 0
+        while error is not None and seen < 8:
+            if any(klass.__name__ in cls.CONNECT_ERRORS for klass in type(error).__mro__):
+                return True
+            reason = getattr(error, 'reason', None)
+            if reason is None and error.args and isinstance(error.args[0], BaseException):
+                reason = error.args[0]
+            error = reason if isinstance(reason, BaseException) else None
+            seen += 1
+        return False
+
+    def timeout(self, started=None):
+        """
+        Return the (connect, read) timeouts of the next attempt, the read
+        timeout being cut to what is left before the deadline
+        :rtype: tuple
+        """
+        read_timeout = self.read_timeout
+        if self.deadline is not None and started is not None:
+            remaining = self.deadline - (time.monotonic() - started)
+            read_timeout = max(0.001, min(read_timeout, remaining))
+        return self.connect_timeout, read_timeout
+
+    def should_retry(self, method, url, attempt, status_code=None, error=None):
+        """
+        :param attempt: number of retries already done for this request
+        :rtype: bool
+        """
+        if error is not None:
+            retryable = self.is_connect_error(error) or self.is_idempotent(method, url)
+        elif status_code in self.status_forcelist:
+            retryable = self.is_idempotent(method, url) or status_code in (429, 503)
+        else:
+            retryable = False
+        if retryable and attempt >= self.total:
+            self.record(gave_up=True)
+            return False
+        return retryable
+
+    def delay(self, attempt, started=None, retry_after=None):
+        """
+        Return the seconds to wait before the next attempt, or None when
+        waiting would go beyond the deadline or `retry_after` beyond
+        max_backoff. The wait is counted in stats.
+        :rtype: float|None
+        """
+        if retry_after is not None and retry_after > self.max_backoff:
+            self.record(gave_up=True)
+            return None
+        backoff = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        if self.jitter:
+            backoff = random.uniform(0, backoff)
+        if retry_after is not None:
+            backoff = max(backoff, retry_after)
+        if self.deadline is not None and started is not None:
+            if time.monotonic() - started + backoff >= self.deadline:
+                self.record(gave_up=True)
+                return None
+        with self.__lock:
+            self.stats['retries'] += 1
+            self.stats['backoff_time'] += backoff
+        return backoff
+
+    def record(self, gave_up=False):
+        """
+        Count a request, or a request given up on
+        """
+        with self.__lock:
+            if gave_up:
+                self.stats['gave_up'] += 1
+            else:
+                self.stats['requests'] += 1
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+import threading
+from collections import OrderedDict
+from pinterest.Registry import Registry
+
+END = '-end-'
+
+
+class SearchCursor:
+    """
+    Position of a search in its result pages: the bookmarks of the next
+    page and the number of pages already fetched
+    """
+    __slots__ = ('scope', 'query', 'bookmarks', 'pages')
+
+    def __init__(self, scope, query, bookmarks=None, pages=0):
+        self.scope = scope
+        self.query = query
+        self.bookmarks = list(bookmarks or [])
+        self.pages = pages
+
+    def __repr__(self):
+        return '<SearchCursor %s %r page %d%s>' % (
+            self.scope, self.query, self.pages, ' finished' if self.finished else '')
+
+    @property
+    def finished(self):
+        """
+        Whether the last page was fetched
+        :rtype: bool
+        """
+        return bool(self.bookmarks) and self.bookmarks[0] == END
+
+    @property
+    def next_bookmark(self):
+        """
+        The bookmark of the next page, None before the first page
+        :rtype: str|None
+        """
+        return self.bookmarks[0] if self.bookmarks else None
+
+    def to_tuple(self):
+        return self.scope, self.query, list(self.bookmarks), self.pages
+
+
+class SearchCursorStore:
+    """
+    Cursors of the searches a client is paging through, keyed on scope and
+    query. At most `max_entries` cursors are kept, the least recently used
+    ones are evicted first.
+
+    With a `registry`, the cursors are saved to it (under
+    Registry.Key.SEARCH_CURSORS, written as the registry writes) and read
+    back on first use, so paging resumes where it stopped after a restart.
+    """
+
+    def __init__(self, max_entries=1000, registry=None):
+        self.max_entries = max_entries
+        self.registry = registry
+        self.stats = {'evictions': 0}
+        self.__cursors = None
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        with self.__lock:
+            return len(self.__entries())
+
+    def __iter__(self):
+        return iter(self.cursors())
+
+    def get(self, scope, query):
+        """
+        Return the cursor of a search, None if it is not paged through
+        :rtype: SearchCursor|None
+        """
+        with self.__lock:
+            cursors = self.__entries()
+            cursor = cursors.get((scope, query))
+            if cursor is not None:
+                cursors.move_to_end((scope, query))
+            return cursor
+
+    def update(self, scope, query, bookmarks, first_page=False):
+        """
+        Record that a page of a search was fetched, `bookmarks` being those
+        of the next page. `first_page` starts the search over.
+        :rtype: SearchCursor
+        """
+        with self.__lock:
+            cursors = self.__entries()
+            cursor = cursors.get((scope, query))
+            if cursor is None or first_page:
+                cursor = cursors[(scope, query)] = SearchCursor(scope, query)
+            cursor.bookmarks = list(bookmarks or [])
+            cursor.pages += 1
+            cursors.move_to_end((scope, query))
+            while len(cursors) > self.max_entries:
+                cursors.popitem(last=False)
+                self.stats['evictions'] += 1
+            self.__save()
+        return cursor
+
+    def discard(self, scope, query):
+        with self.__lock:
+            if self.__entries().pop((scope, query), None) is not None:
+                self.__save()
+
+    def clear(self):
+        with self.__lock:
+            self.__entries().clear()
+            self.__save()
+
+    def cursors(self):
+        """
+        Return the cursors, least recently used first
+        :rtype: list
+        """
+        with self.__lock:
+            return list(self.__entries().values())
+
+    def __entries(self):
+        """
+        The cursors by (scope, query), read from the registry on first use
+        :rtype: collections.OrderedDict
+        """
+        if self.__cursors is None:
+            self.__cursors = OrderedDict()
+            if self.registry is not None:
+                for scope, query, bookmarks, pages in \
+                        self.registry.get(Registry.Key.SEARCH_CURSORS) or ():
+                    self.__cursors[(scope, query)] = SearchCursor(scope, query, bookmarks,
+                                                                  pages)
+        return self.__cursors
+
+    def __save(self):
+        if self.registry is not None:
+            self.registry.set(Registry.Key.SEARCH_CURSORS,
+                              [cursor.to_tuple() for cursor in self.__cursors.values()])
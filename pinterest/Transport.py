@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import requests
+import requests.adapters
+import requests.cookies
+
+
+class _NullCookieJar(requests.cookies.RequestsCookieJar):
+    """
+    Cookie jar that never stores anything, so a shared session keeps no
+    account's cookies
+    """
+
+    def set_cookie(self, cookie, *args, **kwargs):
+        pass
+
+    def extract_cookies(self, response, request):
+        pass
+
+
+class Transport:
+    """
+    Pool of HTTP connections that many Pinterest clients can share, so they
+    reuse warm TLS connections instead of opening one pool per account.
+
+    The transport never keeps cookies: every request is sent with the jar
+    of the client that made it, and the client stores what comes back.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False,
+                 keep_alive=True):
+        """
+        :param pool_connections: number of hosts whose pools are kept
+        :param pool_maxsize: connections kept per host, should be at least
+            the number of requests sent concurrently
+        :param pool_block: when the pool is full, wait for a free connection
+            instead of opening a throwaway one
+        :param keep_alive: reuse connections between requests
+        """
+        self.keep_alive = keep_alive
+        self.session = requests.Session()
+        self.session.cookies = _NullCookieJar()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_connections,
+                                                pool_maxsize=pool_maxsize,
+                                                pool_block=pool_block)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, method, url, cookies=None, params=None, data=None,
+                headers=None, files=None, timeout=None, proxies=None,
+                stream=None):
+        """
+        :rtype: requests.models.Response
+        """
+        if not self.keep_alive:
+            headers = dict(headers or {})
+            headers['Connection'] = 'close'
+        return self.session.request(method, url, params=params, data=data,
+                                    headers=headers, cookies=cookies, files=files,
+                                    timeout=timeout, proxies=proxies, stream=stream)
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import time
+from pinterest.LRUCache import LRUCache
+
+
+class UploadCache(LRUCache):
+    """
+    Image urls of the files already uploaded, keyed on a hash of the file
+    content, so an image pinned to several boards is uploaded only once.
+
+    At most `max_entries` urls are kept, the least recently used ones are
+    evicted first, and an url older than `ttl` seconds is uploaded again.
+    With `path`, the cache is saved there on save() and at exit and loaded
+    back on start.
+    """
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, max_entries=10000, ttl=7 * 24 * 3600.0, path=None):
+        """
+        :param ttl: seconds an uploaded image url is reused, None to keep
+            it until evicted
+        """
+        self.ttl = ttl
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0}
+        LRUCache.__init__(self, max_entries, path)
+
+    def key(self, image_file):
+        """
+        Return the hash of the content of `image_file`, read in chunks
+        :rtype: str
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        with open(image_file, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Return the image url uploaded for `key`, or None
+        :rtype: str|None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            image_url, uploaded_at = entry
+            if self.ttl is not None and time.time() - uploaded_at > self.ttl:
+                del self._entries[key]
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return image_url
+
+    def put(self, key, image_url):
+        with self._lock:
+            self._put(key, (image_url, time.time()))
+
+    def discard(self, key):
+        """
+        Forget the url of `key`, e.g. when the site no longer accepts it
+        """
+        with self._lock:
+            self._entries.pop(key, None)
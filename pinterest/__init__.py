@@ -1,7 +1,69 @@
 # -*- coding: utf-8 -*-
+import importlib
+import sys
+import types
+
 from . import exceptions
 from .Registry import Registry
+from .FeedIterator import FeedIterator
+from .Model import Pin
+from .Model import Board
+from .Model import Section
+from .Model import User
+from .BulkExecutor import BulkResult
+from .JSONCodec import JSONCodec
+from .ResourceResponse import ResourceResponse
+from .RetryPolicy import RetryPolicy
+from .Transport import Transport
+from .SearchCursor import SearchCursor
+from .SearchCursor import SearchCursorStore
+from .AccountSnapshot import AccountSnapshot
+from .AccountSnapshot import SyncDelta
 from .Pinterest import Pinterest
 from . import utils
 
-__all__ = ["exceptions", "Registry", "Pinterest", "utils"]
+# Imported on first use, they pull in asyncio, sqlite3 and others a sync
+# client does not need: name -> module defining it
+_LAZY = {
+    "SQLiteRegistry": "Registry",
+    "RateLimiter": "RateLimiter",
+    "Metrics": "Metrics",
+    "ReplayTransport": "ReplayTransport",
+    "ResponseCache": "ResponseCache",
+    "UploadCache": "UploadCache",
+    "AsyncPinterest": "AsyncPinterest",
+    "AccountPool": "AccountPool",
+}
+
+
+class _Package(types.ModuleType):
+
+    def __setattr__(self, name, value):
+        # Loading a submodule binds its name here to the module, the class it
+        # is named after takes its place
+        if _LAZY.get(name) == name and isinstance(value, types.ModuleType):
+            value = getattr(value, name)
+        types.ModuleType.__setattr__(self, name, value)
+
+
+sys.modules[__name__].__class__ = _Package
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = getattr(importlib.import_module("." + _LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
+
+__all__ = ["exceptions", "Registry", "SQLiteRegistry", "FeedIterator",
+           "Pin", "Board", "Section", "User", "BulkResult", "RateLimiter",
+           "Metrics", "JSONCodec", "ResourceResponse", "RetryPolicy",
+           "Transport", "ReplayTransport", "ResponseCache", "SearchCursor",
+           "SearchCursorStore", "UploadCache", "AccountSnapshot", "SyncDelta",
+           "Pinterest", "AsyncPinterest", "AccountPool", "utils"]
@@ -7,7 +7,14 @@ class PinterestException(Exception):
 
 
 class PinterestRequestException(PinterestException):
-    def __init__(self, *args):
+    """
+    Failed request, the response is in `response` when the site answered
+    with an error status: its `status_code` and `headers` tell a 429 and
+    its Retry-After
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.response = kwargs.pop('response', None)
         PinterestException.__init__(self, *args)
 
 
@@ -19,3 +26,13 @@ class PinterestLoginFailedException(PinterestException):
 class PinterestLoginRequiredException(PinterestException):
     def __init__(self, *args):
         PinterestException.__init__(self, *args)
+
+
+class PinterestResourceException(PinterestException):
+    """
+    Error reported by a resource call, the ResourceResponse is in `response`
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.response = kwargs.pop('response', None)
+        PinterestException.__init__(self, *args)
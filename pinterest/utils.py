@@ -1,5 +1,12 @@
 # -*- coding: utf-8 -*-
+import datetime
+import email.utils
+import json
+import os
+import pickle
+import tempfile
 import urllib
+import urllib.parse
 
 try:
   basestring
@@ -8,8 +15,133 @@ except NameError:
 
 def url_encode(query):
     if isinstance(query, basestring):
-        query = urllib.quote_plus(query)
-    else:
-        query = urllib.parse.urlencode(query)
-    query = query.replace('+', '%20')
-    return query
+        return urllib.parse.quote(query, safe='')
+    return urllib.parse.urlencode(query, quote_via=urllib.parse.quote)
+
+
+def parse_retry_after(value):
+    """
+    Return the seconds to wait from a Retry-After header value, given as
+    seconds or as an HTTP date, or None if it can not be parsed
+    :rtype: float|None
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if retry_at is None:
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max(0.0, (retry_at - now).total_seconds())
+
+
+def extract_script(chunks, marker, end=b'</script>'):
+    """
+    Scan an html page given as an iterable of byte chunks and return the
+    text from the first `marker` up to the next `end`, or None if not found.
+    Stops reading as soon as `end` is found, and only keeps the bytes from
+    `marker` on.
+    :rtype: bytes|None
+    """
+    scanner = _ScriptScanner(marker, end)
+    for chunk in chunks:
+        script = scanner.feed(chunk)
+        if script is not None:
+            return script
+    return None
+
+
+async def async_extract_script(chunks, marker, end=b'</script>'):
+    """
+    extract_script() for an asynchronous iterable of byte chunks
+    :rtype: bytes|None
+    """
+    scanner = _ScriptScanner(marker, end)
+    async for chunk in chunks:
+        script = scanner.feed(chunk)
+        if script is not None:
+            return script
+    return None
+
+
+class _ScriptScanner:
+    """
+    Finds the text between `marker` and `end` in an html page fed one
+    chunk at a time
+    """
+
+    def __init__(self, marker, end):
+        self.marker = marker
+        self.end = end
+        self.buf = bytearray()
+        self.found = False
+        self.searched = 0
+
+    def feed(self, chunk):
+        """
+        Add the next chunk of the page, return the text once complete
+        :rtype: bytes|None
+        """
+        buf = self.buf
+        buf.extend(chunk)
+        if not self.found:
+            i = buf.find(self.marker)
+            if i < 0:
+                del buf[:max(0, len(buf) - len(self.marker) + 1)]
+                return None
+            del buf[:i]
+            self.found = True
+        j = buf.find(self.end, self.searched)
+        if j >= 0:
+            return bytes(buf[:j])
+        self.searched = max(0, len(buf) - len(self.end) + 1)
+        return None
+
+
+def write_atomic(path, obj):
+    """
+    Pickle `obj` to `path` through a temporary file that then replaces
+    `path`, so a crash never leaves a truncated file behind
+    """
+    directory = os.path.dirname(path) or '.'
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(obj, f, 1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def parse_resource_call(url, data=None):
+    """
+    Return the resource name, action and options of a resource call URL
+    (and urlencoded body for POST calls)
+    :rtype: tuple
+    """
+    parts = urllib.parse.urlsplit(url)
+    path = [part for part in parts.path.split('/') if part]
+    resource = path[1] if len(path) > 2 and path[0] == 'resource' else None
+    action = path[2] if resource else None
+    query = urllib.parse.parse_qs(data if isinstance(data, basestring) else parts.query)
+    options = {}
+    if query.get('data'):
+        try:
+            options = json.loads(query['data'][0]).get('options') or {}
+        except ValueError:
+            pass
+    return resource, action, options
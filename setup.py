@@ -20,6 +20,7 @@ setup(
         'License :: OSI Approved :: MIT License', 
         'Programming Language :: Python :: 2.7'],
     install_requires=['requests', 'requests_toolbelt'],
+    extras_require={'async': ['aiohttp']},
     license="MIT",
     keywords=['Python Pinterest Client', 'Python Pinterest API'],
     url='https://github.com/cvhau/pinterest-client',
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from mock_server import Dataset
+from mock_server import EMAIL
+from mock_server import MockServer
+from pinterest import AccountSnapshot
+from pinterest import Pinterest
+from pinterest import SyncDelta
+from pinterest.AccountSnapshot import pin_checksum
+
+
+def pin(pin_id, title='title'):
+    return {'id': pin_id, 'title': title, 'description': '', 'link': None, 'image': None}
+
+
+def known(*pins):
+    return [[p['id'], pin_checksum(p)] for p in pins]
+
+
+class Feed:
+    """
+    Iterable over `pins` counting how many were read
+    """
+
+    def __init__(self, *pins):
+        self.pins = pins
+        self.read = 0
+
+    def __iter__(self):
+        for p in self.pins:
+            self.read += 1
+            yield p
+
+
+class DiffFeedTest(unittest.TestCase):
+
+    def test_first_sync_adds_every_pin(self):
+        feed = Feed(pin('2'), pin('1'))
+        added, removed, changed, entries = AccountSnapshot.diff_feed(feed, [])
+        self.assertEqual([p['id'] for p in added], ['2', '1'])
+        self.assertEqual((removed, changed), ([], []))
+        self.assertEqual(entries, known(pin('2'), pin('1')))
+
+    def test_growth_stops_at_first_known_pin(self):
+        feed = Feed(pin('4'), pin('3'), pin('2'), pin('1'))
+        added, removed, changed, entries = AccountSnapshot.diff_feed(
+            feed, known(pin('2'), pin('1')), growth=2)
+        self.assertEqual([p['id'] for p in added], ['4', '3'])
+        self.assertEqual((removed, changed), ([], []))
+        self.assertEqual(entries, known(pin('4'), pin('3'), pin('2'), pin('1')))
+        self.assertEqual(feed.read, 3)
+
+    def test_whole_feed_walked_for_removed_and_edited_pins(self):
+        feed = Feed(pin('4'), pin('3', 'edited'), pin('1'))
+        added, removed, changed, entries = AccountSnapshot.diff_feed(
+            feed, known(pin('3'), pin('2'), pin('1')), growth=0)
+        self.assertEqual([p['id'] for p in added], ['4'])
+        self.assertEqual(removed, ['2'])
+        self.assertEqual([p['title'] for p in changed], ['edited'])
+        self.assertEqual(entries, known(pin('4'), pin('3', 'edited'), pin('1')))
+        self.assertEqual(feed.read, 3)
+
+    def test_unknown_growth_walks_whole_feed(self):
+        feed = Feed(pin('3'), pin('2'), pin('1'))
+        added, removed, changed, entries = AccountSnapshot.diff_feed(
+            feed, known(pin('2'), pin('1')))
+        self.assertEqual([p['id'] for p in added], ['3'])
+        self.assertEqual(feed.read, 3)
+
+
+class SyncDeltaTest(unittest.TestCase):
+
+    def test_empty_delta(self):
+        delta = SyncDelta()
+        self.assertTrue(delta.is_empty())
+        self.assertEqual(delta.to_dict()['pins'], {'added': [], 'removed': [], 'changed': []})
+
+    def test_delta_with_changes(self):
+        delta = SyncDelta()
+        delta.pins_removed.append({'board_id': '1', 'section_id': None, 'pin_id': '2'})
+        self.assertFalse(delta.is_empty())
+        self.assertEqual(delta.to_dict()['pins']['removed'][0]['pin_id'], '2')
+        self.assertIn('pins +0 -1 ~0', repr(delta))
+
+
+class SyncUserPinsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp(prefix='pinterest-test-')
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def test_second_sync_finds_nothing_new(self):
+        dataset = Dataset(boards=2, sections=2, board_pins=30, section_pins=12, page_size=10)
+        path = os.path.join(self.data_dir, 'snapshot.dat')
+        with MockServer(dataset) as server:
+            client = Pinterest(EMAIL, 'password', data_dir=self.data_dir)
+            client.host = server.host
+            client.home_page = server.home_page
+            client.login()
+            snapshot = AccountSnapshot.load(path)
+            delta = client.sync_user_pins(snapshot)
+            snapshot.save(path)
+            delta_again = client.sync_user_pins(AccountSnapshot.load(path))
+        self.assertEqual(len(delta.boards_added), 2)
+        self.assertEqual(len(delta.sections_added), 4)
+        self.assertEqual(len(delta.pins_added), 2 * 30 + 4 * 12)
+        self.assertTrue(delta_again.is_empty(), delta_again)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from mock_server import Dataset
+from mock_server import EMAIL
+from mock_server import MockServer
+from pinterest import Pinterest
+from pinterest import RetryPolicy
+from pinterest.exceptions import PinterestRequestException
+
+try:
+    import aiohttp
+    from pinterest import AsyncPinterest
+except ImportError:
+    aiohttp = None
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+@unittest.skipIf(aiohttp is None, 'AsyncPinterest requires aiohttp')
+class AsyncPinterestTest(unittest.TestCase):
+    dataset = Dataset(boards=3, sections=2, board_pins=30, section_pins=12,
+                      page_size=10)
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockServer(cls.dataset).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp(prefix='pinterest-test-')
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def client(self, klass):
+        data_dir = os.path.join(self.data_dir, klass.__name__)
+        client = klass(EMAIL, 'password', data_dir=data_dir, login_delay=(0, 0))
+        client.host = self.server.host
+        client.home_page = self.server.home_page
+        return client
+
+    def test_login_and_boards(self):
+        async def scenario():
+            async with self.client(AsyncPinterest) as client:
+                self.assertTrue(await client.login(resume=False))
+                self.assertEqual(client.user['email'], EMAIL)
+                return await client.boards()
+        boards = run(scenario())
+        self.assertEqual([board['name'] for board in boards],
+                         ['board-1', 'board-2', 'board-3'])
+
+    def test_fetch_user_pins_matches_sync_client(self):
+        client = self.client(Pinterest)
+        client.login()
+        expected = client.fetch_user_pins()
+
+        async def scenario():
+            async with self.client(AsyncPinterest) as client:
+                await client.login()
+                return await client.fetch_user_pins()
+        boards = run(scenario())
+        self.assertEqual(boards, expected)
+        self.assertEqual(len(boards[0]['pins']), self.dataset.board_pins)
+        self.assertEqual(len(boards[0]['sections'][1]['pins']), self.dataset.section_pins)
+
+    def test_search_pages(self):
+        async def scenario():
+            async with self.client(AsyncPinterest) as client:
+                await client.login()
+                first = await client.search_pins('cats')
+                second = await client.search_pins('cats', next_page=True)
+                return first, second, client.search_cursors.get('pins', 'cats').pages
+        first, second, pages = run(scenario())
+        self.assertEqual(len(first), self.dataset.page_size)
+        self.assertEqual(len(second), self.dataset.page_size)
+        self.assertNotEqual(first[0]['id'], second[0]['id'])
+        self.assertEqual(pages, 2)
+
+    def test_iter_search_pins(self):
+        async def scenario():
+            async with self.client(AsyncPinterest) as client:
+                await client.login()
+                return [pin async for pin in client.iter_search_pins('cats', limit=25)]
+        pins = run(scenario())
+        self.assertEqual(len(pins), 25)
+        self.assertEqual(len(set(pin['id'] for pin in pins)), 25)
+
+    def test_like(self):
+        async def scenario():
+            async with self.client(AsyncPinterest) as client:
+                await client.login()
+                return await client.like('1')
+        self.assertTrue(run(scenario()))
+
+    def test_error_status_carries_response(self):
+        server = HTTPServer(('127.0.0.1', 0), _TooManyRequests)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        async def scenario():
+            client = AsyncPinterest(EMAIL, 'password', data_dir=self.data_dir,
+                                    retry_policy=RetryPolicy(total=0))
+            async with client:
+                await client.get('http://127.0.0.1:%d/' % server.server_address[1])
+        try:
+            with self.assertRaises(PinterestRequestException) as raised:
+                run(scenario())
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertEqual(raised.exception.response.status_code, 429)
+        self.assertEqual(raised.exception.response.headers['Retry-After'], '30')
+
+
+class _TooManyRequests(BaseHTTPRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(429)
+        self.send_header('Retry-After', '30')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from mock_server import EMAIL
+from mock_server import MockServer
+from pinterest import Pinterest
+from pinterest import UploadCache
+from pinterest.BulkExecutor import BulkExecutor
+
+try:
+    import aiohttp
+    from pinterest import AsyncPinterest
+except ImportError:
+    aiohttp = None
+
+
+class _Response:
+    error = None
+
+    def __init__(self, data):
+        self.data = data
+
+
+class BulkExecutorTest(unittest.TestCase):
+
+    def test_results_are_sorted_and_failures_reported(self):
+        def call(pin_id):
+            if pin_id == 3:
+                raise ValueError('no pin 3')
+            return _Response({'id': pin_id})
+        finished = []
+        results = BulkExecutor(max_workers=2, callback=finished.append).run(call, range(10))
+        self.assertEqual([result.index for result in results], list(range(10)))
+        self.assertEqual([result.success for result in results], [i != 3 for i in range(10)])
+        self.assertIsInstance(results[3].error, ValueError)
+        self.assertEqual(sorted(result.index for result in finished), list(range(10)))
+
+
+class UploadPinsTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp(prefix='pinterest-test-')
+        self.files = []
+        for i in range(6):
+            path = os.path.join(self.data_dir, 'image-%d.jpg' % i)
+            with open(path, 'wb') as f:
+                f.write(b'\xff\xd8' + bytes([i]) * (100 + i))
+            self.files.append(path)
+        # The same image twice is uploaded once
+        self.files.append(self.files[0])
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def client(self, klass):
+        data_dir = os.path.join(self.data_dir, klass.__name__)
+        client = klass(EMAIL, 'password', data_dir=data_dir, upload_cache=UploadCache())
+        client.host = self.server.host
+        client.home_page = self.server.home_page
+        return client
+
+    def check(self, results, progress):
+        self.assertEqual([result.index for result in results], list(range(7)))
+        self.assertTrue(all(result.success for result in results))
+        self.assertEqual(progress[-1], (7, sum(102 + i for i in range(6))))
+
+    def test_upload_pins(self):
+        client = self.client(Pinterest)
+        client.login()
+        progress = []
+        results = client.upload_pins('1', iter(self.files), max_concurrency=1,
+                                     progress=lambda *totals: progress.append(totals))
+        self.check(results, progress)
+
+    @unittest.skipIf(aiohttp is None, 'AsyncPinterest requires aiohttp')
+    def test_async_upload_pins(self):
+        progress = []
+
+        async def scenario():
+            async with self.client(AsyncPinterest) as client:
+                await client.login()
+                return await client.upload_pins(
+                    '1', iter(self.files), max_concurrency=1,
+                    progress=lambda *totals: progress.append(totals))
+        self.check(asyncio.run(scenario()), progress)
+
+
+if __name__ == '__main__':
+    unittest.main()
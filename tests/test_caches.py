@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import unittest
+from collections import OrderedDict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pinterest import ResponseCache
+from pinterest import UploadCache
+
+
+class CacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp(prefix='pinterest-test-')
+        self.path = os.path.join(self.data_dir, 'cache.dat')
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = UploadCache(max_entries=2)
+        cache.put('a', 'url-a')
+        cache.put('b', 'url-b')
+        cache.get('a')
+        cache.put('c', 'url-c')
+        self.assertEqual((cache.get('a'), cache.get('b'), cache.get('c')),
+                         ('url-a', None, 'url-c'))
+        self.assertEqual(cache.stats['evictions'], 1)
+
+    def test_upload_cache_is_saved_and_loaded(self):
+        cache = UploadCache(path=self.path)
+        cache.put('a', 'url-a')
+        cache.save()
+        self.assertEqual(UploadCache(path=self.path).get('a'), 'url-a')
+
+    def test_response_cache_is_saved_and_loaded(self):
+        cache = ResponseCache(path=self.path)
+        key = cache.key('BoardFeedResource', {'board_id': '1'}, '/board/', 'user')
+        cache.put(key, {'data': [1, 2]}, {'ETag': '"v1"'})
+        cache.save()
+        entry = ResponseCache(path=self.path).get(key)
+        self.assertEqual((entry.result, entry.etag), ({'data': [1, 2]}, '"v1"'))
+
+    def test_response_entries_without_account_are_dropped(self):
+        cache = ResponseCache()
+        key = cache.key('BoardFeedResource', {'board_id': '1'}, '/board/', 'user')
+        cache.put(key, {'data': []})
+        with open(self.path, 'wb') as f:
+            pickle.dump(OrderedDict([(key[:3], None), (key, cache.get(key))]), f)
+        self.assertEqual(len(ResponseCache(path=self.path)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
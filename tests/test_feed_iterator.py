@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pinterest import FeedIterator
+from pinterest.FeedIterator import PrefetchFeedIterator
+from pinterest.exceptions import PinterestException
+
+
+def feed(pages):
+    """
+    Page fetcher over `pages`, a dict of bookmark -> (items, next bookmarks),
+    recording the bookmarks it was called with
+    """
+    calls = []
+
+    def fetch_page(bookmarks):
+        calls.append(list(bookmarks))
+        return pages[bookmarks[0] if bookmarks else None]
+    return fetch_page, calls
+
+
+PAGES = {
+    None: ([1, 2], ['b1']),
+    'b1': ([3, 4], ['b2']),
+    'b2': ([5], [FeedIterator.END]),
+}
+
+
+class FeedIteratorTest(unittest.TestCase):
+
+    def test_iterates_until_end_marker(self):
+        fetch_page, calls = feed(PAGES)
+        self.assertEqual(list(FeedIterator(fetch_page)), [1, 2, 3, 4, 5])
+        self.assertEqual(calls, [[], ['b1'], ['b2']])
+
+    def test_empty_bookmarks_end_the_feed(self):
+        fetch_page, calls = feed({None: ([1], [])})
+        self.assertEqual(list(FeedIterator(fetch_page)), [1])
+        self.assertEqual(len(calls), 1)
+
+    def test_resumes_from_bookmarks(self):
+        fetch_page, calls = feed(PAGES)
+        self.assertEqual(list(FeedIterator(fetch_page, 'b1')), [3, 4, 5])
+        self.assertEqual(calls, [['b1'], ['b2']])
+
+    def test_page_without_bookmarks_raises(self):
+        iterator = FeedIterator(lambda bookmarks: ([1, 2], None))
+        self.assertEqual([next(iterator), next(iterator)], [1, 2])
+        self.assertRaises(PinterestException, next, iterator)
+
+    def test_prefetch_iterates_until_end_marker(self):
+        fetch_page, calls = feed(PAGES)
+        self.assertEqual(list(PrefetchFeedIterator(fetch_page, prefetch=2)), [1, 2, 3, 4, 5])
+        self.assertEqual(calls, [[], ['b1'], ['b2']])
+
+    def test_prefetch_page_without_bookmarks_raises(self):
+        iterator = PrefetchFeedIterator(lambda bookmarks: ([1, 2], None))
+        self.assertEqual([next(iterator), next(iterator)], [1, 2])
+        self.assertRaises(PinterestException, next, iterator)
+
+
+if __name__ == '__main__':
+    unittest.main()
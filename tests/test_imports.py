@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(*lines):
+    """
+    Run `lines` in a fresh interpreter, where no submodule is imported yet,
+    and return what they print
+    """
+    code = '\n'.join(('import sys', 'sys.path.insert(0, %r)' % ROOT) + lines)
+    return subprocess.check_output([sys.executable, '-c', code]).decode().strip()
+
+
+class LazyImportTest(unittest.TestCase):
+
+    def test_client_import_skips_optional_modules(self):
+        self.assertEqual(run(
+            'import pinterest',
+            'print(sorted(m for m in ("asyncio", "sqlite3", "pinterest.AccountPool")'
+            ' if m in sys.modules))',
+        ), '[]')
+
+    def test_lazy_names_are_classes(self):
+        self.assertEqual(run(
+            'import pinterest',
+            'print(all(isinstance(getattr(pinterest, name), type)'
+            ' for name in pinterest._LAZY))',
+        ), 'True')
+
+    def test_class_after_submodule_import(self):
+        self.assertEqual(run(
+            'import pinterest.AccountPool',
+            'from pinterest import AccountPool',
+            'print(AccountPool.__name__)',
+        ), 'AccountPool')
+
+    def test_class_after_from_submodule_import(self):
+        self.assertEqual(run(
+            'from pinterest.Metrics import Metrics',
+            'import pinterest',
+            'print(pinterest.Metrics is Metrics)',
+        ), 'True')
+
+    def test_star_import(self):
+        self.assertEqual(run(
+            'from pinterest import *',
+            'print(ResponseCache.__name__, SQLiteRegistry.__name__)',
+        ), 'ResponseCache SQLiteRegistry')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+import gc
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pinterest import Pinterest
+from pinterest import Registry
+
+
+class WriteBehindTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp(prefix='pinterest-test-')
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def read(self, path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def test_dropped_registry_is_flushed_after_interval(self):
+        path = os.path.join(self.data_dir, 'registry.dat')
+        registry = Registry(path, write_behind=True, flush_interval=0.1)
+        registry.set(Registry.Key.CSRF_TOKEN, 'token')
+        del registry
+        gc.collect()
+        for _ in range(50):
+            if os.path.isfile(path):
+                break
+            time.sleep(0.05)
+        self.assertEqual(self.read(path), {Registry.Key.CSRF_TOKEN: 'token'})
+
+    def test_dropped_client_is_flushed_at_exit(self):
+        code = '\n'.join([
+            'import gc, sys',
+            'sys.path.insert(0, %r)' % ROOT,
+            'from pinterest import Pinterest, Registry',
+            'def login():',
+            '    client = Pinterest("user@example.com", "password",'
+            ' data_dir=%r)' % self.data_dir,
+            '    client.registry.set(Registry.Key.CSRF_TOKEN, "token")',
+            'login()',
+            'gc.collect()',
+        ])
+        subprocess.check_call([sys.executable, '-c', code])
+        path = os.path.join(self.data_dir, 'user@example.com', 'registry.dat')
+        self.assertEqual(self.read(path), {Registry.Key.CSRF_TOKEN: 'token'})
+
+    def test_close_writes_and_stops_writing_behind(self):
+        path = os.path.join(self.data_dir, 'registry.dat')
+        registry = Registry(path, write_behind=True, flush_interval=None)
+        registry.set('key', 1)
+        self.assertFalse(os.path.isfile(path))
+        registry.close()
+        self.assertEqual(self.read(path), {'key': 1})
+        registry.set('key', 2)
+        self.assertEqual(self.read(path), {'key': 2})
+
+    def test_failed_load_does_not_overwrite(self):
+        path = os.path.join(self.data_dir, 'registry.dat')
+        with open(path, 'wb') as f:
+            f.write(b'not a pickle')
+        registry = Registry(path, write_behind=True)
+        self.assertRaises(Exception, registry.set, 'key', 1)
+        registry.flush()
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), b'not a pickle')
+
+    def test_client_creation_writes_nothing(self):
+        Pinterest('user@example.com', 'password', data_dir=self.data_dir)
+        self.assertEqual(os.listdir(self.data_dir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
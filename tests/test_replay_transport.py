@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+import urllib.parse
+import zlib
+
+import requests.cookies
+import requests.models
+from requests.structures import CaseInsensitiveDict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pinterest import ReplayTransport
+from pinterest import Transport
+from pinterest.exceptions import PinterestRequestException
+
+FEED = 'https://www.pinterest.com/resource/BoardFeedResource/get/'
+LOGIN = 'https://www.pinterest.com/resource/UserSessionResource/create/'
+
+
+class FakeTransport(Transport):
+    """
+    Transport answering every request with `answer(method, url, data)`, a
+    (body, headers, cookies) tuple
+    """
+
+    def __init__(self, answer):
+        Transport.__init__(self)
+        self.answer = answer
+        self.calls = 0
+
+    def request(self, method, url, cookies=None, params=None, data=None,
+                headers=None, files=None, timeout=None, proxies=None,
+                stream=None):
+        self.calls += 1
+        body, response_headers, response_cookies = self.answer(method, url, data)
+        response = requests.models.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers = CaseInsensitiveDict(response_headers)
+        response.cookies = requests.cookies.cookiejar_from_dict(response_cookies)
+        response._content = json.dumps(body).encode('utf-8')
+        return response
+
+
+def feed_url(options, timestamp):
+    return FEED + '?' + urllib.parse.urlencode({
+        'source_url': '/board/', '_': timestamp,
+        'data': json.dumps({'options': options, 'context': {}})})
+
+
+def feed_answer(method, url, data):
+    """
+    Answer of a feed of 3 pages whose bookmarks change every session
+    """
+    query = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(url).query))
+    options = json.loads(query['data'])['options']
+    page = int(options['bookmarks'][0].split('-')[1]) + 1 if options.get('bookmarks') else 1
+    bookmarks = ['session%s-%d' % (query['_'], page)] if page < 3 else ['-end-']
+    return ({'resource': {'options': {'bookmarks': bookmarks}},
+             'resource_response': {'data': [page]}}, {}, {})
+
+
+class ReplayTransportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp(prefix='pinterest-test-')
+        self.path = os.path.join(self.data_dir, 'replay.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def crawl(self, transport, timestamp):
+        """
+        Read the whole feed, returning the data of every page
+        """
+        pages = []
+        options = {'bookmarks': [], 'board_id': '1'}
+        while True:
+            url = feed_url(options, timestamp)
+            result = transport.request('GET', url).json()
+            pages.append(result['resource_response']['data'])
+            bookmarks = result['resource']['options']['bookmarks']
+            if bookmarks == ['-end-']:
+                return pages
+            options = {'bookmarks': bookmarks, 'board_id': '1'}
+
+    def stored(self):
+        connection = sqlite3.connect(self.path)
+        try:
+            return connection.execute('SELECT key, headers, body FROM exchanges').fetchall()
+        finally:
+            connection.close()
+
+    def test_replay_matches_other_timestamps_order_and_bookmarks(self):
+        recorder = ReplayTransport(self.path, ReplayTransport.RECORD,
+                                   transport=FakeTransport(feed_answer))
+        self.assertEqual(self.crawl(recorder, '1000'), [[1], [2], [3]])
+        recorder.close()
+        sender = FakeTransport(feed_answer)
+        replayer = ReplayTransport(self.path, ReplayTransport.REPLAY, transport=sender)
+        self.assertEqual(self.crawl(replayer, '2000'), [[1], [2], [3]])
+        self.assertEqual(sender.calls, 0)
+        self.assertEqual(replayer.stats['replayed'], 3)
+        replayer.close()
+
+    def test_sessions_with_other_bookmarks_share_keys(self):
+        for timestamp in ('1000', '2000'):
+            recorder = ReplayTransport(self.path, ReplayTransport.RECORD,
+                                       transport=FakeTransport(feed_answer))
+            self.crawl(recorder, timestamp)
+            self.assertEqual(len(recorder), 3)
+            recorder.close()
+
+    def test_replay_raises_for_unrecorded_request(self):
+        replayer = ReplayTransport(self.path, ReplayTransport.REPLAY,
+                                   transport=FakeTransport(feed_answer))
+        self.assertRaises(PinterestRequestException, replayer.request,
+                          'GET', feed_url({'board_id': '2'}, '1'))
+        replayer.close()
+
+    def test_credentials_are_not_stored(self):
+        password = 'hunter2-password'
+        session = 'session-cookie-value'
+        csrftoken = 'csrf-token-value'
+
+        def answer(method, url, data):
+            return ({'echo': {'password': password, 'session': session,
+                              'csrf': csrftoken},
+                     'escaped': json.dumps({'password': password})},
+                    {'Set-Cookie': '_pinterest_sess=%s' % session, 'X-Test': 'kept'},
+                    {'_pinterest_sess': session})
+        recorder = ReplayTransport(self.path, ReplayTransport.RECORD,
+                                   transport=FakeTransport(answer))
+        data = urllib.parse.urlencode({'data': json.dumps({'options': {
+            'username_or_email': 'user@example.com', 'password': password}})})
+        cookies = requests.cookies.cookiejar_from_dict({'csrftoken': csrftoken})
+        response = recorder.request('POST', LOGIN, cookies=cookies, data=data,
+                                    headers={'X-CSRFToken': csrftoken})
+        self.assertEqual(response.json()['echo']['password'], password)
+        recorder.close()
+
+        [(key, headers, body)] = self.stored()
+        stored = key + headers + zlib.decompress(body).decode('utf-8')
+        for secret in (password, session, csrftoken):
+            self.assertNotIn(secret, stored)
+        self.assertIn('"password":"<redacted>","username_or_email":"user@example.com"',
+                      urllib.parse.unquote(key))
+        self.assertEqual(json.loads(headers), {'X-Test': 'kept'})
+
+
+if __name__ == '__main__':
+    unittest.main()
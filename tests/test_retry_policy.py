@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import time
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pinterest import RetryPolicy
+
+
+class RetryPolicyTest(unittest.TestCase):
+
+    def test_backoff_is_capped(self):
+        policy = RetryPolicy(backoff_factor=10, max_backoff=5, jitter=False)
+        self.assertEqual(policy.delay(6), 5)
+
+    def test_retry_after_is_honoured(self):
+        policy = RetryPolicy(backoff_factor=0.1, max_backoff=30, jitter=False)
+        self.assertEqual(policy.delay(0, retry_after=12), 12)
+
+    def test_retry_after_beyond_max_backoff_gives_up(self):
+        policy = RetryPolicy(max_backoff=30)
+        self.assertIsNone(policy.delay(0, retry_after=3600))
+        self.assertEqual(policy.stats['gave_up'], 1)
+        self.assertEqual(policy.stats['backoff_time'], 0.0)
+
+    def test_retry_after_beyond_deadline_gives_up(self):
+        policy = RetryPolicy(max_backoff=30, deadline=10)
+        self.assertIsNone(policy.delay(0, time.monotonic(), retry_after=20))
+        self.assertEqual(policy.stats['gave_up'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()